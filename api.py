@@ -0,0 +1,156 @@
+# api.py
+import asyncio
+import json
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from config import API_MAX_BATCH_SIZE, EXECUTOR_DISCONNECT_POLL_S
+from executor import ExecutorBusy, DeadlineExceeded
+from generation import validate_generation_profile
+from metrics import REGISTRY
+from readiness import ModelsNotReady
+from streaming import register_stream_route
+from utils import validate_incident_text
+
+
+class IncidentRequest(BaseModel):
+    text: str
+    id: Optional[str] = None
+    deadline_s: Optional[float] = None
+    profile: Optional[str] = None
+
+
+class BatchIncidentRequest(BaseModel):
+    incidents: List[IncidentRequest]
+    deadline_s: Optional[float] = None
+    profile: Optional[str] = None
+
+
+def _with_id(result, incident_id):
+    """Devuelve el `id` del llamador junto al resultado (útil para sistemas de ticketing)"""
+    if incident_id is not None:
+        result = {"id": incident_id, **result}
+    return result
+
+
+async def wait_for_job(request, job):
+    """
+    Espera el resultado de un trabajo del ejecutor sin bloquear el event loop.
+    Si el cliente se desconecta o vence el plazo, el trabajo se cancela (si aún
+    está en cola no llega a ejecutarse). Retorna None si el cliente se fue.
+    """
+    future = asyncio.wrap_future(job.future)
+    while True:
+        remaining = job.remaining()
+        if remaining <= 0:
+            job.cancel()
+            raise DeadlineExceeded(f"La petición superó su plazo de {job.queue_info['deadline_s']} s")
+        done, _ = await asyncio.wait({future}, timeout=min(EXECUTOR_DISCONNECT_POLL_S, remaining))
+        if done:
+            return future.result()
+        if await request.is_disconnected():
+            job.cancel()
+            return None
+
+
+def create_api(process_fn, stream_fn, status_fn=None):
+    """
+    Crea la API HTTP sin interfaz gráfica. `process_fn(text, lane, deadline_s, profile)`
+    encola el incidente en el ejecutor de inferencia y retorna el `Job` cuyo
+    resultado es el JSON de `format_as_json`; `stream_fn(text, profile)` retorna los
+    eventos de streaming. Ambos reutilizan los modelos cargados una sola vez.
+    `status_fn()` informa el estado de carga de los modelos para `/readyz`.
+    """
+    app = FastAPI(title="Microagente de Resumen de Incidentes")
+
+    @app.exception_handler(ModelsNotReady)
+    async def models_not_ready(request, exc):
+        return JSONResponse(status_code=503, headers={"Retry-After": "5"},
+                            content={"status": "error", "message": str(exc)})
+
+    @app.exception_handler(ExecutorBusy)
+    async def executor_busy(request, exc):
+        return JSONResponse(status_code=429, headers={"Retry-After": "2"},
+                            content={"status": "error", "message": str(exc)})
+
+    @app.exception_handler(DeadlineExceeded)
+    async def deadline_exceeded(request, exc):
+        return JSONResponse(status_code=504, content={"status": "error", "message": str(exc)})
+
+    @app.get("/healthz")
+    def healthz():
+        """Liveness: el proceso responde, aunque los modelos sigan cargando"""
+        return {"status": "alive"}
+
+    @app.get("/readyz")
+    def readyz():
+        """Readiness: 200 solo cuando los modelos están cargados y calentados"""
+        status = status_fn() if status_fn else {"status": "ready", "ready": True}
+        return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+    def client_gone():
+        return JSONResponse(status_code=499, content={"status": "error", "message": "Cliente desconectado"})
+
+    @app.post("/summarize")
+    async def summarize(incident: IncidentRequest, request: Request):
+        error_msg = validate_incident_text(incident.text) or validate_generation_profile(incident.profile)
+        if error_msg:
+            return JSONResponse(status_code=422, content=_with_id({"status": "error", "message": error_msg}, incident.id))
+
+        # Admisión en el carril interactivo (puede esperar brevemente a los modelos: fuera del event loop)
+        job = await run_in_threadpool(process_fn, incident.text, "interactive", incident.deadline_s, incident.profile)
+        json_output = await wait_for_job(request, job)
+        if json_output is None:
+            return client_gone()
+        result = _with_id(json.loads(json_output), incident.id)
+        return JSONResponse(status_code=200 if result.get("status") == "success" else 500, content=result)
+
+    @app.post("/summarize/batch")
+    async def summarize_batch(batch: BatchIncidentRequest, request: Request):
+        if len(batch.incidents) > API_MAX_BATCH_SIZE:
+            return JSONResponse(status_code=413, content={
+                "status": "error",
+                "message": f"Máximo {API_MAX_BATCH_SIZE} incidentes por lote."
+            })
+        for incident in [batch, *batch.incidents]:
+            error_msg = validate_generation_profile(incident.profile)
+            if error_msg:
+                return JSONResponse(status_code=422, content={"status": "error", "message": error_msg})
+
+        def admit_all():
+            # El lote se admite entero o nada: si el carril se llena a mitad, se cancela lo admitido
+            jobs = []
+            try:
+                for incident in batch.incidents:
+                    jobs.append(process_fn(incident.text, "bulk", incident.deadline_s or batch.deadline_s,
+                                           incident.profile or batch.profile))
+            except Exception:
+                for job in jobs:
+                    job.cancel()
+                raise
+            return jobs
+
+        # Los trabajos del carril bulk se agrupan en el micro-batcher cuando no hay interactivos
+        jobs = await run_in_threadpool(admit_all)
+        try:
+            outputs = await asyncio.gather(*(wait_for_job(request, job) for job in jobs))
+        except Exception:
+            for job in jobs:
+                job.cancel()
+            raise
+        if any(output is None for output in outputs):
+            return client_gone()
+        results = [_with_id(json.loads(output), incident.id) for output, incident in zip(outputs, batch.incidents)]
+        return {"status": "success", "count": len(results), "results": results}
+
+    @app.get("/metrics")
+    def metrics():
+        """Métricas en formato de exposición de Prometheus"""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    register_stream_route(app, stream_fn)
+    return app
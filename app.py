@@ -1,139 +1,729 @@
 # app.py
 
+import argparse
 import json
-import torch
-from transformers import pipeline, AutoTokenizer
-import gradio as gr
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import uvicorn
 
 # Importaciones modulares
-from utils import format_as_json
+from api import create_api
+from utils import build_result, validate_incident_text, extract_entities
+from classifier import classify_incident
 from config import (
-    MODEL_NAME, MIN_LENGTH, MAX_LENGTH, 
-    NUM_BEAMS, DO_SAMPLE, MAX_INPUT_LENGTH,
+    MODEL_NAME, MIN_LENGTH, MAX_INPUT_LENGTH,
+    GENERATION_PROFILES, DEFAULT_GENERATION_PROFILE,
     SERVER_NAME, SERVER_PORT,
-    INCIDENT_CLASSIFICATIONS, TRANSLATION_MODEL_NAME
+    TRANSLATION_MODEL_NAME,
+    ENABLE_MICRO_BATCHING, ENABLE_SUMMARY_CACHE,
+    ENABLE_LONG_DOCUMENT_MODE, STREAMING_NUM_BEAMS, STREAMING_DEFAULT,
+    ENABLE_GRADIO_UI, INFERENCE_BACKEND,
+    MODEL_LOADING, ENABLE_WARMUP, MODEL_READY_WAIT_S,
+    SUMMARIZER, SUMMARIZER_REGISTRY, ENABLE_LANGUAGE_DETECTION, ENABLE_INCIDENT_SESSIONS,
+    EXECUTOR_WORKERS, EXECUTOR_LANES, PREFORK_WORKERS, PREFORK_THREADS_PER_WORKER,
+    ENABLE_NEAR_DUPLICATE_INDEX, NEAR_DUPLICATE_REUSE, ENABLE_LOG_DENOISE, DENOISE_EXACT_TOKEN_WORDS,
+    ENABLE_EXTRACTIVE_PRERANK,
+    ENABLE_TRANSLATION_CACHE, TRANSLATION_MAX_LENGTH, DRAFT_MODEL_NAME, ENABLE_DRAFT_MODEL
 )
-from ui_config import (
-    CUSTOM_THEME, CUSTOM_CSS, create_animated_header,
-    generate_rich_summary_markdown, create_system_info_card
+from batching import MicroBatcher
+from cache import SummaryCache, make_cache_key, generation_params
+from chunking import reduce_to_window, count_tokens, estimate_model_passes
+from corpus import build_corpus
+from cpu_layout import configure as configure_cpu_layout, run_inference
+from dedup import NearDuplicateIndex, entity_key
+from denoise import denoise
+from executor import InferenceExecutor, ExecutorBusy
+from extractive import select_salient, extractive_budget
+from generation import (
+    encode_text, truncate_ids, truncation_metadata, generate_from_ids, generation_kwargs, generation_metadata,
+    attach_draft_model, resolve_decoding, summary_model_name
 )
+from language import detect_language
+from metrics import (
+    track_stage, model_memory_bytes, BATCH_SIZE, INPUT_TOKENS, OUTPUT_TOKENS,
+    TRUNCATIONS, ERRORS, QUEUE_DEPTH, MODEL_MEMORY, MODEL_LOAD_SECONDS, MODEL_READY, STAGE_SKIPS, ACTIVE_SESSIONS,
+    NEAR_DUPLICATE_REUSES, NEAR_DUPLICATE_ENTRIES, DENOISE_TOKENS_REMOVED
+)
+from readiness import ModelManager, ModelsNotReady
+from sessions import SessionStore, incident_session_key
+from streaming import stream_generate
+from translation import SentenceTranslator, stream_translation
+from templates import (
+    generate_rich_summary_markdown, create_error_card, create_streaming_card,
+    create_system_info_card, create_warmup_card, create_busy_card
+)
+
+# torch, transformers y gradio se importan dentro de las funciones que los usan:
+# así el servidor arranca (y responde a /healthz) sin esperar a esos imports
+
+# Modelos y servicios compartidos, disponibles cuando termina la carga
+Runtime = namedtuple("Runtime", ["device", "tokenizer", "summarizer", "translator", "batcher", "cache", "sessions",
+                                 "near_duplicates", "executor"])
+
+SPANISH_PROMPT_PREFIX = "Resuma este texto del incidente de TI de forma concisa, profesional y **exclusivamente en español**: "
+
+# Modelo de resumen elegido en el registro de config.py
+SUMMARIZER_SPEC = SUMMARIZER_REGISTRY[SUMMARIZER]
+SUMMARIZER_PROMPT_PREFIX = SPANISH_PROMPT_PREFIX if SUMMARIZER_SPEC['use_prompt_prefix'] else ""
 
 # --- CONFIGURACIÓN DEL MODELO ---
-def setup_models():
-    """Configura y retorna los modelos cargados"""
+def setup_models(backend=INFERENCE_BACKEND, model_name=MODEL_NAME, translation_model_name=TRANSLATION_MODEL_NAME,
+                 layout=None, draft_model_name=DRAFT_MODEL_NAME if ENABLE_DRAFT_MODEL else None):
+    """
+    Configura y retorna los modelos cargados con el backend de inferencia indicado.
+    Los nombres de modelo se pueden sustituir (p. ej. modelos diminutos en benchmarks de CI).
+    Resumidor y traductor se cargan en paralelo: la lectura y deserialización de pesos liberan el GIL.
+    Con `draft_model_name` se carga también el modelo borrador y queda en `summarizer.draft_model`.
+    Antes de cargar se aplica la distribución de núcleos `layout` de cpu_layout.py (por defecto la de config.py).
+    """
+    import torch
+    from transformers import pipeline, AutoTokenizer
+    from backends import resolve_backend, load_seq2seq_model, describe_backend
+    
     device = 0 if torch.cuda.is_available() else -1
     print(f"Usando dispositivo: {'GPU (CUDA)' if device != -1 else 'CPU'}")
-    
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    layout = configure_cpu_layout(layout)
+    print(f"🧵 {layout['slots']} ranuras de inferencia × {layout['threads_per_slot']} hilos de torch"
+          f"{' con afinidad de CPU' if layout['affinity'] else ''}")
+    backend = resolve_backend(backend, device)
 
     # CUANTIZACIÓN FP16 (si hay GPU)
     torch_dtype = torch.float16 if device != -1 else torch.float32
 
-    summarizer = pipeline(
-        "summarization", 
-        model=MODEL_NAME, 
-        tokenizer=tokenizer,
-        device=device,
-        torch_dtype=torch_dtype,  # ← CUANTIZACIÓN
-        return_text=False 
-    )
+    load_timings = {}
+    def load_pipeline(task, name, stage, **pipeline_kwargs):
+        with track_stage(stage, load_timings):
+            return pipeline(
+                task,
+                model=load_seq2seq_model(name, backend, torch_dtype),  # ← CUANTIZACIÓN
+                tokenizer=AutoTokenizer.from_pretrained(name),
+                device=device,
+                **pipeline_kwargs
+            )
     
-    translator = pipeline(
-        "translation",
-        model=TRANSLATION_MODEL_NAME,
-        device=device,
-        torch_dtype=torch_dtype   # ← CUANTIZACIÓN
-    )
+    def load_draft(name):
+        with track_stage('load_draft', load_timings):
+            return load_seq2seq_model(name, backend, torch_dtype)
+
+    if draft_model_name and backend == "onnx":
+        print("⚠️ El backend onnx no admite generación asistida: se omite el modelo borrador")
+        draft_model_name = None
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="model-load") as executor:
+        summarizer_future = executor.submit(load_pipeline, "summarization", model_name, 'load_summarizer', return_text=False)
+        translator_future = executor.submit(load_pipeline, "translation", translation_model_name, 'load_translator')
+        draft_future = executor.submit(load_draft, draft_model_name) if draft_model_name else None
+        summarizer, translator = summarizer_future.result(), translator_future.result()
+        draft_model = draft_future.result() if draft_future else None
+    tokenizer = summarizer.tokenizer
+
+    # El borrador propone ids del vocabulario del principal: sin el mismo vocabulario no sirve
+    if draft_model is not None and draft_model.config.vocab_size != summarizer.model.config.vocab_size:
+        print(f"⚠️ {draft_model_name} no comparte vocabulario con {model_name}: se omite el modelo borrador")
+        draft_model = None
+    if draft_model is not None:
+        draft_model = draft_model.to(summarizer.model.device)
+    attach_draft_model(summarizer, draft_model)
+    
+    # Métricas de carga y memoria de pesos por modelo
+    loaded_models = [(model_name, 'load_summarizer', summarizer.model),
+                     (translation_model_name, 'load_translator', translator.model)]
+    if draft_model is not None:
+        loaded_models.append((draft_model_name, 'load_draft', draft_model))
+    for name, stage, model in loaded_models:
+        MODEL_LOAD_SECONDS.set(load_timings[stage] / 1000, model=name)
+        MODEL_MEMORY.set(model_memory_bytes(model), model=name)
 
     # Informar estado de cuantización
-    quantization_status = "FP16" if torch_dtype == torch.float16 else "FP32"
-    print(f"✅ Modelo cuantizado en: {quantization_status}")
+    print(f"✅ Modelo cargado en: {describe_backend(backend, torch_dtype)}")
     
     return device, tokenizer, summarizer, translator
 
 # --- LÓGICA DE PROCESAMIENTO ---
 def classify_incident_type(text):
-    """Clasifica el tipo de incidente basándose en palabras clave"""
-    text_lower = text.lower()
-    for category, keywords in INCIDENT_CLASSIFICATIONS.items():
-        if any(keyword in text_lower for keyword in keywords):
-            return category
-    return "General/Otros"
+    """
+    Clasifica el tipo de incidente por puntuación ponderada de palabras clave.
+    Retorna un dict con 'category', 'confidence' (0-100), 'scores' y 'hits'.
+    """
+    return classify_incident(text)
+
+def summary_language(summary):
+    """Idioma del resumen generado: decide si hace falta la etapa de traducción"""
+    if SUMMARIZER_SPEC['output_language'] == 'es':
+        return 'es'
+    if not ENABLE_LANGUAGE_DETECTION:
+        return SUMMARIZER_SPEC['output_language']
+    return detect_language(summary)
+
+def language_metadata(language):
+    """Metadata por petición del idioma del resumen y las etapas omitidas"""
+    return {'summary_language': language, 'skipped_stages': ['translate'] if language == 'es' else []}
 
 def create_error_response(error_msg):
     """Crea una respuesta de error estandarizada"""
-    from ui_config import create_cyber_card
     error_output = json.dumps({"status": "error", "message": error_msg}, indent=4)
-    error_card = create_cyber_card(
-        content=f"<div class='error-message'><h3>❌ ERROR</h3><p>{error_msg}</p></div>",
-        title="ERROR DEL SISTEMA",
-        icon="🚨",
-        glow_color="#ff4444"
+    return error_output, create_error_card(error_msg)
+
+def encode_prompt(text_input, tokenizer):
+    """IDs del prompt completo (prefijo + incidente), sin truncar ni tokens especiales"""
+    return encode_text(tokenizer, SUMMARIZER_PROMPT_PREFIX + text_input)
+
+def generate_summaries(texts, tokenizer, summarizer, translator, timings=None, stage_info=None, token_ids=None,
+                       profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Resume y traduce una lista de incidentes con una llamada por lotes
+    a cada modelo. Retorna los resúmenes en español en el mismo orden.
+    Si se recibe `timings`, se anotan los milisegundos de cada etapa del lote.
+    Si se recibe `stage_info`, se añade la metadata de idioma, truncado, generación y traducción de cada incidente.
+    `token_ids` reutiliza los ids de `encode_prompt` ya calculados (None por elemento si no los hay).
+    `profile` elige el perfil de generación de GENERATION_PROFILES (uno por lote).
+    """
+    BATCH_SIZE.observe(len(texts))
+    token_ids = token_ids or [None] * len(texts)
+    
+    # 1. Generación de Resumen: se tokeniza una sola vez y generate recibe los ids
+    with track_stage('tokenize', timings):
+        batch_ids, truncations = [], []
+        for text_input, ids in zip(texts, token_ids):
+            if ids is None:
+                ids = encode_prompt(text_input, tokenizer)
+            model_ids, tokens_dropped = truncate_ids(tokenizer, ids, MAX_INPUT_LENGTH)
+            INPUT_TOKENS.observe(len(model_ids))
+            if tokens_dropped:
+                TRUNCATIONS.inc()
+            batch_ids.append(model_ids)
+            truncations.append(truncation_metadata(model_ids, tokens_dropped))
+    
+    summary_params = generation_kwargs(profile, max(len(ids) for ids in batch_ids))
+    
+    # Un único generate sobre el lote relleno (padding); con generación asistida, uno por incidente
+    decoding_stats = {}
+    with track_stage('summarize', timings):
+        bilingual_summaries, output_tokens = generate_from_ids(summarizer, batch_ids, decoding_stats, **summary_params)
+    for generated_tokens in output_tokens:
+        OUTPUT_TOKENS.observe(generated_tokens)
+    
+    # 2. Traducción a español, solo de los resúmenes que no estén ya en español
+    with track_stage('detect_language', timings):
+        languages = [summary_language(summary) for summary in bilingual_summaries]
+    summaries = list(bilingual_summaries)
+    translations = [None] * len(texts)
+    pending = [i for i, language in enumerate(languages) if language != 'es']
+    if pending:
+        with track_stage('translate', timings):
+            translation_results = run_inference(translator, [bilingual_summaries[i] for i in pending],
+                                                batch_size=len(pending), max_length=TRANSLATION_MAX_LENGTH)
+        for i, result in zip(pending, translation_results):
+            summaries[i] = result['translation_text']
+            # Con la caché de frases (SentenceTranslator): aciertos y tiempo ahorrado
+            translations[i] = result.get('translation_cache')
+    if len(pending) < len(texts):
+        STAGE_SKIPS.inc(len(texts) - len(pending), stage='translate')
+    
+    if stage_info is not None:
+        generation = generation_metadata(profile, summary_params, decoding_stats)
+        stage_info.extend({**language_metadata(language), 'truncation': truncation, 'generation': generation,
+                           'translation': translation}
+                          for language, truncation, translation in zip(languages, truncations, translations))
+    return summaries
+
+def generate_summaries_timed(texts, tokenizer, summarizer, translator, token_ids=None, profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Como `generate_summaries`, pero acompaña cada resumen con los tiempos de etapa
+    de su lote y su metadata de idioma y truncado: tuplas (resumen, tiempos, metadata).
+    """
+    timings, stage_info = {}, []
+    summaries = generate_summaries(texts, tokenizer, summarizer, translator, timings, stage_info, token_ids, profile)
+    return [(summary, dict(timings, batch_size=len(texts)), info) for summary, info in zip(summaries, stage_info)]
+
+def generate_summaries_by_profile(items, tokenizer, summarizer, translator):
+    """
+    Lote del micro-batcher con elementos (texto, ids, perfil): los parámetros de
+    `generate` son por llamada, así que se hace una llamada por perfil presente.
+    """
+    groups = {}
+    for index, (_, _, profile) in enumerate(items):
+        groups.setdefault(profile, []).append(index)
+    results = [None] * len(items)
+    for profile, indices in groups.items():
+        group_results = generate_summaries_timed([items[i][0] for i in indices], tokenizer, summarizer, translator,
+                                                 [items[i][1] for i in indices], profile)
+        for index, result in zip(indices, group_results):
+            results[index] = result
+    return results
+
+def encode_within_window(text_input, tokenizer):
+    """
+    Tokeniza el prompt una sola vez y retorna sus ids (reutilizados al generar),
+    o None si no cabe en MAX_INPUT_LENGTH. El conteo de palabras evita tokenizar logs enormes.
+    """
+    if len(text_input.split()) > MAX_INPUT_LENGTH:
+        return None
+    ids = encode_prompt(text_input, tokenizer)
+    if len(ids) + tokenizer.num_special_tokens_to_add(pair=False) > MAX_INPUT_LENGTH:
+        return None
+    return ids
+
+def token_count(text, tokenizer):
+    """
+    Tokens del texto: exactos hasta DENOISE_EXACT_TOKEN_WORDS palabras; por encima se
+    extrapola la razón tokens/palabra de ese prefijo. Retorna (tokens, es_estimación).
+    """
+    words = text.split()
+    if len(words) <= DENOISE_EXACT_TOKEN_WORDS:
+        return count_tokens(text, tokenizer), False
+    sample_tokens = count_tokens(" ".join(words[:DENOISE_EXACT_TOKEN_WORDS]), tokenizer)
+    return round(sample_tokens * len(words) / DENOISE_EXACT_TOKEN_WORDS), True
+
+def denoise_for_model(text_input, tokenizer, timings=None):
+    """
+    Pre-etapa de reducción de ruido: retorna (texto para el modelo, metadata) o
+    (texto original, None) si está desactivada. La metadata compara los tokens
+    antes y después y estima la aceleración por las pasadas del modelo evitadas
+    (una ventana en vez del map-reduce de documento largo).
+    """
+    if not ENABLE_LOG_DENOISE:
+        return text_input, None
+    start = time.perf_counter()
+    with track_stage('denoise', timings):
+        model_text, metadata = denoise(text_input)
+    metadata['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    
+    tokens_in, estimated_in = token_count(text_input, tokenizer)
+    tokens_out, estimated_out = token_count(model_text, tokenizer) if model_text != text_input else (tokens_in, estimated_in)
+    passes_in, passes_out = estimate_model_passes(tokens_in), estimate_model_passes(tokens_out)
+    DENOISE_TOKENS_REMOVED.inc(max(0, tokens_in - tokens_out))
+    metadata.update({
+        'tokens_in': tokens_in,
+        'tokens_out': tokens_out,
+        'tokens_estimated': estimated_in or estimated_out,
+        'token_reduction_ratio': round(1 - tokens_out / tokens_in, 4) if tokens_in else 0.0,
+        'model_passes_in': passes_in,
+        'model_passes_out': passes_out,
+        'estimated_speedup': round(passes_in / passes_out, 2),
+    })
+    return model_text, metadata
+
+def prepare_model_input(text_input, tokenizer, timings=None, extraction=None):
+    """
+    Texto que recibe el modelo y sus ids (None si no cabe en la ventana). Lo que cabe
+    en MAX_INPUT_LENGTH llega intacto; si no cabe, reducción de ruido y, si aun así no
+    cabe, preselección extractiva de las frases más relevantes dentro de
+    `extractive_budget()` en vez de quedarse con los primeros tokens.
+    Las entidades de `extraction` (texto original) marcan las frases que las mencionan.
+    Retorna (texto, ids, metadata de `denoise`, metadata de `extractive`).
+    """
+    token_ids = encode_within_window(text_input, tokenizer)
+    if token_ids is not None:
+        return text_input, token_ids, None, None
+    model_text, denoise_metadata = denoise_for_model(text_input, tokenizer, timings)
+    token_ids = encode_within_window(model_text, tokenizer) if model_text != text_input else None
+    if token_ids is not None or not ENABLE_EXTRACTIVE_PRERANK:
+        return model_text, token_ids, denoise_metadata, None
+    
+    budget = extractive_budget()
+    if budget > MAX_INPUT_LENGTH:
+        # Lo que ya cabe en el presupuesto va entero al map-reduce, sin puntuar frases
+        tokens = denoise_metadata['tokens_out'] if denoise_metadata else token_count(model_text, tokenizer)[0]
+        if tokens <= budget:
+            return model_text, None, denoise_metadata, None
+    special_tokens = tokenizer.num_special_tokens_to_add(pair=False)
+    start = time.perf_counter()
+    with track_stage('extractive_prerank', timings):
+        model_text, extractive_metadata = select_salient(
+            model_text, budget, lambda text: len(encode_prompt(text, tokenizer)) + special_tokens,
+            extraction[0] if extraction is not None else None
+        )
+    extractive_metadata['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return model_text, encode_within_window(model_text, tokenizer), denoise_metadata, extractive_metadata
+
+def generate_long_summary(text_input, tokenizer, summarizer, translator, profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Modo documento largo: resume ventanas solapadas (map), reduce
+    jerárquicamente y hace el resumen final sobre los parciales (reduce).
+    """
+    with track_stage('long_document_map'):
+        options = generation_kwargs(profile)
+        reduced_text, long_document_metadata = reduce_to_window(text_input, tokenizer, summarizer,
+                                                                options['num_beams'], options['decoding'])
+    
+    start = time.perf_counter()
+    stage_info = []
+    summary_text_output = generate_summaries([reduced_text], tokenizer, summarizer, translator, stage_info=stage_info,
+                                             profile=profile)[0]
+    long_document_metadata['final_step_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    
+    return summary_text_output, long_document_metadata, stage_info[0]
+
+def generate_one(text_input, token_ids, tokenizer, summarizer, translator, batcher=None,
+                 profile=DEFAULT_GENERATION_PROFILE):
+    """Resume un incidente ya tokenizado (agrupado si hay batcher): (resumen, tiempos, metadata)"""
+    if batcher is not None:
+        return batcher.submit((text_input, token_ids, profile))
+    return generate_summaries_timed([text_input], tokenizer, summarizer, translator, [token_ids], profile)[0]
+
+def generate_session_summary(session_key, text_input, tokenizer, summarizer, translator, batcher, sessions,
+                             profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Modo sesión: solo el texto añadido desde la última actualización del incidente
+    pasa por el modelo (ventanas selladas); el resumen ejecutivo se rehace sobre
+    los resúmenes ya calculados más la cola pendiente, con entrada acotada a una ventana.
+    Retorna (resumen, tiempos del lote, metadata de etapas, metadata de la sesión).
+    """
+    options = generation_kwargs(profile)
+    num_beams, decoding = options['num_beams'], options['decoding']
+    session = sessions.get_or_create(session_key)
+    with session.lock:
+        session_metadata = session.advance(text_input, tokenizer, summarizer, num_beams=num_beams, decoding=decoding)
+        prefix_ids = encode_prompt("", tokenizer)
+        budget = MAX_INPUT_LENGTH - tokenizer.num_special_tokens_to_add(pair=False) - len(prefix_ids)
+        token_ids = prefix_ids + session.summary_input(tokenizer, summarizer, budget, num_beams, decoding)
+    
+    summary_text_output, batch_timings, stage_metadata = generate_one(
+        text_input, token_ids, tokenizer, summarizer, translator, batcher, profile
     )
-    return error_output, error_card
+    return summary_text_output, batch_timings, stage_metadata, session_metadata
 
-def summarize_incident_and_process(text_input, tokenizer, summarizer, translator):
+def summarize_incident_and_process(text_input, tokenizer, summarizer, translator, batcher=None, cache=None, render=True,
+                                   sessions=None, queue_metadata=None, profile=DEFAULT_GENERATION_PROFILE,
+                                   near_duplicates=None):
     """
-    Procesa el texto del incidente: resume, traduce y genera salidas
+    Procesa el texto del incidente: resume, traduce y genera salidas.
+    Si se recibe un `batcher`, la generación se agrupa con otras peticiones concurrentes.
+    Si se recibe una `cache`, los textos ya resumidos no vuelven a pasar por los modelos.
+    Si se reciben `sessions` y el texto trae un ID de incidente, solo se resume lo añadido.
+    `queue_metadata` (carril, profundidad y espera en el ejecutor) se añade a la metadata.
+    `profile` elige el perfil de generación (fast / balanced / quality) y forma parte de la clave de caché.
+    Si se recibe `near_duplicates`, un incidente casi idéntico a uno ya resumido reutiliza (u ofrece) su resumen.
+    Fuera del modo sesión, el modelo recibe el texto sin ruido de logs y, si no cabe en la
+    ventana, solo las frases más relevantes (`prepare_model_input`); entidades y
+    clasificación usan siempre el texto original.
+    Con `render=False` (API) se omite el panel HTML y se retorna (json_output, None).
     """
-    if not text_input or len(text_input.split()) < MIN_LENGTH:
-        error_msg = f"El texto es demasiado corto. Mínimo {MIN_LENGTH} palabras requeridas."
+    error_msg = validate_incident_text(text_input)
+    if error_msg:
+        ERRORS.inc(type='validation')
         return create_error_response(error_msg)
     
     try:
-        # 1. Generación de Resumen
-        spanish_prompt_prefix = "Resuma este texto del incidente de TI de forma concisa, profesional y **exclusivamente en español**: "
-        input_with_prompt = spanish_prompt_prefix + text_input
-        
-        tokenized_input = tokenizer(input_with_prompt, max_length=MAX_INPUT_LENGTH, truncation=True, return_tensors="pt")
-        safe_text_input = tokenizer.decode(tokenized_input.input_ids[0], skip_special_tokens=True)
-        
-        summary_params = {
-            'max_length': MAX_LENGTH,
-            'min_length': MIN_LENGTH,
-            'do_sample': DO_SAMPLE,
-            'num_beams': NUM_BEAMS
-        }
-        
-        summary_result = summarizer(safe_text_input, **summary_params)
-        bilingual_summary = summary_result[0]['summary_text']
-        
-        # 2. Traducción a español
-        translation_result = translator(bilingual_summary, max_length=260)
-        summary_text_output = translation_result[0]['translation_text']
-        
-        # 3. Clasificación y formateo
-        incident_type = classify_incident_type(text_input)
-        confidence_score_estimate = 90.0 
-        
-        model_metadata = {
-            'model_name': MODEL_NAME, 
-            'translation_model': TRANSLATION_MODEL_NAME, 
-            'min_length': MIN_LENGTH, 
-            'max_length': MAX_LENGTH
-        }
-        
-        json_output = format_as_json(
+        start = time.perf_counter()
+        timings = {}
+        
+        # 0. Consulta de caché por contenido
+        with track_stage('cache_lookup', timings):
+            cache_key = make_cache_key(text_input, generation_params(profile)) if cache is not None else None
+            summary_text_output = cache.get(cache_key) if cache is not None else None
+        cache_hit = summary_text_output is not None
+        # Una sola extracción de entidades por petición: el par (entidades, conteos) sirve a la
+        # clave de sesión, la deduplicación, la selección extractiva y el resultado sin volver a
+        # escanear el texto
+        with track_stage('extract_entities', timings):
+            extraction = extract_entities(text_input)
+        long_document_metadata = None
+        session_metadata = None
+        denoise_metadata = None
+        extractive_metadata = None
+        stage_metadata = {}
+        session_key = incident_session_key(text_input, extraction) if sessions is not None and not cache_hit else None
+        
+        # 0b. Casi duplicados (misma tormenta de alertas con otras IPs, IDs u horas). Una sesión
+        # ya abierta no se consulta: su versión anterior sería siempre el "duplicado" más parecido
+        near_duplicate_metadata = None
+        signature = None
+        entities_key = None
+        if near_duplicates is not None and not cache_hit and (session_key is None or session_key not in sessions):
+            # La firma enmascara hosts, IPs e IDs: el resumen ajeno solo se reutiliza si las entidades coinciden
+            entities_key = entity_key(extraction[0])
+            with track_stage('near_duplicate_lookup', timings):
+                similar_summary, similarity, signature, same_entities = near_duplicates.lookup(
+                    text_input, generation_params(profile), entities_key
+                )
+            near_duplicate_metadata = {'matched': similar_summary is not None, 'similarity': similarity,
+                                       'same_entities': same_entities,
+                                       'reused': similar_summary is not None and NEAR_DUPLICATE_REUSE and same_entities}
+            if near_duplicate_metadata['reused']:
+                # Prestado de otro incidente: no se guarda en la caché exacta bajo la clave de este texto
+                summary_text_output = similar_summary
+                session_key = None
+                NEAR_DUPLICATE_REUSES.inc()
+            elif similar_summary is not None:
+                near_duplicate_metadata['summary'] = similar_summary
+        reused = near_duplicate_metadata is not None and near_duplicate_metadata['reused']
+        
+        # 1-2. Resumen y traducción (por lotes si hay micro-batching)
+        if session_key is not None and not reused:
+            with track_stage('session_update', timings):
+                summary_text_output, batch_timings, stage_metadata, session_metadata = generate_session_summary(
+                    session_key, text_input, tokenizer, summarizer, translator, batcher, sessions, profile
+                )
+            timings.update(batch_timings)
+            if cache is not None:
+                cache.put(cache_key, summary_text_output)
+        elif not cache_hit and not reused:
+            # Las sesiones no pasan por aquí: los contadores "×N" cambian entre versiones
+            # del texto y romperían la detección de lo añadido
+            model_text, token_ids, denoise_metadata, extractive_metadata = prepare_model_input(
+                text_input, tokenizer, timings, extraction
+            )
+            if ENABLE_LONG_DOCUMENT_MODE and token_ids is None:
+                with track_stage('long_document', timings):
+                    summary_text_output, long_document_metadata, stage_metadata = generate_long_summary(
+                        model_text, tokenizer, summarizer, translator, profile
+                    )
+            else:
+                with track_stage('generate_total', timings):
+                    summary_text_output, batch_timings, stage_metadata = generate_one(
+                        model_text, token_ids, tokenizer, summarizer, translator, batcher, profile
+                    )
+                timings.update(batch_timings)
+            if cache is not None:
+                cache.put(cache_key, summary_text_output)
+        if near_duplicates is not None and not cache_hit and not reused:
+            near_duplicates.add(text_input, summary_text_output, generation_params(profile), signature,
+                                entities_key or entity_key(extraction[0]))
+        
+        # 3-4. Clasificación, formateo y salida visual
+        return build_outputs(text_input, summary_text_output, {
+            'cache_hit': cache_hit,
+            'cache_stats': cache.stats() if cache is not None else None,
+            'near_duplicate': near_duplicate_metadata,
+            'denoise': denoise_metadata,
+            'extractive': extractive_metadata,
+            'long_document': long_document_metadata,
+            'session': session_metadata,
+            'queue': queue_metadata,
+            **stage_metadata,
+            'timings_ms': timings
+        }, render=render, start=start, profile=profile, extraction=extraction)
+        
+    except Exception as e:
+        ERRORS.inc(type=type(e).__name__)
+        error_msg = f"Error en el procesamiento: {str(e)}"
+        return create_error_response(error_msg)
+
+def build_outputs(text_input, summary_text_output, extra_metadata, render=True, start=None,
+                  profile=DEFAULT_GENERATION_PROFILE, extraction=None):
+    """
+    Clasifica el incidente y genera el JSON y el panel HTML a partir del resumen final.
+    Si `extra_metadata` trae `timings_ms`, se completa con las etapas previas al JSON.
+    Si trae `generation` (límites efectivos y decodificación), pasa a `model_metadata`
+    y decide qué modelo se informa (el borrador si generó él).
+    `extraction` pasa tal cual a build_result.
+    """
+    timings = extra_metadata.get('timings_ms')
+    
+    # 3. Clasificación y formateo
+    with track_stage('classify_incident_type', timings):
+        classification = classify_incident_type(text_input)
+    extra_metadata['classification'] = {'scores': classification['scores'], 'hits': classification['hits']}
+    
+    # En aciertos de caché no hubo generate: se informan los límites nominales del perfil
+    generation = extra_metadata.pop('generation', None) or generation_metadata(profile, generation_kwargs(profile))
+    model_metadata = {
+        'model_name': summary_model_name(generation['decoding']),
+        'translation_model': TRANSLATION_MODEL_NAME,
+        **generation
+    }
+    
+    if timings is not None and start is not None:
+        timings['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    
+    with track_stage('format_as_json'):
+        result = build_result(
             summary_text_output, 
             text_input, 
-            incident_type,
+            classification['category'],
             model_metadata,
-            confidence=confidence_score_estimate
+            confidence=classification['confidence'],
+            extra_metadata=extra_metadata,
+            extraction=extraction
         )
+        json_output = json.dumps(result, indent=4, ensure_ascii=False)
+    
+    if not render:
+        return json_output, None
+    
+    # 4. Generar salida visual directamente desde el dict (sin volver a parsear el JSON)
+    with track_stage('render_html'):
+        rich_markdown_output = generate_rich_summary_markdown(result)
+    
+    return json_output, rich_markdown_output
+
+def stream_incident(text_input, tokenizer, summarizer, translator, cache=None, queue_metadata=None,
+                    profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Versión en streaming del procesamiento. Produce eventos (tipo, payload):
+    'status', 'summary' y 'translation' con texto parcial, y al final 'final'
+    (o 'error') con la tupla (json_output, html) de siempre.
+    """
+    error_msg = validate_incident_text(text_input)
+    if error_msg:
+        ERRORS.inc(type='validation')
+        yield 'error', create_error_response(error_msg)
+        return
+    
+    try:
+        start = time.perf_counter()
+        # Los streamers de transformers no admiten beam search: la clave lo refleja
+        cache_key = make_cache_key(text_input, {**generation_params(profile), 'num_beams': STREAMING_NUM_BEAMS})
+        summary_text_output = cache.get(cache_key) if cache is not None else None
+        if summary_text_output is not None:
+            yield 'final', build_outputs(text_input, summary_text_output, {
+                'cache_hit': True,
+                'cache_stats': cache.stats(),
+                'queue': queue_metadata
+            }, profile=profile)
+            return
+        
+        # Los documentos largos se reducen primero; el paso final sí se transmite
+        model_text, token_ids, denoise_metadata, extractive_metadata = prepare_model_input(text_input, tokenizer)
+        long_document_metadata = None
+        if ENABLE_LONG_DOCUMENT_MODE and token_ids is None:
+            yield 'status', {'message': 'Documento largo: resumiendo ventanas...'}
+            options = generation_kwargs(profile)
+            source_text, long_document_metadata = reduce_to_window(model_text, tokenizer, summarizer,
+                                                                   options['num_beams'], options['decoding'])
+            token_ids = encode_prompt(source_text, tokenizer)
+        elif token_ids is None:
+            token_ids = encode_prompt(model_text, tokenizer)
+        model_ids, tokens_dropped = truncate_ids(tokenizer, token_ids, MAX_INPUT_LENGTH)
+        stream_params = dict(generation_kwargs(profile, len(model_ids)), num_beams=STREAMING_NUM_BEAMS)
+        stream_params.pop('early_stopping', None)
         
-        # 4. Generar salida visual
-        data_dict = json.loads(json_output)
-        rich_markdown_output = generate_rich_summary_markdown(data_dict)
+        # 1. Resumen parcial token a token
+        time_to_first_token_ms = None
+        bilingual_summary = ""
+        for partial in stream_generate(summarizer, model_ids, MAX_INPUT_LENGTH, **stream_params):
+            if time_to_first_token_ms is None:
+                time_to_first_token_ms = round((time.perf_counter() - start) * 1000, 2)
+            bilingual_summary = partial
+            yield 'summary', {'text': partial}
         
-        return json_output, rich_markdown_output
+        # 2. Traducción parcial sobre el resumen completo (se omite si ya está en español)
+        language = summary_language(bilingual_summary)
+        if language == 'es':
+            STAGE_SKIPS.inc(stage='translate')
+            summary_text_output = bilingual_summary
+        else:
+            summary_text_output = ""
+            for partial in stream_translation(translator, bilingual_summary, MAX_INPUT_LENGTH, TRANSLATION_MAX_LENGTH):
+                summary_text_output = partial
+                yield 'translation', {'text': partial}
+        
+        if cache is not None:
+            cache.put(cache_key, summary_text_output)
+        
+        yield 'final', build_outputs(text_input, summary_text_output, {
+            'cache_hit': False,
+            'cache_stats': cache.stats() if cache is not None else None,
+            'denoise': denoise_metadata,
+            'extractive': extractive_metadata,
+            'long_document': long_document_metadata,
+            'queue': queue_metadata,
+            **language_metadata(language),
+            'truncation': truncation_metadata(model_ids, tokens_dropped),
+            'generation': generation_metadata(profile, dict(
+                stream_params, decoding=resolve_decoding(summarizer, stream_params['decoding'])
+            )),
+            'translation_cache': translator.stats() if isinstance(translator, SentenceTranslator) else None,
+            'streaming': {
+                'num_beams': STREAMING_NUM_BEAMS,
+                'time_to_first_token_ms': time_to_first_token_ms,
+                'total_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+        }, profile=profile)
         
     except Exception as e:
+        ERRORS.inc(type=type(e).__name__)
         error_msg = f"Error en el procesamiento: {str(e)}"
-        return create_error_response(error_msg)
+        yield 'error', create_error_response(error_msg)
+
+def process_for_ui(text_input, streaming, tokenizer, summarizer, translator, batcher=None, cache=None, sessions=None,
+                   queue_metadata=None, profile=DEFAULT_GENERATION_PROFILE, near_duplicates=None):
+    """Función generadora para Gradio: transmite parciales o entrega el resultado completo"""
+    if not streaming:
+        yield summarize_incident_and_process(text_input, tokenizer, summarizer, translator, batcher, cache,
+                                             sessions=sessions, queue_metadata=queue_metadata, profile=profile,
+                                             near_duplicates=near_duplicates)
+        return
+    
+    for event, payload in stream_incident(text_input, tokenizer, summarizer, translator, cache, queue_metadata,
+                                          profile):
+        if event in ('final', 'error'):
+            yield payload
+        elif event == 'status':
+            yield "", create_streaming_card(payload['message'], "")
+        else:
+            stage = "RESUMEN (INGLÉS)" if event == 'summary' else "TRADUCCIÓN AL ESPAÑOL"
+            yield "", create_streaming_card(stage, payload['text'])
+
+def setup_services(tokenizer, summarizer, translator):
+    """Crea el planificador de micro-lotes, la caché, las sesiones y el índice de casi duplicados de UI y API"""
+    batcher = None
+    if ENABLE_MICRO_BATCHING:
+        # Cada elemento es (texto, ids de encode_within_window o None, perfil de generación)
+        batcher = MicroBatcher(lambda items: generate_summaries_by_profile(items, tokenizer, summarizer, translator))
+        QUEUE_DEPTH.set_function(batcher.queue_depth)
+    cache = SummaryCache() if ENABLE_SUMMARY_CACHE else None
+    sessions = SessionStore() if ENABLE_INCIDENT_SESSIONS else None
+    if sessions is not None:
+        ACTIVE_SESSIONS.set_function(lambda: len(sessions))
+    near_duplicates = NearDuplicateIndex() if ENABLE_NEAR_DUPLICATE_INDEX else None
+    if near_duplicates is not None:
+        NEAR_DUPLICATE_ENTRIES.set_function(lambda: len(near_duplicates))
+    return batcher, cache, sessions, near_duplicates
+
+def with_translation_cache(translator):
+    """Traductor por frases con caché (ENABLE_TRANSLATION_CACHE) en lugar del pipeline directo"""
+    return SentenceTranslator(translator) if ENABLE_TRANSLATION_CACHE else translator
+
+def load_runtime(models=None):
+    """
+    Carga modelos y servicios; lo ejecuta ModelManager en segundo plano.
+    Con `models` (la tupla de `setup_models` ya cargada en el padre en modo
+    prefork) solo se crean los servicios, que usan hilos propios de cada proceso.
+    """
+    device, tokenizer, summarizer, translator = models or setup_models()
+    translator = with_translation_cache(translator)
+    batcher, cache, sessions, near_duplicates = setup_services(tokenizer, summarizer, translator)
+    # Toda inferencia (UI y API) pasa por el ejecutor: admisión acotada, prioridad y plazos
+    executor = InferenceExecutor(EXECUTOR_WORKERS if ENABLE_MICRO_BATCHING else 1)
+    return Runtime(device, tokenizer, summarizer, translator, batcher, cache, sessions, near_duplicates, executor)
+
+def warm_up(runtime):
+    """
+    Inferencia de calentamiento con un incidente sintético: inicializa kernels
+    y asignadores para que la primera petición real no pague ese coste.
+    No pasa por la caché para no guardar un resumen que nadie pidió.
+    """
+    with track_stage('warmup'):
+        generate_summaries(build_corpus([MIN_LENGTH + 20]), runtime.tokenizer, runtime.summarizer, runtime.translator)
+
+def create_model_manager(loading=MODEL_LOADING, warmup=ENABLE_WARMUP, models=None):
+    """Crea el gestor de carga y la inicia según el modo de arranque configurado"""
+    manager = ModelManager(lambda: load_runtime(models), warm_up if warmup else None)
+    MODEL_READY.set_function(lambda: int(manager.ready))
+    if loading == "eager":
+        manager.start()
+        manager.wait()
+    elif loading == "background":
+        manager.start()
+    return manager
 
 # --- CONFIGURACIÓN DE LA INTERFAZ ---
-def create_interface(device, tokenizer, summarizer, translator):
-    """Crea y configura la interfaz de Gradio"""
+def create_interface(manager):
+    """
+    Crea y configura la interfaz de Gradio. Se construye antes de que terminen
+    de cargar los modelos: mientras tanto muestra el estado de calentamiento.
+    """
+    import gradio as gr
+    from ui_config import CUSTOM_THEME, CUSTOM_CSS, create_animated_header
+    
+    def system_status():
+        if manager.ready:
+            return create_system_info_card(manager.runtime.device, MODEL_NAME, TRANSLATION_MODEL_NAME), gr.Timer(active=False)
+        return create_warmup_card(manager.status()), gr.Timer(active=manager.state != "failed")
     
     with gr.Blocks(theme=CUSTOM_THEME, css=CUSTOM_CSS, 
                   title="🤖 CyberAnalyzer - Sistema de Análisis de Incidentes") as iface:
@@ -152,22 +742,35 @@ def create_interface(device, tokenizer, summarizer, translator):
                     show_label=False
                 )
             with gr.Column(scale=1):
-                system_info = create_system_info_card(device, MODEL_NAME, TRANSLATION_MODEL_NAME)
-                gr.HTML(system_info)
+                system_info = gr.HTML(system_status()[0])
+                status_timer = gr.Timer(1.0)
         
         # Botón de acción
         with gr.Row():
             analyze_btn = gr.Button(
                 "🚀 INICIAR ANÁLISIS AUTOMÁTICO", 
                 variant="primary", 
+                scale=4
+            )
+            streaming_toggle = gr.Checkbox(
+                value=STREAMING_DEFAULT,
+                label="⚡ STREAMING (RESULTADOS PARCIALES)",
                 scale=1
             )
+            cancel_btn = gr.Button("⛔ CANCELAR", variant="stop", scale=1)
+        
+        with gr.Row():
+            profile_selector = gr.Radio(
+                choices=list(GENERATION_PROFILES),
+                value=DEFAULT_GENERATION_PROFILE,
+                label="🎚️ PERFIL DE GENERACIÓN (fast: triaje rápido · quality: post-mortem)"
+            )
         
         # Pestañas de resultados
         with gr.Tabs():
             with gr.TabItem("📊 PANEL DE ANÁLISIS"):
                 rich_output = gr.HTML(
-                    "<div class='waiting-message'>⏳ El sistema está listo. Ingrese un incidente y haga clic en 'INICIAR ANÁLISIS AUTOMÁTICO'</div>"
+                    "<div class='waiting-message'>⏳ Ingrese un incidente y haga clic en 'INICIAR ANÁLISIS AUTOMÁTICO'</div>"
                 )
             
             with gr.TabItem("⚙️ DATOS TÉCNICOS (JSON)"):
@@ -177,33 +780,102 @@ def create_interface(device, tokenizer, summarizer, translator):
                     show_label=True
                 )
         
-        # Conectar el botón con la función de procesamiento
-        analyze_btn.click(
-            fn=lambda text: summarize_incident_and_process(text, tokenizer, summarizer, translator),
-            inputs=text_input,
-            outputs=[json_output, rich_output]
+        # Conectar el botón con la función de procesamiento (generadora para streaming)
+        def run_analysis(text, streaming, profile):
+            try:
+                runtime = manager.get(MODEL_READY_WAIT_S)
+            except ModelsNotReady:
+                status = manager.status()
+                yield json.dumps(status, indent=4, ensure_ascii=False), create_warmup_card(status)
+                return
+            # Carril interactivo: se adelanta a los lotes de la API; cancelar o cerrar la pestaña lo retira de la cola
+            try:
+                yield from runtime.executor.stream(
+                    lambda job: process_for_ui(text, streaming, runtime.tokenizer, runtime.summarizer,
+                                               runtime.translator, runtime.batcher, runtime.cache, runtime.sessions,
+                                               queue_metadata=job.queue_info, profile=profile,
+                                               near_duplicates=runtime.near_duplicates),
+                    "interactive"
+                )
+            except ExecutorBusy as e:
+                yield create_error_response(str(e))[0], create_busy_card(str(e))
+        
+        status_timer.tick(fn=system_status, outputs=[system_info, status_timer])
+        
+        # Gradio solo deja pasar al ejecutor lo que su carril interactivo puede admitir
+        analysis_event = analyze_btn.click(
+            fn=run_analysis,
+            inputs=[text_input, streaming_toggle, profile_selector],
+            outputs=[json_output, rich_output],
+            concurrency_limit=EXECUTOR_WORKERS + EXECUTOR_LANES['interactive']['max_queue']
         )
+        cancel_btn.click(fn=None, cancels=[analysis_event])
     
     return iface
 
 # --- INICIALIZACIÓN ---
+def create_app(manager, api_only=False):
+    """Aplicación ASGI (API REST y, opcionalmente, la interfaz Gradio) sobre el gestor de modelos"""
+    def process(text, lane="interactive", deadline_s=None, profile=None):
+        runtime = manager.get(MODEL_READY_WAIT_S)
+        return runtime.executor.submit(
+            lambda job: summarize_incident_and_process(text, runtime.tokenizer, runtime.summarizer, runtime.translator,
+                                                       runtime.batcher, runtime.cache, render=False,
+                                                       sessions=runtime.sessions, queue_metadata=job.queue_info,
+                                                       profile=profile or DEFAULT_GENERATION_PROFILE,
+                                                       near_duplicates=runtime.near_duplicates)[0],
+            lane, deadline_s
+        )
+    
+    def stream(text, profile=None):
+        runtime = manager.get(MODEL_READY_WAIT_S)
+        return runtime.executor.stream(
+            lambda job: stream_incident(text, runtime.tokenizer, runtime.summarizer, runtime.translator, runtime.cache,
+                                        job.queue_info, profile or DEFAULT_GENERATION_PROFILE),
+            "interactive"
+        )
+    
+    # API REST (/summarize, /summarize/batch, /summarize/stream, /healthz, /readyz) con los mismos modelos
+    app = create_api(process, stream, manager.status)
+    
+    # Interfaz Gradio montada en el mismo proceso (opcional)
+    if ENABLE_GRADIO_UI and not api_only:
+        import gradio as gr
+        iface = create_interface(manager)
+        app = gr.mount_gradio_app(app, iface, path="/")
+    else:
+        print("ℹ️ Modo solo API: interfaz Gradio deshabilitada")
+    return app
+
 def main():
     """Función principal de la aplicación"""
+    parser = argparse.ArgumentParser(description="Microagente de Resumen de Incidentes")
+    parser.add_argument("--api-only", action="store_true", help="Expone solo la API REST, sin la interfaz Gradio")
+    parser.add_argument("--workers", type=int, default=PREFORK_WORKERS,
+                        help="Procesos worker que comparten los pesos por copy-on-write (>1: modo prefork, solo API)")
+    parser.add_argument("--threads", type=int, default=PREFORK_THREADS_PER_WORKER,
+                        help="Hilos de torch por worker en modo prefork (por defecto: núcleos / workers)")
+    args = parser.parse_args()
+    
     print("🚀 Iniciando Microagente de Resumen de Incidentes...")
     
-    # Configurar modelos
-    device, tokenizer, summarizer, translator = setup_models()
+    if args.workers > 1:
+        # Los modelos se cargan una vez en el padre; cada worker crea sus servicios y su app.
+        # La cola de Gradio guarda estado por proceso: en prefork solo se sirve la API
+        from prefork import serve_prefork
+        serve_prefork(
+            setup_models,
+            lambda models: create_app(create_model_manager("background", ENABLE_WARMUP, models), api_only=True),
+            args.workers, args.threads
+        )
+        return
     
-    # Crear interfaz
-    iface = create_interface(device, tokenizer, summarizer, translator)
+    # Carga de modelos en segundo plano (o perezosa): el servidor responde desde ya
+    app = create_app(create_model_manager(), args.api_only)
     
     # Lanzar aplicación
     print(f"🌐 Servidor iniciado en: {SERVER_NAME}:{SERVER_PORT}")
-    iface.launch(
-        server_name=SERVER_NAME,
-        server_port=SERVER_PORT,
-        share=False
-    )
+    uvicorn.run(app, host=SERVER_NAME, port=SERVER_PORT)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
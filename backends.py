@@ -0,0 +1,65 @@
+# backends.py
+import os
+
+import torch
+from transformers import AutoModelForSeq2SeqLM
+
+from config import ONNX_CACHE_DIR
+
+BACKENDS = ("pytorch", "pytorch-int8", "onnx")
+
+
+def resolve_backend(backend, device):
+    """Valida el backend; INT8 dinámico y ONNX Runtime solo aplican a nodos CPU"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferencia desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+    if backend != "pytorch" and device != -1:
+        print(f"⚠️ Backend '{backend}' orientado a CPU; con GPU se usa 'pytorch' (FP16)")
+        return "pytorch"
+    return backend
+
+
+def onnx_export_dir(model_name):
+    """Directorio donde se cachea la exportación ONNX de un modelo"""
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def load_onnx_model(model_name):
+    """
+    Carga el modelo con ONNX Runtime (encoder + decoder con KV cache).
+    La primera vez exporta desde PyTorch y guarda los artefactos en disco.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError("El backend 'onnx' requiere `pip install optimum[onnxruntime]`") from e
+
+    export_dir = onnx_export_dir(model_name)
+    if os.path.isdir(export_dir):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+
+    print(f"📦 Exportando {model_name} a ONNX (solo la primera vez)...")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+def load_seq2seq_model(model_name, backend, torch_dtype):
+    """Carga un modelo seq2seq con el backend de inferencia indicado"""
+    if backend == "onnx":
+        return load_onnx_model(model_name)
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, torch_dtype=torch_dtype)
+    if backend == "pytorch-int8":
+        # Cuantización dinámica: pesos de las capas lineales en INT8, activaciones en FP32
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.eval()
+
+
+def describe_backend(backend, torch_dtype):
+    """Etiqueta legible del backend y la precisión efectiva"""
+    if backend == "onnx":
+        return "ONNX Runtime (FP32)"
+    if backend == "pytorch-int8":
+        return "PyTorch INT8 dinámico"
+    return f"PyTorch {'FP16' if torch_dtype == torch.float16 else 'FP32'}"
@@ -0,0 +1,135 @@
+# batching.py
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+
+
+class MicroBatcher:
+    """
+    Cola de peticiones que agrupa incidentes concurrentes durante una ventana
+    corta (tamaño máximo / espera máxima) y los procesa en una sola llamada
+    por lotes. Cada llamador recibe únicamente su propio resultado.
+    """
+
+    def __init__(self, process_batch_fn, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        self.process_batch_fn = process_batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def queue_depth(self):
+        """Peticiones esperando a entrar en un lote"""
+        return self._queue.qsize()
+
+    def submit(self, item):
+        """Encola un elemento y bloquea hasta obtener su resultado"""
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _collect_batch(self):
+        """Espera el primer elemento y acumula más hasta llenar el lote o agotar la ventana"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            items = [item for item, _ in batch]
+            try:
+                results = self.process_batch_fn(items)
+            except Exception as e:
+                # Un fallo del lote se propaga a todos sus llamadores
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+# --- MEDICIÓN BAJO CARGA ---
+def percentile(values, pct):
+    """Percentil por rango más cercano (sin dependencias externas)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure_under_load(process_one_fn, texts, concurrency):
+    """
+    Lanza `texts` con `concurrency` clientes simultáneos y retorna
+    throughput (peticiones/s) y latencias p50/p95 en milisegundos.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def timed_call(text):
+        start = time.perf_counter()
+        process_one_fn(text)
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed_call, texts))
+    wall_time = time.perf_counter() - wall_start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(texts),
+        "throughput_rps": round(len(texts) / wall_time, 3) if wall_time > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+    }
+
+
+def compare_serial_vs_batched(texts, concurrency, tokenizer, summarizer, translator):
+    """Compara la ruta serial actual contra el planificador de micro-lotes"""
+    from app import generate_summaries
+
+    def serial(text):
+        return generate_summaries([text], tokenizer, summarizer, translator)[0]
+
+    batcher = MicroBatcher(lambda items: generate_summaries(items, tokenizer, summarizer, translator))
+
+    return {
+        "serial": measure_under_load(serial, texts, concurrency),
+        "batched": measure_under_load(batcher.submit, texts, concurrency),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from app import setup_models
+
+    parser = argparse.ArgumentParser(description="Throughput y p95: ruta serial vs micro-lotes")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=BATCH_MAX_SIZE)
+    args = parser.parse_args()
+
+    sample = ("The primary database server db-prod-01 stopped accepting connections at 10:30 "
+              "after CPU usage reached 100 percent on host 10.0.0.15. ") * 20
+    _, tokenizer, summarizer, translator = setup_models()
+    report = compare_serial_vs_batched([sample] * args.requests, args.concurrency,
+                                       tokenizer, summarizer, translator)
+    print(json.dumps(report, indent=4))
@@ -0,0 +1,460 @@
+# benchmark.py
+"""
+Benchmark reproducible del pipeline completo de incidentes.
+
+Uso:
+    python benchmark.py --output bench.json                     # modelos de config.py
+    python benchmark.py --models tiny --output bench.json       # modelos diminutos (CI offline)
+    python benchmark.py --models tiny --compare bench_main.json # compara contra otra ejecución
+    python benchmark.py --language es --output bench_es.json    # incidentes en español
+    python benchmark.py --profile fast --output bench_fast.json # perfil de generación
+
+Mide el tiempo por etapa (tokenize, summarize, detect_language,
+translate, classify_incident_type, extract_entities, format_as_json,
+generate_rich_summary_markdown), el throughput a varios niveles de concurrencia y
+el pico de RSS del proceso. Cuando el resumen ya está en español la traducción se
+omite y su coste evitado se mide aparte (`translation_skip`). Las etapas y el
+throughput usan el perfil de `--profile`; además, la etapa summarize se mide con
+cada perfil de `--profiles` (`profiles`: latencia y tokens generados).
+`denoise` compara el resumen de volcados con ruido de logs con y sin la
+pre-etapa de reducción de ruido (tokens, pasadas del modelo y aceleración), y
+`extractive` compara el map-reduce de documentos largos con la preselección
+extractiva de frases en una sola ventana. `translation_cache` compara la
+traducción de resúmenes completos con la traducción por frases con caché.
+`decoding` compara el modelo principal, la generación asistida por el modelo
+borrador y el borrador solo (latencia, tokens/s, aceptación y ROUGE-L).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+from contextlib import contextmanager
+
+from batching import measure_under_load, percentile
+from config import (
+    MODEL_NAME, TRANSLATION_MODEL_NAME, MAX_INPUT_LENGTH, TRANSLATION_MAX_LENGTH,
+    GENERATION_PROFILES, DEFAULT_GENERATION_PROFILE,
+    BENCHMARK_TINY_MODEL_NAME, BENCHMARK_TINY_TRANSLATION_MODEL_NAME, BENCHMARK_TINY_DRAFT_MODEL_NAME,
+    DRAFT_MODEL_NAME
+)
+from corpus import build_corpus, generate_noisy_incident
+from cpu_layout import current_layout
+
+# Longitudes en palabras: las últimas superan los 1024 tokens de MAX_INPUT_LENGTH
+BENCHMARK_LENGTHS = [120, 250, 500, 900, 1500, 3000]
+# (palabras de narración, líneas de log) de los volcados con ruido
+NOISY_INCIDENTS = [(150, 60), (250, 400), (400, 1500)]
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+STAGES = [
+    "tokenize", "summarize", "detect_language", "translate",
+    "classify_incident_type", "extract_entities", "format_as_json",
+    "generate_rich_summary_markdown"
+]
+
+
+@contextmanager
+def timed(timings, stage):
+    start = time.perf_counter()
+    yield
+    timings[stage] = (time.perf_counter() - start) * 1000
+
+
+def profile_stages(text, tokenizer, summarizer, translator, profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Ejecuta las etapas de `summarize_incident_and_process` por separado y las cronometra.
+    Retorna (tiempos, metadata de truncado, idioma del resumen, ms de traducción evitados o None).
+    """
+    from app import encode_prompt, classify_incident_type, summary_language
+    from generation import truncate_ids, truncation_metadata, generate_from_ids, generation_kwargs
+    from templates import generate_rich_summary_markdown
+    from utils import extract_entities, build_result
+
+    timings = {}
+    # Una sola tokenización: generate recibe los ids (ya no hay ida y vuelta por decode)
+    with timed(timings, "tokenize"):
+        model_ids, tokens_dropped = truncate_ids(tokenizer, encode_prompt(text, tokenizer), MAX_INPUT_LENGTH)
+    with timed(timings, "summarize"):
+        bilingual_summary = generate_from_ids(summarizer, [model_ids],
+                                              **generation_kwargs(profile, len(model_ids)))[0][0]
+    with timed(timings, "detect_language"):
+        language = summary_language(bilingual_summary)
+    translation_avoided_ms = None
+    if language == 'es':
+        timings["translate"] = 0.0
+        summary_text = bilingual_summary
+        # Coste que la petición se ahorra: se mide fuera de los tiempos de etapa
+        start = time.perf_counter()
+        translator(bilingual_summary, max_length=TRANSLATION_MAX_LENGTH)
+        translation_avoided_ms = (time.perf_counter() - start) * 1000
+    else:
+        with timed(timings, "translate"):
+            summary_text = translator(bilingual_summary, max_length=TRANSLATION_MAX_LENGTH)[0]['translation_text']
+    with timed(timings, "classify_incident_type"):
+        classification = classify_incident_type(text)
+    with timed(timings, "extract_entities"):
+        extraction = extract_entities(text)
+    with timed(timings, "format_as_json"):
+        result = build_result(summary_text, text, classification['category'],
+                              {'model_name': MODEL_NAME, 'generation_profile': profile},
+                              confidence=classification['confidence'], extraction=extraction)
+        json.dumps(result, indent=4, ensure_ascii=False)
+    # El panel se renderiza desde el dict, como en build_outputs
+    with timed(timings, "generate_rich_summary_markdown"):
+        generate_rich_summary_markdown(result)
+
+    return ({stage: round(ms, 3) for stage, ms in timings.items()}, truncation_metadata(model_ids, tokens_dropped),
+            language, translation_avoided_ms)
+
+
+def profile_generation(corpus, tokenizer, summarizer, profiles, repeats):
+    """Latencia de la etapa summarize y tokens generados con cada perfil de generación"""
+    from app import encode_prompt
+    from generation import truncate_ids, generate_from_ids, generation_kwargs
+
+    encoded = [truncate_ids(tokenizer, encode_prompt(text, tokenizer), MAX_INPUT_LENGTH)[0] for text in corpus]
+    report = {}
+    for profile in profiles:
+        samples, tokens = [], []
+        for model_ids in encoded:
+            kwargs = generation_kwargs(profile, len(model_ids))
+            for _ in range(repeats):
+                start = time.perf_counter()
+                _, output_tokens = generate_from_ids(summarizer, [model_ids], **kwargs)
+                samples.append((time.perf_counter() - start) * 1000)
+                tokens.append(output_tokens[0])
+        report[profile] = {
+            "summarize_mean_ms": round(sum(samples) / len(samples), 3),
+            "summarize_p95_ms": round(percentile(samples, 95), 3),
+            "output_tokens_mean": round(sum(tokens) / len(tokens), 1),
+        }
+    return report
+
+
+def profile_denoise(tokenizer, summarizer, translator, repeats, profile=DEFAULT_GENERATION_PROFILE):
+    """Latencia del resumen de volcados con ruido sobre el texto original y sobre el texto reducido"""
+    import random
+
+    from app import denoise_for_model, encode_within_window, generate_long_summary, generate_summaries
+
+    def summarize(text):
+        token_ids = encode_within_window(text, tokenizer)
+        if token_ids is None:
+            return generate_long_summary(text, tokenizer, summarizer, translator, profile)[0]
+        return generate_summaries([text], tokenizer, summarizer, translator, token_ids=[token_ids], profile=profile)[0]
+
+    rng = random.Random(42)
+    report = []
+    for words, log_lines in NOISY_INCIDENTS:
+        text = generate_noisy_incident(rng, words, log_lines)
+        model_text, metadata = denoise_for_model(text, tokenizer)
+        raw_ms = best_ms(summarize, text, repeats)
+        denoised_ms = best_ms(summarize, model_text, repeats)
+        report.append({
+            "log_lines": log_lines,
+            "lines_out": metadata['lines_out'],
+            "tokens_in": metadata['tokens_in'],
+            "tokens_out": metadata['tokens_out'],
+            "token_reduction_ratio": metadata['token_reduction_ratio'],
+            "model_passes": [metadata['model_passes_in'], metadata['model_passes_out']],
+            "denoise_ms": metadata['elapsed_ms'],
+            "raw_ms": round(raw_ms, 3),
+            "denoised_ms": round(denoised_ms + metadata['elapsed_ms'], 3),
+            "speedup": round(raw_ms / (denoised_ms + metadata['elapsed_ms']), 2),
+        })
+    return report
+
+
+def profile_extractive(corpus, tokenizer, summarizer, translator, repeats, profile=DEFAULT_GENERATION_PROFILE):
+    """
+    Entradas que no caben en la ventana: map-reduce completo frente a preselección
+    extractiva en `extractive_budget()` tokens (más el map-reduce de la selección si
+    ocupa más de una ventana)
+    """
+    from app import encode_within_window, encode_prompt, generate_long_summary, generate_summaries
+    from extractive import select_salient, extractive_budget
+
+    special_tokens = tokenizer.num_special_tokens_to_add(pair=False)
+
+    def measure(text):
+        return len(encode_prompt(text, tokenizer)) + special_tokens
+
+    budget = extractive_budget()
+
+    def extract_and_summarize(text):
+        selected, _ = select_salient(text, budget, measure)
+        if encode_within_window(selected, tokenizer) is None:
+            return generate_long_summary(selected, tokenizer, summarizer, translator, profile)[0]
+        return generate_summaries([selected], tokenizer, summarizer, translator, profile=profile)[0]
+
+    report = []
+    for text in corpus:
+        if encode_within_window(text, tokenizer) is not None:
+            continue
+        _, metadata = select_salient(text, budget, measure)
+        map_reduce_ms = best_ms(lambda t: generate_long_summary(t, tokenizer, summarizer, translator, profile), text,
+                                repeats)
+        extractive_ms = best_ms(extract_and_summarize, text, repeats)
+        report.append({
+            "words": len(text.split()),
+            "sentences": [metadata['sentences_in'], metadata['sentences_out']],
+            "tokens_out": metadata['tokens_out'],
+            "select_ms": best_ms(lambda t: select_salient(t, budget, measure), text, repeats),
+            "map_reduce_ms": round(map_reduce_ms, 3),
+            "extractive_ms": round(extractive_ms, 3),
+            "speedup": round(map_reduce_ms / extractive_ms, 2),
+        })
+    return report
+
+
+def profile_translation_cache(translator, count=40, seed=42):
+    """
+    Traducción de resúmenes relacionados (frases del corpus que se repiten entre
+    incidentes): pipeline sobre el resumen completo frente a SentenceTranslator
+    """
+    import random
+
+    from corpus import CLOSINGS, TIMELINE, HOSTS, IPS, TICKETS
+    from translation import SentenceTranslator
+
+    rng = random.Random(seed)
+    summaries = [
+        " ".join(rng.choice(TIMELINE + CLOSINGS).format(time="10:30", host=rng.choice(HOSTS), ip=rng.choice(IPS),
+                                                         ticket=rng.choice(TICKETS)) for _ in range(3))
+        for _ in range(count)
+    ]
+    cached = SentenceTranslator(translator)
+    start = time.perf_counter()
+    for summary in summaries:
+        translator(summary, max_length=TRANSLATION_MAX_LENGTH)
+    full_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for summary in summaries:
+        cached(summary)
+    cached_ms = (time.perf_counter() - start) * 1000
+    return {
+        "summaries": count,
+        "full_summary_ms": round(full_ms, 3),
+        "sentence_cache_ms": round(cached_ms, 3),
+        "speedup": round(full_ms / cached_ms, 2),
+        **cached.stats(),
+    }
+
+
+def profile_decoding(corpus, tokenizer, summarizer, repeats, profile="fast"):
+    """
+    Summarize con el modelo principal, asistido por el borrador y solo con el
+    borrador (límites del perfil, búsqueda voraz): latencia, tokens/s, aceptación
+    y ROUGE-L de cada modo frente al principal. None si no hay modelo borrador.
+    """
+    from app import encode_prompt
+    from benchmark_backends import rouge_l_f1
+    from generation import truncate_ids, generate_from_ids, generation_kwargs
+
+    if getattr(summarizer, "draft_model", None) is None:
+        return None
+    encoded = [truncate_ids(tokenizer, encode_prompt(text, tokenizer), MAX_INPUT_LENGTH)[0] for text in corpus]
+    report, reference = {}, None
+    for decoding in ("target", "assisted", "draft"):
+        samples, rates, acceptance, summaries = [], [], [], []
+        for model_ids in encoded:
+            kwargs = dict(generation_kwargs(profile, len(model_ids)), num_beams=1, decoding=decoding)
+            kwargs.pop("early_stopping", None)
+            for _ in range(repeats):
+                stats = {}
+                start = time.perf_counter()
+                texts, _ = generate_from_ids(summarizer, [model_ids], stats, **kwargs)
+                samples.append((time.perf_counter() - start) * 1000)
+                rates.append(stats["tokens_per_second"])
+                if "acceptance_rate" in stats:
+                    acceptance.append(stats["acceptance_rate"])
+            summaries.append(texts[0])
+        reference = reference or summaries
+        report[decoding] = {
+            "summarize_mean_ms": round(sum(samples) / len(samples), 3),
+            "summarize_p95_ms": round(percentile(samples, 95), 3),
+            "tokens_per_second": round(sum(rates) / len(rates), 1),
+            "acceptance_rate": round(sum(acceptance) / len(acceptance), 4) if acceptance else None,
+            "rouge_l_vs_target": round(sum(rouge_l_f1(s, r) for s, r in zip(summaries, reference)) / len(corpus), 4),
+            "speedup": round(report["target"]["summarize_mean_ms"] / (sum(samples) / len(samples)), 2)
+            if report else 1.0,
+        }
+    return report
+
+
+def best_ms(fn, arg, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso (ru_maxrss está en KB en Linux)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(models, repeats, concurrency_levels, language="en", profile=DEFAULT_GENERATION_PROFILE,
+                  profiles=tuple(GENERATION_PROFILES)):
+    import torch
+    from app import setup_models, setup_services, summarize_incident_and_process
+
+    model_name, translation_model_name, draft_model_name = MODEL_NAME, TRANSLATION_MODEL_NAME, DRAFT_MODEL_NAME
+    if models == "tiny":
+        model_name, translation_model_name = BENCHMARK_TINY_MODEL_NAME, BENCHMARK_TINY_TRANSLATION_MODEL_NAME
+        draft_model_name = BENCHMARK_TINY_DRAFT_MODEL_NAME
+
+    # El borrador se carga siempre para comparar los modos de decodificación (`decoding`)
+    load_start = time.perf_counter()
+    _, tokenizer, summarizer, translator = setup_models(model_name=model_name,
+                                                        translation_model_name=translation_model_name,
+                                                        draft_model_name=draft_model_name)
+    load_seconds = time.perf_counter() - load_start
+
+    corpus = build_corpus(BENCHMARK_LENGTHS, language=language)
+
+    # 1. Tiempos por etapa, por cada entrada del corpus
+    per_input = []
+    stage_samples = {stage: [] for stage in STAGES}
+    avoided_samples = []
+    for text in corpus:
+        for _ in range(repeats):
+            timings, truncation, summary_lang, avoided_ms = profile_stages(text, tokenizer, summarizer, translator,
+                                                                           profile)
+            for stage, ms in timings.items():
+                stage_samples[stage].append(ms)
+            if avoided_ms is not None:
+                avoided_samples.append(avoided_ms)
+        per_input.append({"words": len(text.split()), "input_tokens": truncation['input_tokens'],
+                          "tokens_dropped": truncation['tokens_dropped'],
+                          "summary_language": summary_lang, "stages_ms": timings})
+
+    stages = {
+        stage: {"mean_ms": round(sum(samples) / len(samples), 3), "p95_ms": round(percentile(samples, 95), 3)}
+        for stage, samples in stage_samples.items()
+    }
+
+    # 2. Etapa summarize con cada perfil de generación
+    generation_profiles = profile_generation(corpus, tokenizer, summarizer, profiles, repeats)
+    decoding_report = profile_decoding(corpus, tokenizer, summarizer, repeats)
+
+    # 3. Volcados con ruido de logs: con y sin la pre-etapa de reducción de ruido
+    denoise_report = profile_denoise(tokenizer, summarizer, translator, repeats, profile)
+    extractive_report = profile_extractive(corpus, tokenizer, summarizer, translator, repeats, profile)
+    translation_cache_report = profile_translation_cache(translator)
+
+    # 4. Throughput extremo a extremo (con micro-batching, sin caché)
+    batcher, _, _, _ = setup_services(tokenizer, summarizer, translator)
+    throughput = [
+        measure_under_load(
+            lambda text: summarize_incident_and_process(text, tokenizer, summarizer, translator, batcher,
+                                                        profile=profile),
+            corpus * 2, concurrency
+        )
+        for concurrency in concurrency_levels
+    ]
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "models": {"summarizer": model_name, "translator": translation_model_name, "draft": draft_model_name},
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "torch_threads": torch.get_num_threads(),
+            "inference_layout": current_layout(),
+            "cpu_count": os.cpu_count(),
+            "repeats": repeats,
+            "language": language,
+            "profile": profile,
+        },
+        "load_seconds": round(load_seconds, 2),
+        "stages": stages,
+        "translation_skip": {
+            "skipped": len(avoided_samples),
+            "runs": len(corpus) * repeats,
+            "saved_ms_mean": round(sum(avoided_samples) / len(avoided_samples), 3) if avoided_samples else None,
+        },
+        "per_input": per_input,
+        "profiles": generation_profiles,
+        "decoding": decoding_report,
+        "denoise": denoise_report,
+        "extractive": extractive_report,
+        "translation_cache": translation_cache_report,
+        "throughput": throughput,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_reports(current, baseline):
+    """Imprime la variación porcentual de cada etapa y del throughput frente a otra ejecución"""
+    def delta(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\n📊 {baseline['meta']['commit']} → {current['meta']['commit']} "
+          f"(perfil {baseline['meta'].get('profile', 'quality')} → {current['meta']['profile']})")
+    for stage, stats in current["stages"].items():
+        old = baseline["stages"].get(stage)
+        if old:
+            print(f"  {stage:<32} {old['mean_ms']:>10.3f} ms → {stats['mean_ms']:>10.3f} ms  ({delta(stats['mean_ms'], old['mean_ms'])})")
+    for stage, old in baseline["stages"].items():
+        if stage not in current["stages"]:
+            print(f"  {stage:<32} {old['mean_ms']:>10.3f} ms → (etapa eliminada)")
+    for profile, stats in current["profiles"].items():
+        old = baseline.get("profiles", {}).get(profile)
+        if old:
+            label = f"summarize[{profile}]"
+            print(f"  {label:<32} {old['summarize_mean_ms']:>10.3f} ms → "
+                  f"{stats['summarize_mean_ms']:>10.3f} ms  ({delta(stats['summarize_mean_ms'], old['summarize_mean_ms'])})")
+    old_throughput = {t["concurrency"]: t for t in baseline["throughput"]}
+    for stats in current["throughput"]:
+        old = old_throughput.get(stats["concurrency"])
+        if old:
+            print(f"  throughput c={stats['concurrency']:<24} {old['throughput_rps']:>10.3f} → {stats['throughput_rps']:>10.3f} rps "
+                  f"({delta(stats['throughput_rps'], old['throughput_rps'])})")
+    skip, old_skip = current.get("translation_skip", {}), baseline.get("translation_skip", {})
+    print(f"  traducciones omitidas {old_skip.get('skipped', 0)}/{old_skip.get('runs', '?')} → "
+          f"{skip.get('skipped', 0)}/{skip.get('runs', '?')} (ahorro medio {skip.get('saved_ms_mean')} ms)")
+    print(f"  peak_rss_mb {baseline['peak_rss_mb']:>31} → {current['peak_rss_mb']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de resumen de incidentes")
+    parser.add_argument("--models", choices=["full", "tiny"], default="full",
+                        help="'tiny' usa modelos diminutos de pesos aleatorios para CI offline")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY_LEVELS)
+    parser.add_argument("--language", choices=["en", "es"], default="en",
+                        help="Idioma del corpus sintético ('es' mide el ahorro de omitir la traducción)")
+    parser.add_argument("--profile", choices=list(GENERATION_PROFILES), default=DEFAULT_GENERATION_PROFILE,
+                        help="Perfil de generación de las etapas y del throughput")
+    parser.add_argument("--profiles", choices=list(GENERATION_PROFILES), nargs="+", default=list(GENERATION_PROFILES),
+                        help="Perfiles comparados en la etapa summarize")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para detectar regresiones")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.models, args.repeats, args.concurrency, args.language, args.profile, args.profiles)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"✅ Resultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_reports(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
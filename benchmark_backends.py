@@ -0,0 +1,87 @@
+# benchmark_backends.py
+"""
+Comparativa calidad vs velocidad de los backends de inferencia sobre el corpus fijo.
+
+Uso:
+    python benchmark_backends.py --output backend_comparison.json
+
+La calidad se mide como ROUGE-L F1 de cada backend frente a la salida de PyTorch FP32.
+"""
+import argparse
+import json
+import time
+
+from backends import BACKENDS
+from batching import percentile
+from corpus import build_corpus, FIXED_CORPUS_LENGTHS
+
+
+def rouge_l_f1(candidate, reference):
+    """ROUGE-L F1 a nivel de palabras (subsecuencia común más larga)"""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    if not cand or not ref:
+        return 0.0
+    previous = [0] * (len(ref) + 1)
+    for cand_word in cand:
+        current = [0]
+        for j, ref_word in enumerate(ref, start=1):
+            current.append(previous[j - 1] + 1 if cand_word == ref_word else max(previous[j], current[j - 1]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend, corpus):
+    """Carga los modelos con el backend y mide la latencia por incidente"""
+    from app import setup_models, generate_summaries
+
+    load_start = time.perf_counter()
+    _, tokenizer, summarizer, translator = setup_models(backend=backend)
+    load_seconds = time.perf_counter() - load_start
+
+    summaries, latencies = [], []
+    for text in corpus:
+        start = time.perf_counter()
+        summaries.append(generate_summaries([text], tokenizer, summarizer, translator)[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return summaries, {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparativa calidad/velocidad de backends")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--output", default="backend_comparison.json")
+    args = parser.parse_args()
+
+    corpus = build_corpus(FIXED_CORPUS_LENGTHS)
+    reference = None
+    baseline_ms = None
+    report = []
+
+    # PyTorch FP32 va primero: es la referencia de calidad y de velocidad
+    backends = ["pytorch"] + [b for b in args.backends if b != "pytorch"]
+    for backend in backends:
+        summaries, stats = run_backend(backend, corpus)
+        if reference is None:
+            reference, baseline_ms = summaries, stats["mean_ms"]
+        stats["rouge_l_vs_fp32"] = round(sum(rouge_l_f1(s, r) for s, r in zip(summaries, reference)) / len(corpus), 4)
+        stats["speedup_vs_fp32"] = round(baseline_ms / stats["mean_ms"], 2) if stats["mean_ms"] else None
+        report.append(stats)
+        print(json.dumps(stats, ensure_ascii=False))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"corpus_lengths": FIXED_CORPUS_LENGTHS, "results": report}, f, indent=4, ensure_ascii=False)
+    print(f"✅ Comparativa guardada en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmark_entities.py
+"""
+Throughput de extract_entities sobre entradas grandes (logs pegados, volcados de incidentes).
+
+Uso:
+    python benchmark_entities.py --incidents 60 --words 3000 --repeats 5
+    python benchmark_entities.py --source logs --lines 18000
+
+Compara el extractor de una sola pasada con la referencia de cuatro re.findall
+sobre el texto completo (implementación anterior) y verifica que coinciden.
+`--source logs` usa un log con marcas de tiempo donde casi cada línea tiene
+varios disparadores, el peor caso para el filtrado por anclas.
+"""
+import argparse
+import random
+import re
+import time
+
+from config import REGEX_PATTERNS
+from corpus import build_corpus, generate_dense_log
+from utils import IPV4_FULL, extract_entities
+
+
+def extract_entities_reference(text):
+    """Referencia: un re.findall por patrón sobre todo el texto"""
+    resources, ips_set, incident_ids_set = {}, {}, {}
+    for match in re.finditer(REGEX_PATTERNS['key_value'], text, re.IGNORECASE):
+        key, value = match.group('kv_key').upper(), match.group('kv_value')
+        if key == 'IP':
+            if IPV4_FULL.fullmatch(value):
+                ips_set[value] = None
+        elif key in ['ID', 'TICKET']:
+            incident_ids_set[value] = None
+        else:
+            resources[value] = None
+    resources.update(dict.fromkeys(re.findall(REGEX_PATTERNS['resource'], text, re.IGNORECASE)))
+    ips_set.update(dict.fromkeys(re.findall(REGEX_PATTERNS['ips'], text, re.IGNORECASE)))
+    incident_ids_set.update(dict.fromkeys(re.findall(REGEX_PATTERNS['incident_id'], text, re.IGNORECASE)))
+
+    entities = {}
+    if resources: entities['resources'] = list(resources)
+    if ips_set: entities['ips'] = list(ips_set)
+    if incident_ids_set: entities['incident_id'] = list(incident_ids_set)
+    return entities, {k: len(v) for k, v in entities.items()}
+
+
+def best_of(fn, text, repeats):
+    """Mejor tiempo (s) de `repeats` ejecuciones y el último resultado"""
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput del extractor de entidades")
+    parser.add_argument("--incidents", type=int, default=60, help="Incidentes concatenados en la entrada")
+    parser.add_argument("--words", type=int, default=3000, help="Palabras por incidente")
+    parser.add_argument("--source", choices=["corpus", "logs"], default="corpus",
+                        help="logs: volcado de log denso en disparadores en vez de incidentes narrativos")
+    parser.add_argument("--lines", type=int, default=18000, help="Líneas de log con --source logs")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.source == "logs":
+        text = generate_dense_log(random.Random(42), args.lines)
+    else:
+        text = "\n".join(build_corpus([args.words] * args.incidents))
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+
+    reference_s, reference = best_of(extract_entities_reference, text, args.repeats)
+    single_pass_s, result = best_of(extract_entities, text, args.repeats)
+
+    same = {k: set(v) for k, v in reference[0].items()} == {k: set(v) for k, v in result[0].items()}
+    print(f"📄 Entrada: {size_mb:.2f} MB · entidades: {result[1]}")
+    print(f"  referencia (4 × findall) {reference_s * 1000:>9.1f} ms  {size_mb / reference_s:>7.1f} MB/s")
+    print(f"  una sola pasada          {single_pass_s * 1000:>9.1f} ms  {size_mb / single_pass_s:>7.1f} MB/s")
+    print(f"  speedup x{reference_s / single_pass_s:.2f} · resultados idénticos: {'sí' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
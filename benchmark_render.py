@@ -0,0 +1,152 @@
+# benchmark_render.py
+"""
+Tiempo de render del panel de resultados con conjuntos grandes de entidades.
+
+Uso:
+    python benchmark_render.py --entities 10 100 1000 5000 --repeats 20
+
+Compara las plantillas precompiladas de templates.py (render desde el dict)
+con la referencia anterior: f-strings anidados más la ida y vuelta
+json.dumps → json.loads. Verifica que ambos producen el mismo HTML
+(salvo espacios) y que los valores con caracteres especiales se escapan.
+"""
+import argparse
+import json
+import time
+
+from templates import generate_rich_summary_markdown
+
+CARD_REFERENCE = """
+    <div class="cyber-card" style='--glow-color: {glow_color}'>
+        <div class="card-header">
+            {icon_html}
+            {title_html}
+        </div>
+        <div class="card-content">
+            {content}
+        </div>
+        <div class="card-glow"></div>
+    </div>
+    """
+
+
+def create_cyber_card_reference(content, title, icon, glow_color="#C9F70E"):
+    icon_html = f"<span class='card-icon'>{icon}</span>" if icon else ""
+    title_html = f"<h3 class='card-title'>{title}</h3>" if title else ""
+    return CARD_REFERENCE.format(glow_color=glow_color, icon_html=icon_html, title_html=title_html, content=content)
+
+
+def render_reference(json_output):
+    """Referencia: panel armado con f-strings y concatenación sobre el JSON parseado"""
+    data = json.loads(json_output)
+    icon_map = {"Software/Aplicación": "💻", "Redes/Conectividad": "🌐", "Infraestructura/Sistemas": "💾",
+                "Base de datos": "🗄️", "Seguridad": "🔒", "General/Otros": "📜"}
+    incident_type = data.get('incident_type', 'N/A')
+    entities = data.get('entities', {})
+    metrics = data.get('metadata', {})
+    confidence = metrics.get('confidence_score', 'N/A')
+    width = confidence.replace('%', '') if '%' in str(confidence) else '90'
+
+    rich_md = create_cyber_card_reference(f"""
+        <div class="incident-header">
+            <div class="type-badge">
+                {icon_map.get(incident_type, '📜')} {incident_type}
+            </div>
+            <div class="confidence-meter">
+                <div class="meter-label">CONFIANZA DEL SISTEMA</div>
+                <div class="meter-bar">
+                    <div class="meter-fill" style="width: {width}%"></div>
+                </div>
+                <div class="meter-value">{confidence}</div>
+            </div>
+        </div>
+        """, "ANÁLISIS EJECUTIVO", "📊")
+    rich_md += create_cyber_card_reference(f"""
+        <div class="summary-content">
+            <div class="summary-text">{data.get('summary', 'Resumen no disponible.')}</div>
+        </div>
+        """, "RESUMEN DEL INCIDENTE", "📝")
+
+    entity_content = ""
+    for key, heading, kind in [('resources', "💾 RECURSOS/HOSTNAMES", "resource"), ('ips', "🌐 DIRECCIONES IP", "ip"),
+                               ('incident_id', "🏷️ IDS DE INCIDENTE", "id")]:
+        if entities.get(key):
+            entity_content += f"""
+            <div class="entity-section">
+                <h4>{heading}</h4>
+                <div class="entity-tags">
+                    {''.join([f'<span class="entity-tag {kind}">{str(v)}</span>' for v in entities[key]])}
+                </div>
+            </div>
+            """
+    if not entity_content:
+        entity_content = "<div class='no-entities'>⚠️ No se detectaron entidades clave</div>"
+    rich_md += create_cyber_card_reference(entity_content, "ENTIDADES DETECTADAS", "🔗")
+
+    rich_md += create_cyber_card_reference(f"""
+    <div class="metrics-grid">
+        <div class="metric-item">
+            <div class="metric-value">{metrics.get('original_words_count', 'N/A')}</div>
+            <div class="metric-label">PALABRAS ORIGINALES</div>
+        </div>
+        <div class="metric-item">
+            <div class="metric-value">{metrics.get('summary_words_count', 'N/A')}</div>
+            <div class="metric-label">PALABRAS RESUMEN</div>
+        </div>
+        <div class="metric-item highlight">
+            <div class="metric-value">{metrics.get('reduction_percentage', 'N/A')}%</div>
+            <div class="metric-label">REDUCCIÓN</div>
+        </div>
+    </div>
+    """, "MÉTRICAS DE PROCESAMIENTO", "📈")
+    return rich_md
+
+
+def build_sample(entity_count, special=False):
+    """Resultado sintético con `entity_count` entidades repartidas entre recursos, IPs e IDs"""
+    suffix = "<b>&'\"" if special else ""
+    return {
+        "status": "success",
+        "incident_type": "Redes/Conectividad",
+        "summary": "El balanceador lb-prod-01 dejó de enrutar tráfico hacia el clúster de pagos. " * 5,
+        "entities": {
+            "resources": [f"srv-app-{i:05d}{suffix}" for i in range(entity_count // 2)],
+            "ips": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(entity_count // 4)],
+            "incident_id": [f"INC-{i:06d}{suffix}" for i in range(entity_count - entity_count // 2 - entity_count // 4)],
+        },
+        "metadata": {"confidence_score": "87.50%", "original_words_count": 1200, "summary_words_count": 80,
+                     "reduction_percentage": 93.33},
+    }
+
+
+def best_of(fn, arg, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de render del panel de resultados")
+    parser.add_argument("--entities", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    escaped = generate_rich_summary_markdown(build_sample(4, special=True))
+    assert "<b>" not in escaped and "&lt;b&gt;&amp;" in escaped, "los valores de entidades deben escaparse"
+
+    for count in args.entities:
+        data = build_sample(count)
+        # Mismo HTML salvo espacios en blanco: el cambio es de implementación, no de salida
+        assert " ".join(render_reference(json.dumps(data, ensure_ascii=False)).split()) == \
+            " ".join(generate_rich_summary_markdown(data).split())
+        reference_s = best_of(lambda d: render_reference(json.dumps(d, indent=4, ensure_ascii=False)), data, args.repeats)
+        compiled_s = best_of(generate_rich_summary_markdown, data, args.repeats)
+        print(f"{count:>6} entidades  referencia (json + f-strings) {reference_s * 1000:>8.3f} ms   "
+              f"plantillas {compiled_s * 1000:>8.3f} ms   ({reference_s / compiled_s:.1f}×)")
+
+
+if __name__ == "__main__":
+    main()
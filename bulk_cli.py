@@ -0,0 +1,133 @@
+# bulk_cli.py
+"""
+Procesamiento masivo offline de incidentes en JSONL.
+
+Uso:
+    python bulk_cli.py incidentes.jsonl resumenes.jsonl --workers 4 --text-field body --id-field request_id
+
+Cada línea de salida lleva el `id` del registro; si el proceso se interrumpe,
+volver a ejecutar el mismo comando reanuda desde los registros pendientes.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+# Estado por proceso worker (cada uno carga su propia copia de los modelos)
+_worker_models = None
+
+
+def _init_worker(num_threads):
+    """Fija los hilos de torch del worker y carga los modelos una vez"""
+    global _worker_models
+    from app import setup_models, with_translation_cache
+    from cpu_layout import resolve_layout
+
+    # Cada proceso ya es una unidad de paralelismo: una sola ranura con todos sus hilos
+    _, tokenizer, summarizer, translator = setup_models(layout=resolve_layout(slots=1, threads_per_slot=num_threads))
+    _worker_models = (tokenizer, summarizer, with_translation_cache(translator))
+
+
+def _process_record(task):
+    record_id, text = task
+    from app import summarize_incident_and_process
+    json_output, _ = summarize_incident_and_process(text, *_worker_models, render=False)
+    return {"id": record_id, **json.loads(json_output)}
+
+
+def load_completed_ids(output_path):
+    """
+    Lee los ids ya escritos en la salida. Si la última línea quedó a medias
+    (caída durante la escritura) se trunca para poder continuar agregando.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    valid_bytes = 0
+    with open(output_path, "rb") as f:
+        for raw_line in f:
+            if not raw_line.endswith(b"\n"):
+                break
+            try:
+                completed.add(json.loads(raw_line)["id"])
+            except (ValueError, KeyError):
+                break
+            valid_bytes += len(raw_line)
+
+    if valid_bytes < os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return completed
+
+
+def iter_tasks(input_path, text_field, id_field, completed):
+    """Recorre el JSONL de entrada en streaming y omite los registros ya procesados"""
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"\n⚠️ Línea {line_number} no es JSON válido, se omite", file=sys.stderr)
+                continue
+            record_id = str(record.get(id_field, f"line-{line_number}"))
+            if record_id in completed:
+                continue
+            yield record_id, record.get(text_field, "")
+
+
+def count_records(input_path):
+    with open(input_path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def report_progress(done, total, start):
+    """Imprime registros/s y ETA en una sola línea de estado"""
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    remaining = max(total - done, 0)
+    eta = remaining / rate if rate > 0 else float("inf")
+    eta_text = time.strftime("%H:%M:%S", time.gmtime(eta)) if eta != float("inf") else "--:--:--"
+    print(f"\r📦 {done}/{total} registros | {rate:.2f} reg/s | ETA {eta_text}", end="", file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen masivo de incidentes desde JSONL")
+    parser.add_argument("input", help="Archivo JSONL de entrada")
+    parser.add_argument("output", help="Archivo JSONL de salida (se reanuda si ya existe)")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos worker")
+    parser.add_argument("--threads", type=int, default=None, help="Hilos de torch por worker (por defecto: núcleos / workers)")
+    parser.add_argument("--text-field", default="text", help="Campo con el texto del incidente")
+    parser.add_argument("--id-field", default="id", help="Campo con el identificador del registro")
+    args = parser.parse_args()
+
+    num_threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    completed = load_completed_ids(args.output)
+    total = max(count_records(args.input) - len(completed), 0)
+    if completed:
+        print(f"♻️ Reanudando: {len(completed)} registros ya procesados", file=sys.stderr)
+    print(f"🚀 {total} registros pendientes con {args.workers} workers × {num_threads} hilos", file=sys.stderr)
+
+    tasks = iter_tasks(args.input, args.text_field, args.id_field, completed)
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    done = 0
+
+    with open(args.output, "a", encoding="utf-8") as out, \
+            context.Pool(args.workers, initializer=_init_worker, initargs=(num_threads,)) as pool:
+        # imap conserva el orden de entrada; cada línea se vuelca al instante para poder reanudar
+        for result in pool.imap(_process_record, tasks):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            done += 1
+            report_progress(done, total, start)
+
+    print(f"\n✅ Procesados {done} registros en {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from config import (
+    MODEL_NAME, GENERATION_PROFILES, DEFAULT_GENERATION_PROFILE, GENERATION_ADAPTIVE_RATIO,
+    GENERATION_ADAPTIVE_MIN_TOKENS, MAX_INPUT_LENGTH, DO_SAMPLE, TRANSLATION_MODEL_NAME, INFERENCE_BACKEND,
+    ENABLE_LANGUAGE_DETECTION,
+    CACHE_MAX_ENTRIES, CACHE_DB_PATH,
+    ENABLE_LONG_DOCUMENT_MODE, CHUNK_WINDOW_TOKENS, CHUNK_OVERLAP_TOKENS,
+    ENABLE_LOG_DENOISE, DENOISE_TEMPLATE_SIMILARITY, ENABLE_TRANSLATION_CACHE, TRANSLATION_MAX_LENGTH,
+    ENABLE_EXTRACTIVE_PRERANK, EXTRACTIVE_BUDGET_WINDOWS, EXTRACTIVE_ENTITY_BOOST, EXTRACTIVE_KEYWORD_BOOST,
+    DRAFT_MODEL_NAME, ENABLE_DRAFT_MODEL
+)
+
+
+def generation_params(profile=DEFAULT_GENERATION_PROFILE):
+    """Parámetros de generación que afectan al resumen (forman parte de la clave)"""
+    return {
+        'model_name': MODEL_NAME,
+        'draft_model': DRAFT_MODEL_NAME if ENABLE_DRAFT_MODEL else None,
+        'profile': profile,
+        **GENERATION_PROFILES[profile],
+        'adaptive_ratio': GENERATION_ADAPTIVE_RATIO,
+        'adaptive_min_tokens': GENERATION_ADAPTIVE_MIN_TOKENS,
+        'max_input_length': MAX_INPUT_LENGTH,
+        'do_sample': DO_SAMPLE,
+        'translation_model': TRANSLATION_MODEL_NAME,
+        'translation_by_sentence': ENABLE_TRANSLATION_CACHE,
+        'translation_max_length': TRANSLATION_MAX_LENGTH,
+        'language_detection': ENABLE_LANGUAGE_DETECTION,
+        'inference_backend': INFERENCE_BACKEND,
+        'long_document_mode': ENABLE_LONG_DOCUMENT_MODE,
+        'chunk_window_tokens': CHUNK_WINDOW_TOKENS,
+        'chunk_overlap_tokens': CHUNK_OVERLAP_TOKENS,
+        'log_denoise': ENABLE_LOG_DENOISE,
+        'denoise_template_similarity': DENOISE_TEMPLATE_SIMILARITY,
+        'extractive_prerank': ENABLE_EXTRACTIVE_PRERANK,
+        'extractive_budget_windows': EXTRACTIVE_BUDGET_WINDOWS,
+        'extractive_boosts': [EXTRACTIVE_ENTITY_BOOST, EXTRACTIVE_KEYWORD_BOOST],
+    }
+
+
+def normalize_text(text):
+    """Normaliza espacios para que pegados equivalentes compartan clave"""
+    return " ".join(text.split())
+
+
+def make_cache_key(text, params=None):
+    """Hash SHA-256 del texto normalizado más los parámetros de generación"""
+    params = generation_params() if params is None else params
+    payload = json.dumps(params, sort_keys=True) + "\x00" + normalize_text(text)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Caché de resúmenes direccionada por contenido: nivel LRU en memoria
+    acotado y nivel opcional en SQLite que sobrevive a reinicios.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, db_path=CACHE_DB_PATH):
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def get(self, key):
+        """Retorna el valor cacheado o None; actualiza contadores y orden LRU"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM summaries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    # Promoción del nivel en disco al nivel en memoria
+                    self._store_in_memory(key, row[0])
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._store_in_memory(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO summaries (key, value) VALUES (?, ?)", (key, value))
+                self._db.commit()
+
+    def _store_in_memory(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """Contadores de aciertos/fallos expuestos en la metadata"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'persistent': self._db is not None,
+            }
@@ -0,0 +1,120 @@
+# chunking.py
+import time
+from itertools import islice
+
+from config import (
+    NUM_BEAMS, DO_SAMPLE, MAX_INPUT_LENGTH,
+    CHUNK_WINDOW_TOKENS, CHUNK_OVERLAP_TOKENS, CHUNK_BATCH_SIZE,
+    CHUNK_SUMMARY_MIN_LENGTH, CHUNK_SUMMARY_MAX_LENGTH,
+    CHUNK_MAX_LEVELS, CHUNK_TOKENIZE_LINES
+)
+from generation import truncate_ids, generate_from_ids
+
+
+def count_tokens(text, tokenizer):
+    """Número de tokens del texto sin tokens especiales"""
+    return len(tokenizer(text, add_special_tokens=False).input_ids)
+
+
+def estimate_model_passes(input_tokens, window=CHUNK_WINDOW_TOKENS, overlap=CHUNK_OVERLAP_TOKENS):
+    """
+    Secuencias que pasan por el modelo de resumen para una entrada: 1 si cabe en la
+    ventana; si no, una por ventana solapada del primer nivel más el resumen final.
+    """
+    if input_tokens <= window:
+        return 1
+    return 2 + -(-(input_tokens - window) // (window - overlap))
+
+
+def iter_token_windows(text, tokenizer, window=CHUNK_WINDOW_TOKENS, overlap=CHUNK_OVERLAP_TOKENS,
+                       block_lines=CHUNK_TOKENIZE_LINES):
+    """
+    Genera ventanas solapadas de IDs de token. El texto se tokeniza por bloques
+    de líneas, así que la memoria queda acotada a una ventana más un bloque.
+    """
+    buffer = []
+    emitted = False
+    lines = text.splitlines(keepends=True)
+    for start in range(0, len(lines), block_lines):
+        block = "".join(lines[start:start + block_lines])
+        buffer.extend(tokenizer(block, add_special_tokens=False).input_ids)
+        while len(buffer) >= window:
+            yield buffer[:window]
+            buffer = buffer[window - overlap:]
+            emitted = True
+    # La cola solo se emite si aporta tokens que no estaban en la ventana anterior
+    if buffer and (not emitted or len(buffer) > overlap):
+        yield buffer
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def summarize_windows(windows, tokenizer, summarizer, level, chunk_timings, num_beams=NUM_BEAMS, decoding='target'):
+    """
+    Fase map: resume las ventanas en llamadas por lotes de CHUNK_BATCH_SIZE.
+    Las ventanas ya son ids de token y van directo a generate, sin decodificarlas.
+    `decoding` elige modelo principal, asistido o borrador, como en `generation_kwargs`.
+    """
+    partial_summaries = []
+    for batch in _batched(windows, CHUNK_BATCH_SIZE):
+        batch_ids = [truncate_ids(tokenizer, ids, MAX_INPUT_LENGTH)[0] for ids in batch]
+        # Evita forzar resúmenes más largos que la ventana más corta del lote
+        min_length = min(CHUNK_SUMMARY_MIN_LENGTH, min(len(ids) for ids in batch) // 2)
+
+        start = time.perf_counter()
+        summaries, _ = generate_from_ids(
+            summarizer,
+            batch_ids,
+            min_length=min_length,
+            max_length=CHUNK_SUMMARY_MAX_LENGTH,
+            do_sample=DO_SAMPLE,
+            num_beams=num_beams,
+            decoding=decoding
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        for ids, summary in zip(batch, summaries):
+            partial_summaries.append(summary)
+            chunk_timings.append({
+                'level': level,
+                'index': len(chunk_timings),
+                'input_tokens': len(ids),
+                'batch_size': len(batch),
+                'elapsed_ms': round(elapsed_ms / len(batch), 2)
+            })
+    return partial_summaries
+
+
+def reduce_to_window(text, tokenizer, summarizer, num_beams=NUM_BEAMS, decoding='target'):
+    """
+    Resume jerárquicamente el texto hasta que los resúmenes parciales unidos
+    quepan en una sola ventana. Retorna el texto reducido y la metadata por chunk.
+    `num_beams` y `decoding` siguen al perfil de generación de la petición.
+    """
+    chunk_timings = []
+    level = 0
+    reduced_text = text
+    while level < CHUNK_MAX_LEVELS:
+        windows = iter_token_windows(reduced_text, tokenizer)
+        partial_summaries = summarize_windows(windows, tokenizer, summarizer, level, chunk_timings, num_beams, decoding)
+        reduced_text = "\n".join(partial_summaries)
+        level += 1
+        if len(partial_summaries) <= 1 or count_tokens(reduced_text, tokenizer) <= CHUNK_WINDOW_TOKENS:
+            break
+
+    metadata = {
+        'levels': level,
+        'windows': sum(1 for chunk in chunk_timings if chunk['level'] == 0),
+        'window_tokens': CHUNK_WINDOW_TOKENS,
+        'overlap_tokens': CHUNK_OVERLAP_TOKENS,
+        'decoding': decoding,
+        'chunks': chunk_timings
+    }
+    return reduced_text, metadata
@@ -0,0 +1,143 @@
+# classifier.py
+import re
+import unicodedata
+from collections import deque
+
+from config import (
+    INCIDENT_CLASSIFICATIONS, INCIDENT_KEYWORD_WEIGHTS,
+    DEFAULT_INCIDENT_CATEGORY, CLASSIFIER_EVIDENCE_PRIOR
+)
+
+# Clasificación por palabras clave con un autómata Aho-Corasick sobre palabras:
+# una sola pasada por el texto, independiente del número de palabras clave.
+WORD_PATTERN = re.compile(r'\w+')
+COMBINING_MARKS = re.compile(r'[\u0300-\u036f]+')
+
+
+def fold_text(text):
+    """Texto en minúsculas y sin tildes"""
+    return COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', text.casefold()))
+
+
+def normalize_words(text):
+    """Palabras en minúsculas y sin tildes: 'Aplicación' y 'aplicacion' coinciden"""
+    return WORD_PATTERN.findall(fold_text(text))
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick cuyo alfabeto son palabras completas, así que cada coincidencia
+    respeta los límites de palabra ('red' no coincide dentro de 'reduce') y las
+    frases de varias palabras ('base de datos') se reconocen en la misma pasada.
+    """
+
+    def __init__(self, keywords):
+        # keywords: iterable de (frase, payload)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for phrase, payload in keywords:
+            node = 0
+            for word in normalize_words(phrase):
+                next_node = self._goto[node].get(word)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][word] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            if node:
+                self._output[node].append(payload)
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                # Hereda las salidas del sufijo más largo que también es palabra clave
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, words):
+        """Produce el payload de cada palabra clave encontrada en la secuencia de palabras"""
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        node = 0
+        for word in words:
+            if node == 0:
+                # Camino rápido: la mayoría de palabras no empieza ninguna palabra clave
+                node = root.get(word, 0)
+            else:
+                while node and word not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(word, 0)
+            if output[node]:
+                yield from output[node]
+
+
+def inflections(phrase):
+    """
+    La frase y sus plurales, flexionando la primera palabra (el núcleo en español):
+    'servidor' → 'servidores', 'base de datos' → 'bases de datos', 'query' → 'queries'.
+    Se añaden al autómata como palabras clave propias: sin coste por palabra del texto.
+    """
+    head, *rest = normalize_words(phrase)
+    forms = [head]
+    if not head.endswith('s'):
+        forms.append(head + 's')
+        if head[-1] not in 'aeiou':
+            forms.append(head + 'es')
+        if head.endswith('y'):
+            forms.append(head[:-1] + 'ies')
+    return [" ".join([form] + rest) for form in forms]
+
+
+def build_classifier(classifications=INCIDENT_CLASSIFICATIONS, weights=INCIDENT_KEYWORD_WEIGHTS):
+    """
+    Autómata con (categoría, palabra clave, peso) como payload de cada palabra clave;
+    sus plurales comparten payload, así que cuentan como la palabra clave base
+    """
+    return KeywordAutomaton(
+        (form, (category, keyword, weights.get(keyword, 1.0)))
+        for category, keywords in classifications.items()
+        for keyword in keywords
+        for form in inflections(keyword)
+    )
+
+
+CLASSIFIER = build_classifier()
+CATEGORY_PRIORITY = {category: index for index, category in enumerate(INCIDENT_CLASSIFICATIONS)}
+
+
+def classify_incident(text, automaton=CLASSIFIER):
+    """
+    Elige la categoría con mayor puntuación ponderada. La confianza combina la
+    proporción de la puntuación ganadora sobre el total (qué tan inequívoca es)
+    con la cantidad de evidencia (best / (best + CLASSIFIER_EVIDENCE_PRIOR)).
+    """
+    scores, hits = {}, {}
+    for category, keyword, weight in automaton.iter_matches(normalize_words(text)):
+        scores[category] = scores.get(category, 0.0) + weight
+        category_hits = hits.setdefault(category, {})
+        category_hits[keyword] = category_hits.get(keyword, 0) + 1
+
+    if not scores:
+        return {'category': DEFAULT_INCIDENT_CATEGORY, 'confidence': 0.0, 'scores': {}, 'hits': {}}
+
+    # Empates: gana la categoría que aparece antes en INCIDENT_CLASSIFICATIONS
+    category = max(scores, key=lambda name: (scores[name], -CATEGORY_PRIORITY.get(name, len(CATEGORY_PRIORITY))))
+    best, total = scores[category], sum(scores.values())
+    confidence = 100 * (best / total) * (best / (best + CLASSIFIER_EVIDENCE_PRIOR))
+
+    return {
+        'category': category,
+        'confidence': round(confidence, 2),
+        'scores': {name: round(score, 2) for name, score in sorted(scores.items(), key=lambda item: -item[1])},
+        'hits': hits,
+    }
@@ -1,16 +1,179 @@
 # config.py
 
+# Registro de modelos de resumen intercambiables (se elige con SUMMARIZER):
+# - output_language: idioma del resumen ("en", "es" o "input": el mismo del incidente)
+# - use_prompt_prefix: anteponer la instrucción en español (solo aporta en BART)
+# - max_input_length: tokens de entrada que admite el modelo
+# - draft_model_name: resumidor destilado con el mismo vocabulario (borrador), o None
+SUMMARIZER_REGISTRY = {
+    "bart-large-cnn": {
+        "model_name": "facebook/bart-large-cnn",
+        "output_language": "en", "use_prompt_prefix": True, "max_input_length": 1024,
+        "draft_model_name": "sshleifer/distilbart-cnn-12-6",
+    },
+    "mt5-multilingual": {
+        "model_name": "csebuetnlp/mT5_multilingual_XLSum",
+        "output_language": "input", "use_prompt_prefix": False, "max_input_length": 512,
+        "draft_model_name": None,
+    },
+    "bert2bert-spanish": {
+        "model_name": "mrm8488/bert2bert_shared-spanish-finetuned-summarization",
+        "output_language": "es", "use_prompt_prefix": False, "max_input_length": 512,
+        "draft_model_name": None,
+    },
+}
+SUMMARIZER = "bart-large-cnn"
+
 # Parámetros del Modelo
-MODEL_NAME = "facebook/bart-large-cnn" 
-MAX_INPUT_LENGTH = 1024 
+MODEL_NAME = SUMMARIZER_REGISTRY[SUMMARIZER]["model_name"]
+# Modelo borrador: se carga junto al resumidor solo si ENABLE_DRAFT_MODEL (unos 300M parámetros más)
+DRAFT_MODEL_NAME = SUMMARIZER_REGISTRY[SUMMARIZER]["draft_model_name"]
+ENABLE_DRAFT_MODEL = False
+MAX_INPUT_LENGTH = SUMMARIZER_REGISTRY[SUMMARIZER]["max_input_length"]
 MIN_LENGTH = 100         
 MAX_LENGTH = 250         
 NUM_BEAMS = 4           
 DO_SAMPLE = False       
 
+# Perfiles de generación seleccionables por petición (UI y API). "quality" conserva los
+# parámetros de siempre; con "adaptive", max_length se acota según los tokens de entrada.
+# "decoding" (con ENABLE_DRAFT_MODEL; sin modelo borrador todo es "target"):
+# - "target": solo el modelo principal
+# - "assisted": el borrador propone tokens y el principal los verifica (búsqueda voraz:
+#   transformers no admite beam search asistida); mismo texto que el principal sin beams
+# - "draft": solo el modelo borrador
+GENERATION_PROFILES = {
+    "fast": {"num_beams": 1, "min_length": 30, "max_length": 120, "early_stopping": False, "adaptive": True,
+             "decoding": "draft"},
+    "balanced": {"num_beams": 2, "min_length": 60, "max_length": 180, "early_stopping": True, "adaptive": True,
+                 "decoding": "assisted"},
+    "quality": {"num_beams": NUM_BEAMS, "min_length": MIN_LENGTH, "max_length": MAX_LENGTH,
+                "early_stopping": None, "adaptive": False,   # None: lo que traiga el modelo
+                "decoding": "target"},
+}
+DEFAULT_GENERATION_PROFILE = "quality"
+GENERATION_ADAPTIVE_RATIO = 0.5        # Tokens de resumen por token de entrada (perfiles adaptativos)
+GENERATION_ADAPTIVE_MIN_TOKENS = 40    # Suelo de max_length para entradas muy cortas
+
 # Modelo de post-procesamiento para forzar el español
 TRANSLATION_MODEL_NAME = "Helsinki-NLP/opus-mt-en-es"
 
+# Detección de idioma del resumen: la traducción solo se ejecuta si no está ya en español
+ENABLE_LANGUAGE_DETECTION = True
+LANGUAGE_DETECTION_SAMPLE_CHARS = 2000   # Caracteres examinados (el coste no crece con el texto)
+
+# Backend de inferencia: "pytorch" (FP32/FP16), "pytorch-int8" (cuantización dinámica)
+# u "onnx" (ONNX Runtime con KV cache; requiere `pip install optimum[onnxruntime]`)
+INFERENCE_BACKEND = "pytorch"
+ONNX_CACHE_DIR = "cache/onnx"   # Artefactos exportados reutilizados entre arranques
+
+# Micro-batching de peticiones concurrentes
+ENABLE_MICRO_BATCHING = True
+BATCH_MAX_SIZE = 8        # Máximo de incidentes por llamada a generate
+BATCH_MAX_WAIT_MS = 50    # Ventana de espera para completar un lote
+
+# Ejecutor de inferencia: admisión acotada por carril, plazos y prioridad (menor = antes)
+EXECUTOR_WORKERS = BATCH_MAX_SIZE   # Peticiones en ejecución a la vez (alimentan al micro-batcher)
+EXECUTOR_LANES = {
+    "interactive": {"priority": 0, "max_queue": 16, "deadline_s": 120},    # UI y /summarize
+    "bulk": {"priority": 1, "max_queue": 256, "deadline_s": 1800},         # /summarize/batch
+}
+EXECUTOR_DISCONNECT_POLL_S = 0.5    # Cada cuánto se comprueba si el cliente HTTP sigue conectado
+
+# Caché de resúmenes (LRU en memoria + SQLite opcional)
+ENABLE_SUMMARY_CACHE = True
+CACHE_MAX_ENTRIES = 256
+CACHE_DB_PATH = None      # Ej.: "cache/summaries.db" para persistir entre reinicios
+
+# Índice de incidentes casi duplicados (MinHash + LSH sobre shingles con IPs, IDs y números
+# enmascarados): un incidente muy parecido a uno ya resumido reutiliza su resumen
+ENABLE_NEAR_DUPLICATE_INDEX = True
+NEAR_DUPLICATE_REUSE = False         # True: reutiliza el resumen si además coinciden las entidades
+NEAR_DUPLICATE_THRESHOLD = 0.9       # Similitud de Jaccard estimada mínima
+NEAR_DUPLICATE_MAX_ENTRIES = 4096    # Incidentes indexados (LRU)
+NEAR_DUPLICATE_SHINGLE_WORDS = 5     # Palabras por shingle
+NEAR_DUPLICATE_MAX_SHINGLES = 8192   # Por encima, muestreo consistente de shingles (coste acotado)
+NEAR_DUPLICATE_NUM_PERM = 64         # Permutaciones de la firma MinHash
+NEAR_DUPLICATE_BANDS = 8             # Bandas LSH (8 × 8 filas: candidatos desde ~0.77 de similitud)
+
+# Reducción de ruido de logs antes del modelo: líneas repetidas ("×N"), plantillas de log
+# al estilo Drain, marcas de tiempo, UUIDs y ecos de chat. Las entidades y la clasificación
+# siguen calculándose sobre el texto original
+ENABLE_LOG_DENOISE = True
+DENOISE_TEMPLATE_SIMILARITY = 0.6      # Fracción de tokens iguales para fundir dos líneas de log
+DENOISE_MAX_TEMPLATES_PER_GROUP = 64   # Plantillas por grupo (nº de tokens, primer token)
+DENOISE_EXACT_TOKEN_WORDS = 20000      # Por encima, los tokens de la metadata se estiman por palabras
+
+# Traducción por frases con caché LRU: solo las frases nuevas pasan por opus-mt, en un único lote
+ENABLE_TRANSLATION_CACHE = True
+TRANSLATION_CACHE_MAX_ENTRIES = 4096   # Frases traducidas en memoria
+TRANSLATION_MAX_LENGTH = 260           # max_length de la traducción (por frase con la caché activa)
+TRANSLATION_BATCH_SIZE = 32            # Frases por llamada al traductor
+
+# Preselección extractiva: si el texto no cabe en la ventana, las frases mejor puntuadas
+# (TF-IDF contra el centroide, con más peso si tienen entidades o palabras clave de
+# INCIDENT_CLASSIFICATIONS) se empaquetan en su orden original en vez de truncar
+ENABLE_EXTRACTIVE_PRERANK = True
+# Ventanas a llenar: con >1 el map-reduce de documento largo resume la selección (1: una sola
+# pasada, pero el map-reduce deja de ejecutarse para cualquier entrada). Sin modo documento
+# largo se ignora y la selección llena una sola ventana (MAX_INPUT_LENGTH)
+EXTRACTIVE_BUDGET_WINDOWS = 3
+EXTRACTIVE_ENTITY_BOOST = 0.5          # Frases con IPs, recursos o IDs de incidente
+EXTRACTIVE_KEYWORD_BOOST = 0.25        # Por unidad de peso de palabra clave de la frase
+EXTRACTIVE_CHARS_PER_TOKEN = 4.0       # Estimación inicial, recalibrada con los tokens reales
+EXTRACTIVE_CALIBRATION_ROUNDS = 3
+
+# Modo documento largo (map-reduce por ventanas de tokens)
+ENABLE_LONG_DOCUMENT_MODE = True
+CHUNK_WINDOW_TOKENS = MAX_INPUT_LENGTH - 124   # Tokens por ventana (deja margen al prefijo y tokens especiales)
+CHUNK_OVERLAP_TOKENS = 100        # Solapamiento entre ventanas consecutivas
+CHUNK_BATCH_SIZE = 4              # Ventanas por llamada a generate (acota la memoria)
+CHUNK_SUMMARY_MIN_LENGTH = 30
+CHUNK_SUMMARY_MAX_LENGTH = 120
+CHUNK_MAX_LEVELS = 4              # Niveles máximos de reducción jerárquica
+CHUNK_TOKENIZE_LINES = 500        # Líneas tokenizadas por bloque
+
+# Sesiones incrementales por ID de incidente (timelines que crecen durante una caída):
+# solo el texto añadido pasa por el modelo y el resumen ejecutivo se rehace sobre los parciales.
+# Desactivadas por defecto: casi todo ticket trae un ID y el modo sesión no pasa por la
+# reducción de ruido ni la preselección extractiva (un volcado enorme iría ventana a ventana)
+ENABLE_INCIDENT_SESSIONS = False
+SESSION_MAX_ENTRIES = 128         # Sesiones activas (LRU)
+SESSION_TTL_S = 6 * 3600          # Expiración por inactividad
+SESSION_ROLLUP_TOKENS = 450       # Los resúmenes de chunks se funden en uno al superar este tamaño
+
+# Streaming token a token (los streamers de transformers no admiten beam search)
+STREAMING_DEFAULT = False
+STREAMING_NUM_BEAMS = 1
+
+# API REST sin interfaz gráfica
+ENABLE_GRADIO_UI = True   # False (o --api-only) para despliegues solo API
+API_MAX_BATCH_SIZE = 64   # Incidentes máximos por POST /summarize/batch
+
+# Prefork: el padre carga los modelos una vez y N workers los comparten por copy-on-write
+# en el mismo puerto (solo API; `python app.py --workers N`)
+PREFORK_WORKERS = 1                 # 1 = un solo proceso (modo normal)
+PREFORK_THREADS_PER_WORKER = None   # Hilos de torch por worker (None: núcleos / workers)
+
+# Capa de ejecución en CPU: los núcleos se reparten entre ranuras de inferencia (llamadas a
+# generate simultáneas por proceso), cada una con sus hilos de torch. `python benchmark_threads.py`
+# barre las distribuciones y recomienda la mejor para el equipo
+INFERENCE_SLOTS = None              # None: una ranura por cada 4 núcleos (mínimo 1)
+INFERENCE_THREADS_PER_SLOT = None   # None: núcleos / ranuras
+INFERENCE_INTEROP_THREADS = 1       # generate apenas usa paralelismo inter-op
+INFERENCE_CPU_AFFINITY = False      # Fija cada ranura (y cada worker prefork) a sus núcleos (Linux)
+
+# Arranque: "background" (el servidor responde al instante y los modelos cargan en segundo plano),
+# "lazy" (cargan con la primera petición) o "eager" (bloquea hasta cargarlos antes de servir)
+MODEL_LOADING = "background"
+ENABLE_WARMUP = True      # Inferencia de calentamiento antes de declararse listo
+MODEL_READY_WAIT_S = 5    # Espera máxima de una petición mientras cargan los modelos (luego 503)
+
+# Benchmark: modelos diminutos de pesos aleatorios para CI offline
+BENCHMARK_TINY_MODEL_NAME = "sshleifer/bart-tiny-random"
+BENCHMARK_TINY_TRANSLATION_MODEL_NAME = "hf-internal-testing/tiny-random-MarianMTModel"
+BENCHMARK_TINY_DRAFT_MODEL_NAME = BENCHMARK_TINY_MODEL_NAME   # Comparte vocabulario consigo mismo
+
 # Configuración de la Interfaz
 SERVER_NAME = "0.0.0.0"
 SERVER_PORT = 7860
@@ -26,11 +189,28 @@ INCIDENT_CLASSIFICATIONS = {
     "Seguridad": ["seguridad", "acceso", "vulnerabilidad", "phishing", "ddos", "firewall", "waf"],
     "General/Otros": []
 }
+DEFAULT_INCIDENT_CATEGORY = "General/Otros"
+
+# Peso de cada palabra clave en la puntuación (1.0 si no aparece aquí).
+# Los términos muy específicos pesan más que los genéricos.
+INCIDENT_KEYWORD_WEIGHTS = {
+    "rollback": 2.0, "bug": 1.5,
+    "router": 2.0, "switch": 1.5, "fibra": 2.0,
+    "filesystem": 2.0, "disco": 1.5,
+    "base de datos": 2.0, "sql": 2.0, "postgres": 2.0, "mongo": 2.0, "deadlock": 2.5,
+    "vulnerabilidad": 2.5, "phishing": 2.5, "ddos": 2.5, "firewall": 2.0, "waf": 2.0,
+}
+# Puntuación a la que la evidencia aporta el 50% de la confianza
+CLASSIFIER_EVIDENCE_PRIOR = 2.0
 
 # Patrones de REGEX para utils.py (¡CLAVE!)
 REGEX_PATTERNS = {
-    # IPv4 con o sin notación CIDR
-    'ips': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}(?:/\d{1,2})?\b',
+    # Pares clave-valor (Hostname: x, IP: y, Ticket: z...)
+    'key_value': r'\b(?P<kv_key>Hostname|Host|Server|OS|IP|Usuario|APP|DB|ID|Ticket)\s*:\s*(?P<kv_value>[a-zA-Z0-9.\-/]{2,})',
+    # Nombres técnicos comunes: srv-app-03, router-main-a, FW-EAST-01, API-AUTH-CORE
+    'resource': r'\b[a-z]{2,5}-[a-z]{2,5}-\d{2,5}|\b[A-Z]{3,}-\b[A-Z0-9-]{2,}',
+    # IPv4 con octetos válidos (0-255) y CIDR opcional (/0-/32)
+    'ips': r'\b(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(?:\.(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}(?:/(?:3[0-2]|[12]?\d))?\b',
     # IDs de incidente y tickets comunes
     'incident_id': r'(\bINC-[A-Z0-9]{3,}|SW-[A-Z0-9]{3,}|TICKET-[A-Z0-9]{3,}|#[0-9]{3,})'
 }
\ No newline at end of file
@@ -0,0 +1,162 @@
+# corpus.py
+import random
+
+# Corpus sintético y reproducible de incidentes para comparativas y benchmarks
+HOSTS = ["srv-app-03", "db-prod-01", "router-main-a", "FW-EAST-01", "API-AUTH-CORE", "web-front-02"]
+IPS = ["10.0.0.15", "192.168.1.20", "172.16.4.8", "10.20.30.40/24"]
+TICKETS = ["INC-4821", "TICKET-A93", "SW-7710", "#50231"]
+
+OPENINGS = [
+    "At {time} the monitoring system raised a critical alert on {host} ({ip}) for incident {ticket}.",
+    "Users reported that the service hosted on {host} was not responding, tracked as {ticket}.",
+    "The on-call engineer was paged at {time} because {host} stopped answering health checks from {ip}.",
+]
+TIMELINE = [
+    "The team checked the dashboards and saw CPU usage on {host} stuck at 100 percent.",
+    "Memory consumption kept growing until the process was killed by the kernel.",
+    "Network latency between {host} and the database increased to more than two seconds.",
+    "A deploy had been rolled out ten minutes before the first alert.",
+    "The firewall logs showed a spike of denied connections coming from {ip}.",
+    "Several SQL queries were blocked waiting on a deadlock in the orders table.",
+    "The engineer restarted the application service but the errors returned after a few minutes.",
+    "Disk usage on the filesystem reached 98 percent because of unrotated logs.",
+    "The security team reviewed access logs looking for signs of a DDoS attack.",
+    "Traffic was moved to the secondary router while the primary link was inspected.",
+    "A rollback of the latest release was prepared as a precaution.",
+    "The database administrator killed the long-running query and the locks were released.",
+]
+CLOSINGS = [
+    "The service was restored at {time} and the incident {ticket} was closed.",
+    "Root cause identified: an infinite loop in the data analysis script running on {host}.",
+    "Root cause identified: a misconfigured connection pool introduced in the last deploy.",
+    "The team scheduled a post-mortem and added alerts for the affected metrics.",
+]
+
+# Las mismas plantillas en español, para medir el ahorro de omitir la traducción
+OPENINGS_ES = [
+    "A las {time} el sistema de monitoreo generó una alerta crítica en {host} ({ip}) para el incidente {ticket}.",
+    "Los usuarios reportaron que el servicio alojado en {host} no respondía, registrado como {ticket}.",
+    "Se avisó al ingeniero de guardia a las {time} porque {host} dejó de responder a los chequeos de salud desde {ip}.",
+]
+TIMELINE_ES = [
+    "El equipo revisó los paneles y vio el uso de CPU de {host} fijo en el 100 por ciento.",
+    "El consumo de memoria siguió creciendo hasta que el kernel terminó el proceso.",
+    "La latencia de red entre {host} y la base de datos subió a más de dos segundos.",
+    "Se había desplegado una versión nueva diez minutos antes de la primera alerta.",
+    "Los registros del firewall mostraron un pico de conexiones denegadas desde {ip}.",
+    "Varias consultas SQL quedaron bloqueadas esperando por un deadlock en la tabla de pedidos.",
+    "El ingeniero reinició el servicio de la aplicación pero los errores volvieron a los pocos minutos.",
+    "El uso del disco en el filesystem llegó al 98 por ciento por registros sin rotar.",
+    "El equipo de seguridad revisó los registros de acceso buscando señales de un ataque DDoS.",
+    "El tráfico se movió al router secundario mientras se inspeccionaba el enlace principal.",
+    "Se preparó un rollback de la última versión como precaución.",
+    "El administrador de la base de datos terminó la consulta larga y se liberaron los bloqueos.",
+]
+CLOSINGS_ES = [
+    "El servicio se restableció a las {time} y el incidente {ticket} quedó cerrado.",
+    "Causa raíz identificada: un bucle infinito en el script de análisis de datos que corre en {host}.",
+    "Causa raíz identificada: un pool de conexiones mal configurado en el último despliegue.",
+    "El equipo agendó un post-mortem y agregó alertas para las métricas afectadas.",
+]
+TEMPLATES = {
+    "en": (OPENINGS, TIMELINE, CLOSINGS),
+    "es": (OPENINGS_ES, TIMELINE_ES, CLOSINGS_ES),
+}
+
+
+def generate_incident(rng, target_words, language="en"):
+    """Genera un incidente sintético de aproximadamente `target_words` palabras"""
+    openings, timeline, closings = TEMPLATES[language]
+
+    def fill(template):
+        return template.format(
+            time=f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            host=rng.choice(HOSTS), ip=rng.choice(IPS), ticket=rng.choice(TICKETS)
+        )
+
+    sentences = [fill(rng.choice(openings))]
+    words = len(sentences[0].split())
+    while words < target_words:
+        sentence = fill(rng.choice(timeline))
+        sentences.append(sentence)
+        words += len(sentence.split())
+    sentences.append(fill(rng.choice(closings)))
+    return " ".join(sentences)
+
+
+# Ruido típico de un volcado de incidente: latidos, trazas repetidas y ecos de chat
+LOG_LINES = [
+    "{stamp} INFO heartbeat ok from {host} seq={seq}",
+    "{stamp} WARN request {uuid} to {host} took {ms} ms",
+    "{stamp} ERROR connection refused to {ip} after {ms} ms (request {uuid})",
+]
+STACK_TRACE = [
+    "Traceback (most recent call last):",
+    '  File "/srv/app/handlers.py", line 214, in process_order',
+    '  File "/srv/app/db.py", line 88, in execute',
+    "psycopg2.errors.DeadlockDetected: deadlock detected",
+]
+CHAT_LINES = [
+    "[{clock}] alice: looking at {host} now",
+    "[{clock}] bob: restarting the service on {host}",
+    "[{clock}] alice: the queries on the orders table are blocked again",
+]
+
+
+def generate_noisy_incident(rng, target_words, log_lines, language="en"):
+    """
+    Incidente narrativo de ~`target_words` palabras intercalado con `log_lines`
+    líneas de log, trazas repetidas y mensajes de chat citados (con "> ")
+    """
+    narrative = generate_incident(rng, target_words, language).split(". ")
+    lines, said = [], []
+    for index in range(log_lines):
+        if index % 25 == 0 and narrative:
+            lines.append(narrative.pop(0).rstrip(".") + ".")
+        if index % 40 == 10:
+            lines.extend(STACK_TRACE)
+        elif index % 30 == 5:
+            said.append(rng.choice(CHAT_LINES).format(clock=f"{10 + index // 600:02d}:{index // 10 % 60:02d}",
+                                                      host=rng.choice(HOSTS)))
+            lines.append(said[-1])
+        elif index % 30 == 20 and said:
+            lines.append("> " + rng.choice(said))
+        else:
+            lines.append(rng.choice(LOG_LINES).format(
+                stamp=f"2024-05-01T10:{index // 60 % 60:02d}:{index % 60:02d}.{rng.randint(0, 999):03d}Z",
+                host=rng.choice(HOSTS), ip=rng.choice(IPS), seq=index, ms=rng.randint(5, 5000),
+                uuid=f"{rng.getrandbits(32):08x}-{rng.getrandbits(16):04x}-4{rng.getrandbits(12):03x}-"
+                     f"a{rng.getrandbits(12):03x}-{rng.getrandbits(48):012x}"
+            ))
+    lines.extend(sentence.rstrip(".") + "." for sentence in narrative)
+    return "\n".join(lines)
+
+
+# Log denso en disparadores: marcas de tiempo, ids de petición y recursos en cada línea
+DENSE_LOG_LINES = [
+    "{stamp} [req-{req}] ERROR db-pool: connection timeout after {ms} ms host {host}",
+    "{stamp} [req-{req}] WARN upstream {ip} answered 502 (ticket {ticket}) host {host}",
+    "{stamp} [req-{req}] INFO Host: {host} IP: {ip} latency={ms}ms",
+]
+
+
+def generate_dense_log(rng, log_lines):
+    """Volcado de `log_lines` líneas de log donde casi cada palabra lleva '-', ':', '.' o '#'"""
+    return "\n".join(
+        rng.choice(DENSE_LOG_LINES).format(
+            stamp=f"2024-05-01T10:{index // 60 % 60:02d}:{index % 60:02d}.{rng.randint(0, 999):03d}Z",
+            req=f"{rng.getrandbits(32):08x}", host=rng.choice(HOSTS), ip=rng.choice(IPS),
+            ticket=rng.choice(TICKETS), ms=rng.randint(5, 5000)
+        )
+        for index in range(log_lines)
+    )
+
+
+def build_corpus(lengths, seed=42, language="en"):
+    """Retorna un incidente por cada longitud objetivo (en palabras), con semilla fija"""
+    rng = random.Random(seed)
+    return [generate_incident(rng, target_words, language) for target_words in lengths]
+
+
+# Corpus fijo para comparar backends (todas las entradas superan MIN_LENGTH)
+FIXED_CORPUS_LENGTHS = [120, 180, 250, 400, 600]
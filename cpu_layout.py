@@ -0,0 +1,190 @@
+# cpu_layout.py
+"""
+Capa de ejecución en CPU para la inferencia con torch.
+
+Sin ella, cada llamada concurrente a `generate` abre su propio equipo de hilos
+intra-op del tamaño de todos los núcleos: con varios eventos de Gradio a la vez
+la CPU queda sobresuscrita y el throughput se desploma. Aquí los núcleos se
+reparten entre ranuras (slots) de inferencia: como mucho `slots` llamadas a la
+vez, cada una con `threads_per_slot` hilos de torch y, opcionalmente, fijada a
+su propio grupo de núcleos (p. ej. 4 ranuras × 4 hilos en 16 núcleos).
+
+    python benchmark_threads.py     # barre las distribuciones y recomienda una
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from config import INFERENCE_SLOTS, INFERENCE_THREADS_PER_SLOT, INFERENCE_INTEROP_THREADS, INFERENCE_CPU_AFFINITY
+
+DEFAULT_THREADS_PER_SLOT = 4   # Con INFERENCE_SLOTS = None: una ranura por cada 4 núcleos
+
+_slots = None
+_slots_lock = threading.Lock()
+_layout = None
+
+
+def available_cpus():
+    """Núcleos en los que puede ejecutarse el proceso (respeta taskset/cgroups en Linux)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def resolve_layout(slots=INFERENCE_SLOTS, threads_per_slot=INFERENCE_THREADS_PER_SLOT,
+                   interop_threads=INFERENCE_INTEROP_THREADS, affinity=INFERENCE_CPU_AFFINITY, cpus=None):
+    """
+    Distribución efectiva: ranuras, hilos por ranura y núcleos de cada ranura.
+    Lo que no se fija se deduce de los núcleos disponibles; slots × hilos nunca
+    supera los núcleos, salvo que ambos valores se fijen a mano.
+    """
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    if slots is None:
+        slots = max(1, len(cpus) // (threads_per_slot or DEFAULT_THREADS_PER_SLOT))
+    threads_per_slot = threads_per_slot or max(1, len(cpus) // slots)
+    return {
+        'slots': slots,
+        'threads_per_slot': threads_per_slot,
+        'interop_threads': interop_threads,
+        'affinity': bool(affinity) and hasattr(os, "sched_setaffinity"),
+        'cores': partition_cores(cpus, slots, threads_per_slot),
+    }
+
+
+def partition_cores(cpus, parts, per_part=None):
+    """Grupos contiguos de núcleos, uno por parte (se reparten de nuevo si no alcanzan)"""
+    per_part = per_part or max(1, len(cpus) // parts)
+    return [[cpus[(index * per_part + offset) % len(cpus)] for offset in range(min(per_part, len(cpus)))]
+            for index in range(parts)]
+
+
+class InferenceSlots:
+    """
+    Un hilo dedicado por ranura. Cada hilo fija su afinidad al arrancar (si está
+    activada), así que el equipo de hilos de torch que crea hereda esos núcleos y
+    los conserva; las llamadas se reparten por una cola común entre ranuras libres.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.pid = os.getpid()
+        self._queue = queue.SimpleQueue()
+        self._local = threading.local()
+        self._threads = [
+            threading.Thread(target=self._run, args=(index, cores), name=f"inference-slot-{index}", daemon=True)
+            for index, cores in enumerate(layout['cores'])
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self, index, cores):
+        self._local.slot = index
+        if self.layout['affinity']:
+            os.sched_setaffinity(0, cores)   # pid 0: solo el hilo actual
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            fn, args, kwargs, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, fn, *args, **kwargs):
+        """Encola `fn` en la siguiente ranura libre y retorna su Future"""
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def in_slot(self):
+        """True si el hilo actual es una de las ranuras"""
+        return getattr(self._local, "slot", None) is not None
+
+    def run(self, fn, *args, **kwargs):
+        """Ejecuta `fn` en una ranura y espera; dentro de una ranura se ejecuta en línea (sin bloqueo mutuo)"""
+        if self.in_slot():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+def configure(layout=None):
+    """
+    Aplica la distribución a torch (hilos intra-op por ranura e inter-op) y
+    reinicia las ranuras. `set_num_interop_threads` solo vale antes del primer
+    trabajo en paralelo: si ya no es posible, se conserva el valor actual.
+    Retorna la distribución aplicada.
+    """
+    global _slots, _layout
+    import torch
+
+    layout = layout or resolve_layout()
+    torch.set_num_threads(layout['threads_per_slot'])
+    try:
+        torch.set_num_interop_threads(layout['interop_threads'])
+    except RuntimeError:
+        pass
+    with _slots_lock:
+        if _slots is not None and _slots.pid == os.getpid():
+            _slots.shutdown()
+        _slots = None
+        _layout = layout
+    return layout
+
+
+def _current_slots():
+    """Ranuras del proceso actual: se crean al primer uso y de nuevo tras fork (los hilos no sobreviven)"""
+    global _slots
+    if _layout is None:
+        return None
+    slots = _slots
+    if slots is None or slots.pid != os.getpid():
+        with _slots_lock:
+            if _slots is None or _slots.pid != os.getpid():
+                _slots = InferenceSlots(_layout)
+            slots = _slots
+    return slots
+
+
+def run_inference(fn, *args, **kwargs):
+    """Ejecuta una llamada a un modelo en una ranura de inferencia (en línea si no hay distribución configurada)"""
+    slots = _current_slots()
+    if slots is None:
+        return fn(*args, **kwargs)
+    return slots.run(fn, *args, **kwargs)
+
+
+def submit_inference(fn, *args, **kwargs):
+    """
+    Como `run_inference` pero sin esperar: retorna un Future. Sin distribución
+    configurada (o desde una ranura), la llamada corre en un hilo propio (streaming).
+    """
+    slots = _current_slots()
+    if slots is not None and not slots.in_slot():
+        return slots.submit(fn, *args, **kwargs)
+    future = Future()
+
+    def target():
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+def current_layout():
+    """Distribución aplicada, sin la lista de núcleos por ranura (para informes y benchmarks)"""
+    if _layout is None:
+        return None
+    return {key: value for key, value in _layout.items() if key != 'cores'}
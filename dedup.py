@@ -0,0 +1,158 @@
+# dedup.py
+import hashlib
+import json
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+from config import (
+    NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_MAX_ENTRIES, NEAR_DUPLICATE_SHINGLE_WORDS,
+    NEAR_DUPLICATE_NUM_PERM, NEAR_DUPLICATE_BANDS, NEAR_DUPLICATE_MAX_SHINGLES
+)
+from utils import ENTITY_PATTERNS
+
+# Lo que cambia entre copias de un mismo incidente (IPs, IDs, horas, contadores) se
+# enmascara antes de comparar: dos alertas de la misma tormenta quedan idénticas
+MASKS = [
+    (ENTITY_PATTERNS['ips'], " <ip> "),
+    (ENTITY_PATTERNS['incident_id'], " <id> "),
+    (re.compile(r'\d+'), "0"),
+]
+WORD = re.compile(r'\w+')
+SIGNATURE_CHUNK = 256   # Shingles hasheados por bloque: la memoria de la firma no crece con el texto
+
+
+def masked_words(text):
+    """Palabras del texto normalizado (minúsculas) con las entidades variables enmascaradas"""
+    text = text.casefold()
+    for pattern, replacement in MASKS:
+        text = pattern.sub(replacement, text)
+    return WORD.findall(text)
+
+
+def entity_key(entities):
+    """Huella de las entidades extraídas (`extract_entities`): la reutilización exige que coincidan"""
+    canonical = {name: sorted(values) for name, values in entities.items()}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def shingles(text, size=NEAR_DUPLICATE_SHINGLE_WORDS, max_shingles=NEAR_DUPLICATE_MAX_SHINGLES):
+    """
+    Shingles (n-gramas de palabras) distintos del texto enmascarado. Por encima de
+    `max_shingles` se muestrean de forma consistente (por CRC32 del shingle): dos
+    textos parecidos conservan los mismos shingles y la similitud estimada se mantiene.
+    """
+    words = masked_words(text)
+    distinct = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    if len(distinct) <= max_shingles:
+        return distinct
+    stride = -(-len(distinct) // max_shingles)
+    return {shingle for shingle in distinct if zlib.crc32(shingle.encode("utf-8")) % stride == 0}
+
+
+class NearDuplicateIndex:
+    """
+    Índice de incidentes casi duplicados: firma MinHash de los shingles del texto
+    enmascarado y LSH por bandas (cada banda es una clave de diccionario), así que
+    una consulta solo compara contra los candidatos que comparten alguna banda y
+    no contra todo el archivo. Acotado a `max_entries` con desalojo LRU.
+    Las entradas se separan por `params` (modelo y perfil de generación).
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, max_entries=NEAR_DUPLICATE_MAX_ENTRIES,
+                 num_perm=NEAR_DUPLICATE_NUM_PERM, bands=NEAR_DUPLICATE_BANDS):
+        if num_perm % bands:
+            raise ValueError("NEAR_DUPLICATE_NUM_PERM debe ser múltiplo de NEAR_DUPLICATE_BANDS")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.num_perm = num_perm
+        self._unpack = struct.Struct(f"<{num_perm}Q").unpack
+        self._entries = OrderedDict()   # id -> (firma, claves de banda, resumen, huella de entidades)
+        self._buckets = {}              # clave de banda -> ids de entrada
+        self._ids = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def signature(self, text):
+        """
+        Firma MinHash. Cada shingle se hashea una sola vez con SHAKE-128 y los
+        `num_perm` bloques de 64 bits de la salida hacen de funciones hash
+        independientes. Los mínimos por columna se acumulan por bloques de
+        SIGNATURE_CHUNK shingles (zip + min en C), sin la matriz shingle × permutación.
+        Es determinista: las firmas son comparables entre reinicios y procesos.
+        """
+        size = self.num_perm * 8
+        items = list(shingles(text))
+        minima = None
+        for start in range(0, len(items), SIGNATURE_CHUNK):
+            rows = [self._unpack(hashlib.shake_128(s.encode("utf-8")).digest(size))
+                    for s in items[start:start + SIGNATURE_CHUNK]]
+            if minima is not None:
+                rows.append(minima)
+            minima = tuple(map(min, zip(*rows)))
+        return minima
+
+    def _band_keys(self, signature, params):
+        scope = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return [(scope, band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def lookup(self, text, params, entities_key=None):
+        """
+        Retorna (resumen, similitud estimada, firma, mismas entidades) del incidente
+        indexado más parecido por encima del umbral, o (None, mejor similitud, firma,
+        False). La firma enmascara hosts, IPs e IDs: solo con `entities_key` igual al
+        del incidente indexado el resumen es reutilizable tal cual. La firma se
+        reutiliza en `add` para no recalcularla.
+        """
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature, params)
+        with self._lock:
+            candidates = set()
+            for key in band_keys:
+                candidates.update(self._buckets.get(key, ()))
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                other = self._entries[entry_id][0]
+                similarity = sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is not None and best_similarity >= self.threshold:
+                self._entries.move_to_end(best_id)
+                self.hits += 1
+                _, _, summary, other_key = self._entries[best_id]
+                same_entities = entities_key is not None and entities_key == other_key
+                return summary, round(best_similarity, 4), signature, same_entities
+            self.misses += 1
+            return None, round(best_similarity, 4), signature, False
+
+    def add(self, text, summary, params, signature=None, entities_key=None):
+        """Indexa el resumen de un incidente; desaloja el menos usado si se supera el límite"""
+        signature = signature or self.signature(text)
+        band_keys = self._band_keys(signature, params)
+        with self._lock:
+            self._ids += 1
+            self._entries[self._ids] = (signature, band_keys, summary, entities_key)
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(self._ids)
+            while len(self._entries) > self.max_entries:
+                entry_id, (_, old_keys, _, _) = self._entries.popitem(last=False)
+                for key in old_keys:
+                    bucket = self._buckets[key]
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self._buckets[key]
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'buckets': len(self._buckets), 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,129 @@
+# denoise.py
+import re
+
+from config import DENOISE_TEMPLATE_SIMILARITY, DENOISE_MAX_TEMPLATES_PER_GROUP
+
+# Pre-etapa de reducción de ruido: los volcados de incidentes repiten trazas, latidos
+# (heartbeats), marcas de tiempo y mensajes de chat citados. Una sola pasada por líneas
+# los compacta antes de que el texto llegue a la ventana de 1024 tokens del modelo.
+
+MONTHS = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|Ene|Abr|Ago|Dic)'
+TIMESTAMP = (r'(?:\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'
+             r'|' + MONTHS + r'\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}'
+             r'|\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?)')
+# Marca al inicio de la línea, con o sin corchetes: "2024-05-01T10:00:00Z", "[10:31]", "May 1 10:00:00"
+TIMESTAMP_PREFIX = re.compile(r'^\s*\[?' + TIMESTAMP + r'\]?\s*[-|:]?\s*', re.IGNORECASE)
+ISO_TIMESTAMP = re.compile(r'\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?')
+# Solo una marca de máquina (ISO con fecha o syslog) convierte la línea en log: una hora
+# suelta ("10:30 El servidor...") es la cronología de una sala de crisis y se conserva tal cual
+MACHINE_TIMESTAMP_PREFIX = re.compile(
+    r'^\s*\[?(?:\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}|' + MONTHS + r'\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})', re.IGNORECASE
+)
+UUID = re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.IGNORECASE)
+HEX_ID = re.compile(r'\b0x[0-9a-f]{6,}\b|\b[0-9a-f]{24,}\b', re.IGNORECASE)
+# Niveles en mayúsculas: "error" en la narración no convierte la línea en log
+LOG_LEVEL = re.compile(r'\b(?:TRACE|DEBUG|INFO|NOTICE|WARN(?:ING)?|ERROR|CRIT(?:ICAL)?|FATAL|SEVERE)\b')
+EMPTY_BRACKETS = re.compile(r'\(\s*\)|\[\s*\]')   # "(request )" tras quitar el UUID
+QUOTE_PREFIX = re.compile(r'^(?:>\s*)+')
+# "alice: ..." / "<bob>: ...": los mensajes de chat solo se deduplican, nunca se funden en plantillas
+SPEAKER = re.compile(r'^<?@?[\w.\-]{1,32}>?:\s')
+WILDCARD = "<*>"
+
+
+class _Line:
+    """Línea de salida: texto (o plantilla de log) y cuántas líneas de entrada representa"""
+    __slots__ = ('text', 'tokens', 'count', 'templated')
+
+    def __init__(self, text, tokens=None):
+        self.text = text
+        self.tokens = tokens
+        self.count = 1
+        self.templated = False
+
+    def render(self):
+        text = " ".join(self.tokens) if self.templated else self.text
+        return f"{text} ×{self.count}" if self.count > 1 else text
+
+
+def clean_line(raw):
+    """
+    Línea sin citas de chat ("> ") y retorna (texto, es_log). Es log si trae nivel
+    de log o marca de tiempo de máquina (ISO o syslog) y no es un mensaje de chat;
+    de las líneas de log se quitan marcas de tiempo, UUIDs e IDs hexadecimales. La
+    narración y el chat se conservan tal cual, con sus horas, hosts e IDs.
+    """
+    line = QUOTE_PREFIX.sub("", raw.strip())
+    stripped = TIMESTAMP_PREFIX.sub("", line, count=1)
+    is_log = ((LOG_LEVEL.search(line) is not None or MACHINE_TIMESTAMP_PREFIX.match(line) is not None)
+              and not SPEAKER.match(stripped))
+    if not is_log:
+        return " ".join(line.split()), False
+    stripped = EMPTY_BRACKETS.sub("", HEX_ID.sub("", UUID.sub("", ISO_TIMESTAMP.sub("", stripped))))
+    return " ".join(stripped.split()), True
+
+
+def mask_tokens(line):
+    """Tokens de una línea de log con los valores variables (todo token con dígitos) enmascarados"""
+    return [WILDCARD if any(c.isdigit() for c in token) else token for token in line.split()]
+
+
+def denoise(text, similarity=DENOISE_TEMPLATE_SIMILARITY, max_templates=DENOISE_MAX_TEMPLATES_PER_GROUP):
+    """
+    Compacta el texto en una sola pasada por líneas y retorna (texto, estadísticas):
+
+    - En las líneas de log limpia marcas de tiempo, UUIDs e IDs hexadecimales (`clean_line`).
+    - Una línea idéntica a otra ya vista (trazas repetidas, latidos, ecos de chat
+      citados) no se repite: suma a la primera, que sale como "línea ×N". La
+      narración solo se deduplica si es idéntica, hora incluida.
+    - Las líneas de log se agrupan al estilo Drain por (nº de tokens, primer token);
+      dentro del grupo, una línea con al menos `similarity` de tokens iguales a una
+      plantilla se funde con ella y las posiciones que difieren pasan a "<*>".
+
+    La memoria es proporcional a las líneas distintas, no al tamaño de la entrada.
+    """
+    output = []          # _Line en orden de primera aparición
+    seen = {}            # línea limpia -> _Line que la representa
+    groups = {}          # (nº de tokens, primer token) -> plantillas de log
+    lines_in = repeated = templated = 0
+
+    for raw in text.splitlines():
+        line, is_log = clean_line(raw)
+        if not line:
+            continue
+        lines_in += 1
+        record = seen.get(line)
+        if record is not None:
+            record.count += 1
+            repeated += 1
+            continue
+
+        if not is_log:
+            record = _Line(line)
+        else:
+            tokens = mask_tokens(line)
+            group = groups.setdefault((len(tokens), tokens[0]), [])
+            threshold = similarity * len(tokens)
+            record = next((template for template in group
+                           if sum(1 for a, b in zip(template.tokens, tokens) if a == b) >= threshold), None)
+            if record is not None:
+                record.tokens = [a if a == b else WILDCARD for a, b in zip(record.tokens, tokens)]
+                record.templated = True
+                record.count += 1
+                templated += 1
+                seen[line] = record
+                continue
+            record = _Line(line, tokens)
+            if len(group) < max_templates:
+                group.append(record)
+        seen[line] = record
+        output.append(record)
+
+    denoised = "\n".join(record.render() for record in output)
+    return denoised, {
+        'lines_in': lines_in,
+        'lines_out': len(output),
+        'repeated_lines': repeated,
+        'templated_lines': templated,
+        'chars_in': len(text),
+        'chars_out': len(denoised),
+    }
@@ -0,0 +1,166 @@
+# executor.py
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from config import EXECUTOR_WORKERS, EXECUTOR_LANES
+from metrics import EXECUTOR_QUEUE_DEPTH, EXECUTOR_QUEUE_WAIT, EXECUTOR_REJECTIONS, EXECUTOR_DROPPED
+
+_DONE = object()
+
+
+class ExecutorBusy(RuntimeError):
+    """La cola del carril está llena: la API responde 429"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """La petición superó su plazo: la API responde 504"""
+
+
+class Job:
+    """Trabajo encolado: su Future, carril, plazo y la metadata de cola que ve la respuesta"""
+
+    def __init__(self, fn, lane, deadline_s, queue_depth, release=None):
+        self.fn = fn
+        self.lane = lane
+        self.future = Future()
+        self.cancelled = threading.Event()
+        self.queued = True          # Ocupa un hueco de su carril (lo protege la condición del ejecutor)
+        self._release = release
+        self.enqueued_at = time.monotonic()
+        self.deadline = self.enqueued_at + deadline_s
+        self.queue_info = {'lane': lane, 'queue_depth': queue_depth, 'deadline_s': deadline_s, 'wait_ms': None}
+
+    def cancel(self):
+        """
+        Cancela el trabajo si aún está en cola y libera su hueco en el carril al
+        momento (no cuando un worker lo saque); si ya corre, su resultado se descarta
+        """
+        self.cancelled.set()
+        if self.future.cancel() and self._release is not None:
+            self._release(self)
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+
+class InferenceExecutor:
+    """
+    Único punto de entrada a los modelos: una cola con prioridad por carril
+    (interactivo antes que bulk), capacidad acotada por carril, plazos por
+    petición y un número fijo de workers. Cuando un carril está lleno se
+    rechaza de inmediato (ExecutorBusy) en vez de acumular minutos de trabajo.
+    Los workers llaman a `fn(job)`; el micro-batcher agrupa lo que ejecutan a la vez.
+    """
+
+    def __init__(self, workers=EXECUTOR_WORKERS, lanes=EXECUTOR_LANES):
+        self.lanes = lanes
+        self._heap = []
+        self._pending = dict.fromkeys(lanes, 0)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        for lane in lanes:
+            EXECUTOR_QUEUE_DEPTH.set_function(lambda lane=lane: self._pending[lane], lane=lane)
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"inference-worker-{i}", daemon=True).start()
+
+    def queue_depth(self, lane=None):
+        with self._condition:
+            return self._pending[lane] if lane else sum(self._pending.values())
+
+    def submit(self, fn, lane="interactive", deadline_s=None):
+        """Encola `fn(job)` en el carril; lanza ExecutorBusy si el carril está lleno"""
+        config = self.lanes[lane]
+        deadline_s = min(deadline_s, config['deadline_s']) if deadline_s else config['deadline_s']
+        with self._condition:
+            if self._pending[lane] >= config['max_queue']:
+                EXECUTOR_REJECTIONS.inc(lane=lane)
+                raise ExecutorBusy(f"Sistema ocupado: {self._pending[lane]} peticiones en cola ({lane}). Reintente en unos segundos.")
+            job = Job(fn, lane, deadline_s, sum(self._pending.values()), self._release)
+            heapq.heappush(self._heap, (config['priority'], next(self._sequence), job))
+            self._pending[lane] += 1
+            self._condition.notify()
+        return job
+
+    def run(self, fn, lane="interactive", deadline_s=None):
+        """Encola y espera el resultado; si vence el plazo lanza DeadlineExceeded"""
+        job = self.submit(fn, lane, deadline_s)
+        try:
+            return job.future.result(timeout=max(0.0, job.remaining()))
+        except FutureTimeoutError:
+            job.cancel()
+            raise DeadlineExceeded(f"La petición superó su plazo de {job.queue_info['deadline_s']} s")
+
+    def stream(self, generator_fn, lane="interactive", deadline_s=None):
+        """
+        Ejecuta un generador `generator_fn(job)` en un worker y reenvía sus eventos.
+        Ocupa un hueco como cualquier trabajo; cerrar el iterador cancela el trabajo.
+        """
+        events = queue.Queue()
+
+        def forward(job):
+            for event in generator_fn(job):
+                if job.cancelled.is_set():
+                    break
+                events.put(event)
+
+        job = self.submit(forward, lane, deadline_s)
+        job.future.add_done_callback(lambda _: events.put(_DONE))
+        return self._iter_events(job, events)
+
+    @staticmethod
+    def _iter_events(job, events):
+        try:
+            while True:
+                event = events.get()
+                if event is _DONE:
+                    break
+                yield event
+            job.future.result()
+        finally:
+            job.cancel()
+
+    def _release(self, job):
+        """Libera el hueco del trabajo en su carril, una sola vez: al cancelarlo o al sacarlo de la cola"""
+        with self._condition:
+            if job.queued:
+                job.queued = False
+                self._pending[job.lane] -= 1
+
+    def _next_job(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                _, _, job = heapq.heappop(self._heap)
+                if job.queued:
+                    job.queued = False
+                    self._pending[job.lane] -= 1
+                    return job
+            # Cancelado en cola: su hueco ya se liberó
+            EXECUTOR_DROPPED.inc(reason='cancelled', lane=job.lane)
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if not job.future.set_running_or_notify_cancel():
+                EXECUTOR_DROPPED.inc(reason='cancelled', lane=job.lane)
+                continue
+
+            wait_s = time.monotonic() - job.enqueued_at
+            EXECUTOR_QUEUE_WAIT.observe(wait_s, lane=job.lane)
+            job.queue_info['wait_ms'] = round(wait_s * 1000, 2)
+            if job.remaining() <= 0:
+                EXECUTOR_DROPPED.inc(reason='deadline', lane=job.lane)
+                job.future.set_exception(DeadlineExceeded(
+                    f"La petición esperó {wait_s:.1f} s en cola y superó su plazo de {job.queue_info['deadline_s']} s"
+                ))
+                continue
+
+            try:
+                job.future.set_result(job.fn(job))
+            except Exception as e:
+                job.future.set_exception(e)
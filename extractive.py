@@ -0,0 +1,139 @@
+# extractive.py
+import math
+import re
+from collections import Counter
+
+from classifier import CLASSIFIER, WORD_PATTERN, fold_text
+from config import (
+    EXTRACTIVE_ENTITY_BOOST, EXTRACTIVE_KEYWORD_BOOST, EXTRACTIVE_CHARS_PER_TOKEN, EXTRACTIVE_CALIBRATION_ROUNDS,
+    EXTRACTIVE_BUDGET_WINDOWS, ENABLE_LONG_DOCUMENT_MODE, MAX_INPUT_LENGTH, CHUNK_WINDOW_TOKENS
+)
+from utils import extract_entities
+
+# Preselección extractiva: cuando el texto no cabe en la ventana del modelo, en vez de
+# quedarse con los primeros tokens se puntúan las frases y se empaquetan las mejores
+# (en su orden original) dentro del presupuesto. Solo CPU y lineal en el tamaño del texto.
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+TERM = re.compile(r'[^\W\d_]\w{2,}')          # Términos: 3+ caracteres y empiezan por letra
+ENTITY_TOKEN = re.compile(r'[\w./#-]+')       # Mismo alfabeto que las entidades de utils.py
+
+
+def extractive_budget(long_document_mode=ENABLE_LONG_DOCUMENT_MODE, windows=EXTRACTIVE_BUDGET_WINDOWS):
+    """
+    Tokens de la preselección: `windows` ventanas del map-reduce, o una sola ventana del
+    modelo (MAX_INPUT_LENGTH) si es 1 o si no hay modo documento largo que las resuma
+    """
+    if not long_document_mode or windows == 1:
+        return MAX_INPUT_LENGTH
+    return windows * CHUNK_WINDOW_TOKENS
+
+
+def split_sentences(text):
+    """Frases no vacías: se corta en fin de frase y en cada salto de línea (líneas de log)"""
+    return [sentence for sentence in SENTENCE_SPLIT.split(text) if sentence]
+
+
+def entity_values(entities):
+    """Valores de las entidades de `extract_entities` en minúsculas, para buscarlos por token en cada frase"""
+    return {fold_text(value) for values in entities.values() for value in values}
+
+
+def score_sentences(sentences, entities=frozenset()):
+    """
+    Puntuación de cada frase: similitud coseno de su vector TF-IDF con el centroide
+    del documento (lo que más se repite entre frases), multiplicada por
+    (1 + EXTRACTIVE_ENTITY_BOOST) si menciona alguna entidad y por
+    (1 + EXTRACTIVE_KEYWORD_BOOST × peso) por las palabras clave de INCIDENT_CLASSIFICATIONS.
+    Los vectores son dicts dispersos: coste lineal en palabras, sin matriz frase × frase.
+    Las frases repetidas se puntúan una sola vez (cuentan en el centroide cada vez).
+    """
+    unique = {}
+    for sentence in sentences:
+        unique[sentence] = unique.get(sentence, 0) + 1
+
+    vectors = []
+    document_frequency = Counter()
+    for sentence, repeats in unique.items():
+        folded = fold_text(sentence)
+        counts = Counter(TERM.findall(folded))
+        keyword_weight = sum(weight for _, _, weight in CLASSIFIER.iter_matches(WORD_PATTERN.findall(folded)))
+        has_entity = bool(entities) and not entities.isdisjoint(ENTITY_TOKEN.findall(folded))
+        vectors.append((counts, repeats, keyword_weight, has_entity))
+        for word in counts:
+            document_frequency[word] += repeats
+
+    total = len(sentences)
+    idf = {word: math.log((1 + total) / (1 + df)) + 1 for word, df in document_frequency.items()}
+    centroid = Counter()
+    for counts, repeats, _, _ in vectors:
+        for word, count in counts.items():
+            centroid[word] += repeats * count * idf[word]
+
+    by_sentence = {}
+    for sentence, (counts, _, keyword_weight, has_entity) in zip(unique, vectors):
+        weights = [(count * idf[word], centroid[word]) for word, count in counts.items()]
+        norm = math.sqrt(sum(weight * weight for weight, _ in weights))
+        score = sum(weight * center for weight, center in weights) / norm if norm else 0.0
+        if has_entity:
+            score *= 1 + EXTRACTIVE_ENTITY_BOOST
+        by_sentence[sentence] = score * (1 + EXTRACTIVE_KEYWORD_BOOST * keyword_weight)
+    return [by_sentence[sentence] for sentence in sentences]
+
+
+def _pack(ranking, sizes, budget):
+    """Índices (en orden original) de las frases mejor puntuadas cuyo tamaño estimado cabe en `budget`"""
+    chosen, used = [], 0.0
+    for index in ranking:
+        if used + sizes[index] <= budget:
+            chosen.append(index)
+            used += sizes[index]
+    return sorted(chosen)
+
+
+def select_salient(text, token_budget, measure, entities=None):
+    """
+    Empaqueta las frases mejor puntuadas en `token_budget` tokens y las une en su
+    orden original. `measure(texto)` da los tokens reales de la selección: el
+    tamaño de cada frase se estima por caracteres y se recalibra con esa medida
+    (hasta EXTRACTIVE_CALIBRATION_ROUNDS veces), así que solo se tokeniza lo
+    seleccionado, nunca el documento entero. `entities` es el dict de entidades de
+    `extract_entities` (si falta, se extrae de `text`). Retorna (texto seleccionado, metadata).
+    """
+    sentences = split_sentences(text)
+    if entities is None:
+        entities, _ = extract_entities(text)
+    scores = score_sentences(sentences, entity_values(entities))
+    # Una frase repetida solo entra una vez: la primera aparición
+    first_seen = {}
+    for index, sentence in enumerate(sentences):
+        first_seen.setdefault(sentence, index)
+    ranking = sorted(first_seen.values(), key=lambda index: -scores[index])
+
+    chars_per_token = EXTRACTIVE_CHARS_PER_TOKEN
+    best_text, best_chosen, tokens = "", [], 0
+    for _ in range(EXTRACTIVE_CALIBRATION_ROUNDS):
+        sizes = [len(sentence) / chars_per_token for sentence in sentences]
+        chosen = _pack(ranking, sizes, token_budget)
+        selected = "\n".join(sentences[index] for index in chosen)
+        measured = measure(selected)
+        if measured <= token_budget and len(selected) >= len(best_text):
+            best_text, best_chosen, tokens = selected, chosen, measured
+        estimated = sum(sizes[index] for index in chosen)
+        if not measured or not estimated or abs(measured - estimated) <= 0.05 * token_budget:
+            break
+        chars_per_token *= estimated / measured
+    if not best_chosen:
+        # Ni la selección más pequeña cabe: se entrega la mejor frase y la truncará `truncate_ids`
+        best_chosen = ranking[:1]
+        best_text = sentences[ranking[0]] if ranking else ""
+        tokens = measure(best_text)
+
+    return best_text, {
+        'sentences_in': len(sentences),
+        'sentences_out': len(best_chosen),
+        'token_budget': token_budget,
+        'tokens_out': tokens,
+        # Posición relativa de la última frase elegida: 1.0 = el final del documento está cubierto
+        'last_position': round((best_chosen[-1] + 1) / len(sentences), 3) if best_chosen else 0.0,
+    }
@@ -0,0 +1,176 @@
+# generation.py
+
+# Generación directa sobre ids de token: el texto se tokeniza una sola vez y
+# `model.generate` recibe el lote ya codificado, sin decodificar ni volver a tokenizar.
+import threading
+import time
+
+from config import (
+    DO_SAMPLE, GENERATION_PROFILES, DEFAULT_GENERATION_PROFILE,
+    GENERATION_ADAPTIVE_RATIO, GENERATION_ADAPTIVE_MIN_TOKENS,
+    DRAFT_MODEL_NAME, ENABLE_DRAFT_MODEL, MODEL_NAME
+)
+from cpu_layout import run_inference
+from metrics import DRAFT_TOKENS, GENERATION_TOKENS_PER_SECOND
+
+# Pasadas forward de cada modelo en el hilo actual (generate corre entero en una ranura)
+_forward_calls = threading.local()
+
+
+def validate_generation_profile(profile):
+    """Mensaje de error si el perfil no existe (None usa el perfil por defecto)"""
+    if profile is not None and profile not in GENERATION_PROFILES:
+        return f"Perfil de generación desconocido: '{profile}'. Opciones: {', '.join(GENERATION_PROFILES)}."
+    return None
+
+
+def generation_kwargs(profile=DEFAULT_GENERATION_PROFILE, input_tokens=None):
+    """
+    Argumentos de `generate` del perfil. En los perfiles adaptativos, max_length
+    se acota a una fracción de los tokens de entrada (el más largo del lote) y
+    min_length a la mitad de max_length, para no forzar resúmenes de relleno.
+    Incluyen 'decoding' (modo del modelo borrador), que consume `generate_from_ids`.
+    """
+    settings = GENERATION_PROFILES[profile]
+    max_length, min_length = settings['max_length'], settings['min_length']
+    if settings['adaptive'] and input_tokens:
+        max_length = min(max_length, max(GENERATION_ADAPTIVE_MIN_TOKENS, int(input_tokens * GENERATION_ADAPTIVE_RATIO)))
+        min_length = min(min_length, max_length // 2)
+    decoding = settings['decoding'] if ENABLE_DRAFT_MODEL and DRAFT_MODEL_NAME else 'target'
+    # La generación asistida de transformers solo admite búsqueda voraz (o muestreo)
+    num_beams = 1 if decoding == 'assisted' else settings['num_beams']
+    kwargs = {'num_beams': num_beams, 'min_length': min_length, 'max_length': max_length,
+              'do_sample': DO_SAMPLE, 'decoding': decoding}
+    # early_stopping solo tiene efecto (y solo es válido sin avisos) con beam search
+    if num_beams > 1 and settings['early_stopping'] is not None:
+        kwargs['early_stopping'] = settings['early_stopping']
+    return kwargs
+
+
+def generation_metadata(profile, kwargs, decoding_stats=None):
+    """Perfil, límites efectivos de generación y decodificación para `model_metadata`"""
+    return {'generation_profile': profile, 'num_beams': kwargs['num_beams'],
+            'min_length': kwargs['min_length'], 'max_length': kwargs['max_length'],
+            'decoding': decoding_stats or {'mode': kwargs.get('decoding', 'target')}}
+
+
+def summary_model_name(decoding):
+    """
+    Modelo que escribió el resumen: el medido por `decoding_metadata` o, si solo se
+    conoce el modo (aciertos de caché, streaming), el borrador en 'draft' y el principal en el resto
+    """
+    return decoding.get('model') or (DRAFT_MODEL_NAME if decoding['mode'] == 'draft' else MODEL_NAME)
+
+
+def _count_forward(role):
+    def hook(module, args, output):
+        setattr(_forward_calls, role, getattr(_forward_calls, role, 0) + 1)
+    return hook
+
+
+def attach_draft_model(generation_pipeline, draft_model):
+    """
+    Asocia el modelo borrador al pipeline de resumen (`draft_model`, None si no hay)
+    y cuenta las pasadas forward de ambos modelos para medir la aceptación de la
+    generación asistida. El encoder se ejecuta aparte, así que cada pasada contada
+    es un paso del decoder: del borrador, un token propuesto; del principal, una verificación.
+    """
+    generation_pipeline.draft_model = draft_model
+    if draft_model is not None:
+        generation_pipeline.model.register_forward_hook(_count_forward('target'))
+        draft_model.register_forward_hook(_count_forward('draft'))
+    return generation_pipeline
+
+
+def resolve_decoding(generation_pipeline, decoding):
+    """Modo efectivo: sin modelo borrador cargado, todo se decodifica con el principal"""
+    if decoding in ('assisted', 'draft') and getattr(generation_pipeline, 'draft_model', None) is not None:
+        return decoding
+    return 'target'
+
+
+def decoding_metadata(decoding, model, output_tokens, elapsed, forward_calls=None, new_tokens=0):
+    """
+    Modo, modelo y tokens/s de la generación. En la asistida, cada verificación del
+    principal acepta n tokens del borrador y añade uno propio: aceptados = tokens
+    nuevos − verificaciones, y la tasa de aceptación es aceptados / tokens propuestos.
+    """
+    generated = sum(output_tokens)
+    tokens_per_second = generated / elapsed if elapsed > 0 else 0.0
+    GENERATION_TOKENS_PER_SECOND.observe(tokens_per_second, decoding=decoding)
+    stats = {'mode': decoding, 'model': model.config.name_or_path, 'output_tokens': generated,
+             'tokens_per_second': round(tokens_per_second, 1)}
+    if decoding == 'assisted':
+        proposed = forward_calls['draft']
+        accepted = min(proposed, max(0, new_tokens - forward_calls['target']))
+        DRAFT_TOKENS.inc(accepted, result='accepted')
+        DRAFT_TOKENS.inc(proposed - accepted, result='rejected')
+        stats.update({'draft_tokens': proposed, 'accepted_tokens': accepted, 'verify_passes': forward_calls['target'],
+                      'acceptance_rate': round(accepted / proposed, 4) if proposed else 0.0})
+    return stats
+
+
+def encode_text(tokenizer, text):
+    """IDs del texto sin tokens especiales ni truncado (el recorte lo hace `truncate_ids`)"""
+    return tokenizer(text, add_special_tokens=False).input_ids
+
+
+def truncate_ids(tokenizer, ids, max_length):
+    """
+    Recorta los ids para que quepan en `max_length` junto con los tokens especiales
+    del modelo. Retorna (ids listos para el modelo, tokens descartados).
+    """
+    budget = max_length - tokenizer.num_special_tokens_to_add(pair=False)
+    return tokenizer.build_inputs_with_special_tokens(ids[:budget]), max(0, len(ids) - budget)
+
+
+def truncation_metadata(model_ids, tokens_dropped):
+    """Metadata de truncado por petición"""
+    return {'truncated': tokens_dropped > 0, 'tokens_dropped': tokens_dropped, 'input_tokens': len(model_ids)}
+
+
+def generate_from_ids(generation_pipeline, batch_ids, decoding_stats=None, **generate_kwargs):
+    """
+    Rellena (padding) el lote de ids, ejecuta `model.generate` con el modelo del
+    pipeline y decodifica. Retorna (textos, tokens generados por secuencia sin
+    contar especiales ni padding). Según 'decoding' genera el modelo principal, el
+    borrador, o el principal asistido por el borrador; si se recibe `decoding_stats`
+    (dict), se rellena con `decoding_metadata`.
+    """
+    import torch
+
+    decoding = resolve_decoding(generation_pipeline, generate_kwargs.pop('decoding', 'target'))
+    tokenizer = generation_pipeline.tokenizer
+    model = generation_pipeline.draft_model if decoding == 'draft' else generation_pipeline.model
+    # La generación asistida de transformers solo admite lotes de 1: se recorre el lote
+    groups = [[ids] for ids in batch_ids] if decoding == 'assisted' else [batch_ids]
+    if decoding == 'assisted':
+        generate_kwargs['assistant_model'] = generation_pipeline.draft_model
+
+    def generate():
+        # no_grad es por hilo: se activa dentro de la ranura de inferencia que ejecuta generate
+        _forward_calls.target = _forward_calls.draft = 0
+        rows = []
+        with torch.no_grad():
+            for group in groups:
+                batch = tokenizer.pad({'input_ids': group}, return_tensors="pt")
+                rows.extend(model.generate(
+                    input_ids=batch['input_ids'].to(model.device),
+                    attention_mask=batch['attention_mask'].to(model.device),
+                    **generate_kwargs
+                ).tolist())
+        return rows, {'target': _forward_calls.target, 'draft': _forward_calls.draft}
+
+    start = time.perf_counter()
+    output_rows, forward_calls = run_inference(generate)
+    elapsed = time.perf_counter() - start
+
+    special_ids = set(tokenizer.all_special_ids)
+    output_tokens = [sum(1 for token in row if token not in special_ids) for row in output_rows]
+    if decoding_stats is not None:
+        # Sin padding (lotes de 1): tokens nuevos = longitud menos el token inicial del decoder
+        new_tokens = sum(len(row) - 1 for row in output_rows)
+        decoding_stats.update(decoding_metadata(decoding, model, output_tokens, elapsed, forward_calls, new_tokens))
+    # Mismo decodificado que el pipeline de resumen
+    texts = tokenizer.batch_decode(output_rows, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+    return texts, output_tokens
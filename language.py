@@ -0,0 +1,49 @@
+# language.py
+import re
+
+from config import LANGUAGE_DETECTION_SAMPLE_CHARS
+
+# Detector español/inglés por palabras funcionales: sin modelos ni dependencias,
+# y con coste acotado porque solo examina el comienzo del texto.
+SPANISH_STOPWORDS = frozenset("""
+    de la que el en y los se del las un por con una su para es al lo como más pero sus le ya fue
+    este ha porque esta son entre está cuando muy sin sobre también hasta hay donde han quien
+    están desde todo nos durante todos uno les ni contra otros fueron ese eso había ante ellos
+    esto antes algunos qué unos otro otras otra él tanto esa estos mucho nada muchos cual sea
+    poco ella estar estas estaba algunas algo sido tras según después mientras
+""".split())
+ENGLISH_STOPWORDS = frozenset("""
+    the of and to in is was that for on it with as at by be this are from an or were had has
+    have not but which after been their they we our its into than then there when while because
+    would could should about over also more some other these those what who will can did does
+    during before until without
+""".split())
+# Caracteres que solo aparecen en español (entre los dos idiomas considerados)
+SPANISH_CHARS = re.compile(r'[ñáéíóú¿¡]')
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+MIN_EVIDENCE = 3
+DOMINANCE_RATIO = 2.0
+
+
+def detect_language(text, sample_chars=LANGUAGE_DETECTION_SAMPLE_CHARS):
+    """
+    Retorna 'es', 'en' o 'unknown' (poca evidencia o texto mixto).
+    Cada palabra funcional cuenta un punto; cada carácter exclusivo del español, medio.
+    """
+    sample = text[:sample_chars].lower()
+    spanish = english = 0
+    for word in WORD_PATTERN.findall(sample):
+        if word in SPANISH_STOPWORDS:
+            spanish += 1
+        elif word in ENGLISH_STOPWORDS:
+            english += 1
+    spanish += 0.5 * len(SPANISH_CHARS.findall(sample))
+
+    if spanish + english < MIN_EVIDENCE:
+        return 'unknown'
+    if spanish >= DOMINANCE_RATIO * english:
+        return 'es'
+    if english >= DOMINANCE_RATIO * spanish:
+        return 'en'
+    return 'unknown'
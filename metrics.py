@@ -0,0 +1,193 @@
+# metrics.py
+import threading
+import time
+from contextlib import contextmanager
+
+# Métricas en formato de exposición de Prometheus (texto), sin dependencias externas
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 768, 1024, 2048, 4096)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+RATE_BUCKETS = (5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, str(labels.get(name, ""))) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, fn, **labels):
+        """Valor calculado en el momento de exponer las métricas (p. ej. profundidad de cola)"""
+        with self._lock:
+            self._functions[self._key(labels)] = fn
+
+    def _samples(self):
+        values = dict(self._values)
+        values.update({key: fn() for key, fn in self._functions.items()})
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def _samples(self):
+        lines = []
+        for key, series in self._series.items():
+            total, count = series['sum'], series['count']
+            for bound, bucket_count in zip(self.buckets, series['buckets']):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', str(bound)),))} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Texto completo para el endpoint /metrics"""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "incident_stage_latency_seconds", "Latencia por etapa del pipeline de incidentes", ["stage"]))
+INPUT_TOKENS = REGISTRY.register(Histogram(
+    "incident_input_tokens", "Tokens de entrada al modelo de resumen", buckets=TOKEN_BUCKETS))
+OUTPUT_TOKENS = REGISTRY.register(Histogram(
+    "incident_output_tokens", "Tokens generados por el modelo de resumen", buckets=TOKEN_BUCKETS))
+BATCH_SIZE = REGISTRY.register(Histogram(
+    "incident_batch_size", "Incidentes por llamada a generate", buckets=BATCH_BUCKETS))
+ERRORS = REGISTRY.register(Counter(
+    "incident_errors_total", "Errores de procesamiento por tipo", ["type"]))
+STAGE_SKIPS = REGISTRY.register(Counter(
+    "incident_stage_skips_total", "Etapas omitidas por petición (p. ej. traducción de resúmenes ya en español)", ["stage"]))
+TRUNCATIONS = REGISTRY.register(Counter(
+    "incident_truncations_total", "Entradas truncadas a MAX_INPUT_LENGTH"))
+EXECUTOR_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "incident_executor_queue_depth", "Peticiones esperando en el ejecutor de inferencia", ["lane"]))
+EXECUTOR_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "incident_executor_queue_wait_seconds", "Espera en cola del ejecutor antes de ejecutarse", ["lane"]))
+EXECUTOR_REJECTIONS = REGISTRY.register(Counter(
+    "incident_executor_rejections_total", "Peticiones rechazadas por carril lleno (429)", ["lane"]))
+EXECUTOR_DROPPED = REGISTRY.register(Counter(
+    "incident_executor_dropped_total", "Trabajos descartados antes de ejecutarse", ["reason", "lane"]))
+NEAR_DUPLICATE_REUSES = REGISTRY.register(Counter(
+    "incident_near_duplicate_reuses_total", "Resúmenes reutilizados de incidentes casi duplicados"))
+NEAR_DUPLICATE_ENTRIES = REGISTRY.register(Gauge(
+    "incident_near_duplicate_entries", "Incidentes en el índice de casi duplicados"))
+DENOISE_TOKENS_REMOVED = REGISTRY.register(Counter(
+    "incident_denoise_tokens_removed_total", "Tokens eliminados por la reducción de ruido antes del modelo"))
+TRANSLATION_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "incident_translation_cache_lookups_total", "Frases de resumen buscadas en la caché de traducción", ["result"]))
+TRANSLATION_SECONDS_SAVED = REGISTRY.register(Counter(
+    "incident_translation_seconds_saved_total", "Tiempo de traducción estimado ahorrado por la caché de frases"))
+DRAFT_TOKENS = REGISTRY.register(Counter(
+    "incident_draft_tokens_total", "Tokens propuestos por el modelo borrador en generación asistida", ["result"]))
+GENERATION_TOKENS_PER_SECOND = REGISTRY.register(Histogram(
+    "incident_generation_tokens_per_second", "Tokens generados por segundo en cada llamada a generate",
+    ["decoding"], buckets=RATE_BUCKETS))
+ACTIVE_SESSIONS = REGISTRY.register(Gauge(
+    "incident_active_sessions", "Sesiones incrementales de incidente en memoria"))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "incident_queue_depth", "Peticiones esperando en la cola de micro-batching"))
+MODEL_MEMORY = REGISTRY.register(Gauge(
+    "model_memory_bytes", "Memoria ocupada por los pesos de cada modelo", ["model"]))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "model_load_seconds", "Tiempo de carga de cada modelo", ["model"]))
+MODEL_READY = REGISTRY.register(Gauge(
+    "model_ready", "1 cuando los modelos están cargados y calentados"))
+
+
+@contextmanager
+def track_stage(stage, timings=None):
+    """
+    Cronometra una etapa: la observa en el histograma de latencia y, si se
+    recibe `timings`, anota los milisegundos para la metadata de la respuesta.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[stage] = round(elapsed * 1000, 2)
+
+
+def model_memory_bytes(model):
+    """Bytes de parámetros y buffers de un modelo PyTorch (0 si el backend no los expone)"""
+    if not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
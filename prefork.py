@@ -0,0 +1,166 @@
+# prefork.py
+"""
+Servidor prefork: el proceso padre carga los modelos una sola vez y luego
+crea N workers con fork(). Los tensores de pesos quedan en páginas que los
+workers solo leen, así que el kernel las comparte (copy-on-write) en vez de
+duplicar BART y opus-mt en cada réplica. Todos los workers aceptan conexiones
+del mismo socket, ya abierto por el padre, y el kernel reparte las peticiones.
+
+    python app.py --workers 4            # 4 workers × (núcleos / 4) hilos de torch
+    kill -USR1 <pid del padre>           # informe de memoria RSS/PSS/compartida por worker
+
+Cada worker reparte sus núcleos entre ranuras de inferencia (cpu_layout.py) y, con
+INFERENCE_CPU_AFFINITY, queda fijado a su propio grupo de núcleos.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from config import SERVER_NAME, SERVER_PORT, INFERENCE_BACKEND, INFERENCE_CPU_AFFINITY
+from cpu_layout import available_cpus, partition_cores, resolve_layout, configure
+
+RESPAWN_DELAY_S = 1.0   # Evita un bucle de reinicios si un worker muere al arrancar
+
+
+def threads_per_worker(workers, threads=None):
+    """Hilos de torch por worker: los núcleos se reparten para no sobresuscribir la CPU"""
+    return threads or max(1, (os.cpu_count() or 1) // workers)
+
+
+def bind_socket(host=SERVER_NAME, port=SERVER_PORT, backlog=2048):
+    """Socket de escucha creado en el padre y heredado por todos los workers"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def memory_usage(pid):
+    """
+    Memoria de un proceso en MB según /proc/<pid>/smaps_rollup (Linux):
+    RSS, PSS (las páginas compartidas se reparten entre quienes las comparten),
+    compartida y privada. La privada es lo que cuesta realmente cada worker.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        'rss_mb': round(fields.get('Rss', 0.0), 1),
+        'pss_mb': round(fields.get('Pss', 0.0), 1),
+        'shared_mb': round(fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0), 1),
+        'private_mb': round(fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0), 1),
+    }
+
+
+def print_memory_report(pids):
+    """Tabla de memoria del padre y de cada worker (se imprime con SIGUSR1)"""
+    print(f"{'proceso':<16}{'RSS MB':>10}{'PSS MB':>10}{'compartida':>12}{'privada':>10}", file=sys.stderr)
+    for label, pid in [("padre", os.getpid())] + [(f"worker {index}", pid) for pid, index in sorted(pids.items())]:
+        try:
+            usage = memory_usage(pid)
+        except OSError:
+            continue
+        print(f"{label:<16}{usage['rss_mb']:>10}{usage['pss_mb']:>10}{usage['shared_mb']:>12}{usage['private_mb']:>10}",
+              file=sys.stderr)
+
+
+def _run_worker(index, sock, models, build_app, threads, cpus):
+    """Cuerpo del proceso hijo: nunca retorna"""
+    import uvicorn
+
+    status = 0
+    try:
+        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        if INFERENCE_CPU_AFFINITY and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)   # Los hilos que se creen después heredan los núcleos
+        layout = configure(resolve_layout(cpus=cpus))
+        # Los hilos (micro-batcher, ejecutor, cargador, ranuras) no sobreviven a fork: se crean aquí
+        app = build_app(models)
+        print(f"👷 Worker {index} (pid {os.getpid()}) con {layout['slots']} ranuras × "
+              f"{layout['threads_per_slot']} hilos de torch en los núcleos {cpus}", file=sys.stderr)
+        uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+    except BaseException as e:
+        print(f"❌ Worker {index} terminó con error: {e}", file=sys.stderr)
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def serve_prefork(load_models, build_app, workers, threads=None, host=SERVER_NAME, port=SERVER_PORT):
+    """
+    Carga los modelos con `load_models()`, abre el socket y crea `workers`
+    procesos que sirven `build_app(models)`. El padre solo supervisa: reinicia
+    los workers que mueren y reenvía SIGTERM/SIGINT para un apagado ordenado.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("El modo prefork requiere fork() (Linux o macOS)")
+    if INFERENCE_BACKEND == "onnx":
+        # Las sesiones de ONNX Runtime crean sus pools de hilos al cargarse: no son seguras tras fork
+        raise RuntimeError("El modo prefork no admite el backend 'onnx'; use 'pytorch' o 'pytorch-int8'")
+
+    import torch
+
+    threads = threads_per_worker(workers, threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    torch.set_num_threads(threads)
+
+    load_start = time.perf_counter()
+    models = load_models()
+    print(f"✅ Modelos cargados una vez en el padre en {time.perf_counter() - load_start:.1f} s", file=sys.stderr)
+
+    sock = bind_socket(host, port)
+    # Los objetos del padre pasan a la generación permanente: el GC de los workers
+    # no los recorre y no ensucia (copia) las páginas compartidas
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    worker_cpus = partition_cores(available_cpus(), workers, threads)
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(index, sock, models, build_app, threads, worker_cpus[index])
+        children[pid] = index
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: print_memory_report(children))
+
+    for index in range(workers):
+        spawn(index)
+    print(f"🌐 {workers} workers × {threads} hilos en {host}:{port} (padre pid {os.getpid()})", file=sys.stderr)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"⚠️ Worker {index} (pid {pid}) terminó con estado {status}; reiniciando", file=sys.stderr)
+        time.sleep(RESPAWN_DELAY_S)
+        if not stopping:
+            spawn(index)
+    sock.close()
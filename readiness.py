@@ -0,0 +1,107 @@
+# readiness.py
+import threading
+import time
+
+# Estados de carga de los modelos, en orden
+MODEL_STATES = ("idle", "loading", "warming_up", "ready", "failed")
+
+
+class ModelsNotReady(RuntimeError):
+    """Los modelos todavía se están cargando (o la carga falló): la API responde 503"""
+
+
+class ModelManager:
+    """
+    Carga los modelos en un hilo de fondo para que el servidor acepte conexiones
+    (liveness, readiness, UI) desde el primer segundo.
+
+    `load_fn()` retorna el runtime (modelos y servicios) y `warmup_fn(runtime)`,
+    si se indica, ejecuta una inferencia de calentamiento antes de declararse listo.
+    """
+
+    def __init__(self, load_fn, warmup_fn=None):
+        self._load_fn = load_fn
+        self._warmup_fn = warmup_fn
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.state = "idle"
+        self.error = None
+        self.runtime = None
+        self._started_at = None
+        self._finished_at = None
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def start(self):
+        """Inicia la carga en segundo plano (idempotente)"""
+        with self._lock:
+            if self.state != "idle":
+                return
+            self.state = "loading"
+            self._started_at = time.perf_counter()
+        threading.Thread(target=self._load, name="model-loader", daemon=True).start()
+
+    def _load(self):
+        try:
+            runtime = self._load_fn()
+            if self._warmup_fn is not None:
+                self.state = "warming_up"
+                try:
+                    self._warmup_fn(runtime)
+                except Exception as e:
+                    # Un calentamiento fallido no impide servir: solo la primera petición será lenta
+                    print(f"⚠️ Calentamiento omitido: {type(e).__name__}: {e}")
+            self.runtime = runtime
+            self.state = "ready"
+            print(f"✅ Modelos listos en {self.elapsed_seconds():.1f} s")
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = "failed"
+            print(f"❌ Error cargando los modelos: {self.error}")
+        finally:
+            self._finished_at = time.perf_counter()
+            self._done.set()
+
+    def wait(self, timeout=None):
+        """Espera a que termine la carga; retorna True si los modelos están listos"""
+        self._done.wait(timeout)
+        return self.ready
+
+    def get(self, timeout=0):
+        """
+        Retorna el runtime, iniciando la carga si aún no empezó (modo perezoso).
+        Espera hasta `timeout` segundos; si no está listo lanza ModelsNotReady.
+        """
+        self.start()
+        if not self.wait(timeout):
+            raise ModelsNotReady(self.describe())
+        return self.runtime
+
+    def elapsed_seconds(self):
+        if self._started_at is None:
+            return 0.0
+        return (self._finished_at or time.perf_counter()) - self._started_at
+
+    def describe(self):
+        """Mensaje legible del estado actual"""
+        if self.state == "failed":
+            return f"La carga de los modelos falló: {self.error}"
+        if self.state == "idle":
+            return "Los modelos se cargarán con la primera petición."
+        if self.state == "warming_up":
+            return f"Calentando los modelos ({self.elapsed_seconds():.0f} s)..."
+        if self.state == "loading":
+            return f"Cargando los modelos ({self.elapsed_seconds():.0f} s)..."
+        return "Modelos listos."
+
+    def status(self):
+        """Estado para /readyz y la interfaz"""
+        return {
+            "status": self.state,
+            "ready": self.ready,
+            "message": self.describe(),
+            "elapsed_seconds": round(self.elapsed_seconds(), 2),
+            "error": self.error,
+        }
@@ -0,0 +1,169 @@
+# sessions.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    SESSION_MAX_ENTRIES, SESSION_TTL_S, SESSION_ROLLUP_TOKENS,
+    CHUNK_WINDOW_TOKENS, CHUNK_OVERLAP_TOKENS, NUM_BEAMS
+)
+from chunking import summarize_windows
+from generation import encode_text
+from utils import extract_entities
+
+
+def incident_session_key(text, extraction=None):
+    """
+    Clave de sesión: el primer ID de incidente del texto (INC-..., TICKET-..., #...).
+    Al ser el primero en orden de aparición, no cambia mientras el texto solo crece.
+    Con `extraction` (el par de extract_entities) se toman sus IDs directamente.
+    """
+    entities, _ = extraction if extraction is not None else extract_entities(text)
+    incident_ids = entities.get('incident_id')
+    return incident_ids[0] if incident_ids else None
+
+
+class IncidentSession:
+    """
+    Estado incremental de un incidente en curso: resúmenes de las ventanas ya
+    selladas y la cola de tokens que aún no completa una ventana. Ambos están
+    acotados (la cola < una ventana; los resúmenes se funden al superar
+    SESSION_ROLLUP_TOKENS), así que la memoria no crece con el historial.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.lock = threading.Lock()
+        self.updated_at = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        self.consumed_chars = 0
+        self._digest = hashlib.sha256()
+        self.chunk_summaries = []
+        self.tail_ids = []
+        self.sealed_chunks = 0
+        self.rollups = 0
+        self.updates = 0
+
+    def _delta(self, text):
+        """Texto añadido desde la última actualización, o None si el historial no es una ampliación"""
+        if len(text) < self.consumed_chars:
+            return None
+        if hashlib.sha256(text[:self.consumed_chars].encode("utf-8")).digest() != self._digest.digest():
+            return None
+        return text[self.consumed_chars:]
+
+    def advance(self, text, tokenizer, summarizer, window=CHUNK_WINDOW_TOKENS, overlap=CHUNK_OVERLAP_TOKENS,
+                num_beams=NUM_BEAMS, decoding='target'):
+        """
+        Consume el texto nuevo: tokeniza solo el delta, resume las ventanas que
+        se completan y deja el resto en la cola. Si el texto ya no empieza por lo
+        consumido (historial editado), la sesión se reinicia con el texto completo.
+        `num_beams` y `decoding` siguen al perfil de generación de la petición.
+        """
+        delta = self._delta(text)
+        reset = delta is None
+        if reset:
+            self.reset()
+            delta = text
+
+        self.tail_ids.extend(encode_text(tokenizer, delta))
+        self.consumed_chars = len(text)
+        self._digest.update(delta.encode("utf-8"))
+
+        windows = []
+        while len(self.tail_ids) >= window:
+            windows.append(self.tail_ids[:window])
+            self.tail_ids = self.tail_ids[window - overlap:]
+
+        chunk_timings = []
+        if windows:
+            self.chunk_summaries.extend(summarize_windows(windows, tokenizer, summarizer, 0, chunk_timings,
+                                                          num_beams, decoding))
+            self.sealed_chunks += len(windows)
+            self._roll_up(tokenizer, summarizer, chunk_timings, num_beams=num_beams, decoding=decoding)
+
+        self.updates += 1
+        self.updated_at = time.monotonic()
+        return {
+            'key': self.key,
+            'reset': reset,
+            'delta_chars': len(delta),
+            'new_chunks': len(windows),
+            'sealed_chunks': self.sealed_chunks,
+            'rollups': self.rollups,
+            'tail_tokens': len(self.tail_ids),
+            'updates': self.updates,
+            'chunks': chunk_timings,
+        }
+
+    def _roll_up(self, tokenizer, summarizer, chunk_timings, max_tokens=SESSION_ROLLUP_TOKENS, num_beams=NUM_BEAMS,
+                 decoding='target'):
+        """Funde los resúmenes acumulados en uno cuando superan `max_tokens`"""
+        ids = encode_text(tokenizer, "\n".join(self.chunk_summaries))
+        while len(ids) > max_tokens and len(self.chunk_summaries) > 1:
+            windows = [ids[start:start + CHUNK_WINDOW_TOKENS] for start in range(0, len(ids), CHUNK_WINDOW_TOKENS)]
+            self.chunk_summaries = summarize_windows(windows, tokenizer, summarizer, 1, chunk_timings, num_beams, decoding)
+            self.rollups += 1
+            ids = encode_text(tokenizer, "\n".join(self.chunk_summaries))
+
+    def summary_input(self, tokenizer, summarizer, budget, num_beams=NUM_BEAMS, decoding='target'):
+        """
+        Ids del contenido del resumen ejecutivo: resúmenes sellados más la cola
+        literal. Si no caben en `budget` tokens, la cola también se resume (sin guardarla).
+        """
+        context_ids = encode_text(tokenizer, "\n".join(self.chunk_summaries) + "\n") if self.chunk_summaries else []
+        if len(context_ids) + len(self.tail_ids) <= budget:
+            return context_ids + self.tail_ids
+        tail_summary = summarize_windows([self.tail_ids], tokenizer, summarizer, 0, [], num_beams, decoding)
+        return encode_text(tokenizer, "\n".join(self.chunk_summaries + tail_summary))
+
+
+class SessionStore:
+    """Sesiones de incidente acotadas: LRU por número de sesiones y expiración por inactividad"""
+
+    def __init__(self, max_sessions=SESSION_MAX_ENTRIES, ttl_seconds=SESSION_TTL_S):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._sessions
+
+    def get_or_create(self, key):
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = IncidentSession(key)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+            return session
+
+    def evict(self, key):
+        """Cierra la sesión de un incidente (p. ej. al resolverse); retorna si existía"""
+        with self._lock:
+            return self._sessions.pop(key, None) is not None
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if session.updated_at >= cutoff:
+                break
+            del self._sessions[key]
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {'active_sessions': len(self._sessions), 'evictions': self.evictions}
@@ -0,0 +1,84 @@
+# streaming.py
+import json
+from typing import Optional
+
+from pydantic import BaseModel
+
+from cpu_layout import submit_inference
+
+
+class StreamRequest(BaseModel):
+    text: str
+    profile: Optional[str] = None
+
+
+def stream_generate(generation_pipeline, inputs, max_input_length, **generate_kwargs):
+    """
+    Ejecuta `generate` del modelo del pipeline en una ranura de inferencia y produce
+    el texto acumulado a medida que el streamer entrega tokens nuevos. `inputs` es un
+    texto o una lista de ids ya tokenizados (y truncados) para el modelo. Respeta
+    'decoding' como `generate_from_ids` (un solo texto: la asistida admite streaming).
+    """
+    import torch
+    from transformers import TextIteratorStreamer
+    from generation import resolve_decoding
+
+    decoding = resolve_decoding(generation_pipeline, generate_kwargs.pop('decoding', 'target'))
+    tokenizer = generation_pipeline.tokenizer
+    model = generation_pipeline.draft_model if decoding == 'draft' else generation_pipeline.model
+    if decoding == 'assisted':
+        generate_kwargs['assistant_model'] = generation_pipeline.draft_model
+    if isinstance(inputs, str):
+        inputs = tokenizer(inputs, max_length=max_input_length, truncation=True, return_tensors="pt").to(model.device)
+    else:
+        input_ids = torch.tensor([inputs], device=model.device)
+        inputs = {'input_ids': input_ids, 'attention_mask': torch.ones_like(input_ids)}
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True)
+
+    generation = submit_inference(model.generate, **inputs, streamer=streamer, **generate_kwargs)
+    # Si generate falla (OOM, entrada inválida, ranura cancelada) nadie cierra el streamer:
+    # se cierra aquí para que el bucle termine y `result()` propague la excepción
+    def end_on_failure(future):
+        if future.cancelled() or future.exception() is not None:
+            streamer.end()
+
+    generation.add_done_callback(end_on_failure)
+
+    text_so_far = ""
+    for new_text in streamer:
+        text_so_far += new_text
+        yield text_so_far
+    generation.result()
+
+
+def format_sse(event, data):
+    """Serializa un evento en formato server-sent events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_events(events):
+    """
+    Convierte los eventos (tipo, payload) de `stream_incident` en SSE.
+    Los eventos finales y de error llevan el JSON completo de `format_as_json`.
+    """
+    for event, payload in events:
+        if event in ("final", "error"):
+            json_output, _ = payload
+            yield format_sse(event, json.loads(json_output))
+        else:
+            yield format_sse(event, payload)
+
+
+def register_stream_route(app, stream_fn):
+    """Registra `POST /summarize/stream` (SSE) sobre una aplicación FastAPI"""
+    from fastapi.responses import JSONResponse, StreamingResponse
+    from generation import validate_generation_profile
+
+    @app.post("/summarize/stream")
+    def summarize_stream(request: StreamRequest):
+        error_msg = validate_generation_profile(request.profile)
+        if error_msg:
+            return JSONResponse(status_code=422, content={"status": "error", "message": error_msg})
+        return StreamingResponse(sse_events(stream_fn(request.text, request.profile)), media_type="text/event-stream")
+
+    return app
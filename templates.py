@@ -0,0 +1,268 @@
+# templates.py
+import html
+import re
+
+# Plantillas HTML del panel de resultados, analizadas una sola vez al importar el módulo.
+# No dependen de gradio: la API, el benchmark y la UI renderizan con las mismas plantillas.
+
+CUSTOM_COLOR = "#C9F70E"  # Verde Limón
+
+PLACEHOLDER = re.compile(r'\{(\w+)(!raw)?\}')
+
+
+class CompiledTemplate:
+    """
+    Plantilla con campos `{nombre}` (escapados como HTML) y `{nombre!raw}`
+    (fragmentos ya renderizados). Se divide en literales y campos al crearla;
+    `render` solo concatena con un único join, lineal en el tamaño de la salida.
+    """
+
+    def __init__(self, source):
+        self.literals = []
+        self.fields = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            self.literals.append(source[position:match.start()])
+            self.fields.append((match.group(1), match.group(2) is not None))
+            position = match.end()
+        self.literals.append(source[position:])
+        self._segments = [(name, raw, literal) for (name, raw), literal in zip(self.fields, self.literals[1:])]
+
+    def render(self, **values):
+        parts = [self.literals[0]]
+        for name, raw, literal in self._segments:
+            value = values[name]
+            parts.append(value if raw else html.escape(str(value)))
+            parts.append(literal)
+        return "".join(parts)
+
+    def render_column(self, field, values, **fixed):
+        """
+        Una repetición de la plantilla por cada valor de `field`, con el resto de
+        campos fijos: las partes fijas se renderizan una sola vez y cada valor solo
+        se escapa y se intercala con un único join.
+        """
+        if not values:
+            return ""
+        prefix, suffix = self.render(**fixed, **{field: "\x00"}).split("\x00")
+        return prefix + (suffix + prefix).join([html.escape(str(value)) for value in values]) + suffix
+
+
+CARD = CompiledTemplate("""
+    <div class="cyber-card" style='--glow-color: {glow_color}'>
+        <div class="card-header">
+            {icon_html!raw}
+            {title_html!raw}
+        </div>
+        <div class="card-content">
+            {content!raw}
+        </div>
+        <div class="card-glow"></div>
+    </div>
+    """)
+CARD_ICON = CompiledTemplate("<span class='card-icon'>{icon}</span>")
+CARD_TITLE = CompiledTemplate("<h3 class='card-title'>{title}</h3>")
+
+INCIDENT_HEADER = CompiledTemplate("""
+        <div class="incident-header">
+            <div class="type-badge">
+                {icon} {incident_type}
+            </div>
+            <div class="confidence-meter">
+                <div class="meter-label">CONFIANZA DEL SISTEMA</div>
+                <div class="meter-bar">
+                    <div class="meter-fill" style="width: {width}%"></div>
+                </div>
+                <div class="meter-value">{confidence}</div>
+            </div>
+        </div>
+        """)
+SUMMARY = CompiledTemplate("""
+        <div class="summary-content">
+            <div class="summary-text">{summary}</div>
+        </div>
+        """)
+ENTITY_SECTION = CompiledTemplate("""
+            <div class="entity-section">
+                <h4>{heading}</h4>
+                <div class="entity-tags">
+                    {tags!raw}
+                </div>
+            </div>
+            """)
+ENTITY_TAG = CompiledTemplate('<span class="entity-tag {kind}">{value}</span>')
+NO_ENTITIES = "<div class='no-entities'>⚠️ No se detectaron entidades clave</div>"
+METRICS = CompiledTemplate("""
+    <div class="metrics-grid">
+        <div class="metric-item">
+            <div class="metric-value">{original_words}</div>
+            <div class="metric-label">PALABRAS ORIGINALES</div>
+        </div>
+        <div class="metric-item">
+            <div class="metric-value">{summary_words}</div>
+            <div class="metric-label">PALABRAS RESUMEN</div>
+        </div>
+        <div class="metric-item highlight">
+            <div class="metric-value">{reduction_percentage}%</div>
+            <div class="metric-label">REDUCCIÓN</div>
+        </div>
+    </div>
+    """)
+TRUNCATION_NOTICE = CompiledTemplate(
+    "<div class='no-entities'>✂️ Entrada truncada: {tokens_dropped} tokens descartados</div>")
+NEAR_DUPLICATE_NOTICE = CompiledTemplate(
+    "<div class='no-entities'>♻️ {action} de un incidente casi idéntico (similitud {similarity})</div>")
+STREAMING = CompiledTemplate("""
+        <div class="summary-content">
+            <div class="streaming-stage">⏳ {stage}</div>
+            <div class="summary-text">{partial_text}<span class="streaming-cursor">▌</span></div>
+        </div>
+        """)
+SYSTEM_MESSAGE = CompiledTemplate("""
+        <div class="system-stats">
+            <div class="streaming-stage">{headline}</div>
+            <div class="stat-item">{message}</div>
+        </div>
+        """)
+SYSTEM_INFO = CompiledTemplate("""
+        <div class="system-stats">
+            <div class="stat-item">
+                <strong>Modelo de Resumen:</strong><br>
+                <code>{model_name}</code>
+            </div>
+            <div class="stat-item">
+                <strong>Modelo de Traducción:</strong><br>
+                <code>{translation_model_name}</code>
+            </div>
+            <div class="stat-item">
+                <strong>Dispositivo:</strong><br>
+                <span class="{device_class}">
+                    {device_label}
+                </span>
+            </div>
+        </div>
+        """)
+ERROR = CompiledTemplate("<div class='error-message'><h3>❌ ERROR</h3><p>{message}</p></div>")
+
+INCIDENT_ICONS = {
+    "Software/Aplicación": "💻", "Redes/Conectividad": "🌐",
+    "Infraestructura/Sistemas": "💾", "Base de datos": "🗄️",
+    "Seguridad": "🔒", "General/Otros": "📜"
+}
+
+# (clave en `entities`, título de la sección, clase CSS de las etiquetas)
+ENTITY_SECTIONS = [
+    ('resources', "💾 RECURSOS/HOSTNAMES", "resource"),
+    ('ips', "🌐 DIRECCIONES IP", "ip"),
+    ('incident_id', "🏷️ IDS DE INCIDENTE", "id"),
+]
+
+
+def create_cyber_card(content, title=None, icon=None, glow_color=CUSTOM_COLOR):
+    """Crea una tarjeta con estilo cyberpunk; `content` es HTML ya renderizado"""
+    return CARD.render(
+        glow_color=glow_color,
+        icon_html=CARD_ICON.render(icon=icon) if icon else "",
+        title_html=CARD_TITLE.render(title=title) if title else "",
+        content=content
+    )
+
+
+def render_entities(entities):
+    """Secciones de entidades con sus valores escapados (lineal en el número de entidades)"""
+    sections = [
+        ENTITY_SECTION.render(
+            heading=heading,
+            tags=ENTITY_TAG.render_column('value', entities[key], kind=kind)
+        )
+        for key, heading, kind in ENTITY_SECTIONS if entities.get(key)
+    ]
+    return "".join(sections) if sections else NO_ENTITIES
+
+
+def generate_rich_summary_markdown(data):
+    """
+    Panel de resultados a partir del dict de `build_result` (sin pasar por JSON).
+    Todo valor que viene del incidente o del modelo se escapa como HTML.
+    """
+    entities = data.get('entities', {})
+    metrics = data.get('metadata', {})
+    incident_type = data.get('incident_type', 'N/A')
+    confidence = metrics.get('confidence_score', 'N/A')
+
+    metrics_content = METRICS.render(
+        original_words=metrics.get('original_words_count', 'N/A'),
+        summary_words=metrics.get('summary_words_count', 'N/A'),
+        reduction_percentage=metrics.get('reduction_percentage', 'N/A')
+    )
+    truncation = metrics.get('truncation') or {}
+    if truncation.get('truncated'):
+        metrics_content += TRUNCATION_NOTICE.render(tokens_dropped=truncation['tokens_dropped'])
+    near_duplicate = metrics.get('near_duplicate') or {}
+    if near_duplicate.get('matched'):
+        action = "Resumen reutilizado" if near_duplicate['reused'] else "Hay un resumen disponible"
+        metrics_content += NEAR_DUPLICATE_NOTICE.render(action=action, similarity=near_duplicate['similarity'])
+
+    return "".join([
+        create_cyber_card(
+            INCIDENT_HEADER.render(
+                icon=INCIDENT_ICONS.get(incident_type, '📜'),
+                incident_type=incident_type,
+                width=confidence.replace('%', '') if '%' in str(confidence) else '90',
+                confidence=confidence
+            ),
+            title="ANÁLISIS EJECUTIVO", icon="📊"
+        ),
+        create_cyber_card(SUMMARY.render(summary=data.get('summary', 'Resumen no disponible.')),
+                          title="RESUMEN DEL INCIDENTE", icon="📝"),
+        create_cyber_card(render_entities(entities), title="ENTIDADES DETECTADAS", icon="🔗"),
+        create_cyber_card(metrics_content, title="MÉTRICAS DE PROCESAMIENTO", icon="📈"),
+    ])
+
+
+def create_streaming_card(stage, partial_text):
+    """Tarjeta con el texto parcial mientras avanza la generación"""
+    return create_cyber_card(STREAMING.render(stage=stage, partial_text=partial_text),
+                             title="GENERANDO ANÁLISIS", icon="⚡")
+
+
+def create_warmup_card(status):
+    """Tarjeta de estado mientras los modelos cargan o se calientan (ModelManager.status())"""
+    failed = status['status'] == "failed"
+    return create_cyber_card(
+        SYSTEM_MESSAGE.render(headline=f"{'❌' if failed else '⏳'} {status['status'].replace('_', ' ').upper()}",
+                              message=status['message']),
+        title="ESTADO DEL SISTEMA",
+        icon="🖥️",
+        glow_color="#ff4444" if failed else CUSTOM_COLOR
+    )
+
+
+def create_busy_card(message):
+    """Tarjeta cuando el ejecutor rechaza la petición por cola llena (equivalente al 429 de la API)"""
+    return create_cyber_card(
+        SYSTEM_MESSAGE.render(headline="🚦 SISTEMA OCUPADO", message=message),
+        title="COLA DE INFERENCIA",
+        icon="🚦",
+        glow_color="#ffaa00"
+    )
+
+
+def create_error_card(message):
+    """Tarjeta de error del sistema"""
+    return create_cyber_card(ERROR.render(message=message), title="ERROR DEL SISTEMA", icon="🚨",
+                             glow_color="#ff4444")
+
+
+def create_system_info_card(device, model_name, translation_model_name):
+    """Crea la tarjeta de información del sistema"""
+    return create_cyber_card(
+        SYSTEM_INFO.render(
+            model_name=model_name.split('/')[-1],
+            translation_model_name=translation_model_name.split('/')[-1],
+            device_class='gpu-active' if device != -1 else 'cpu-active',
+            device_label='⚡ GPU (CUDA)' if device != -1 else '💻 CPU'
+        ),
+        title="ESTADO DEL SISTEMA",
+        icon="🖥️"
+    )
@@ -0,0 +1,12 @@
+# test_classifier.py
+from classifier import classify_incident
+
+
+def test_spanish_plurals_match_their_keyword():
+    result = classify_incident("Los servidores no responden y las bases de datos tienen deadlocks")
+    assert result['hits']['Infraestructura/Sistemas'] == {'servidor': 1}
+    assert result['hits']['Base de datos'] == {'base de datos': 1, 'deadlock': 1}
+
+
+def test_keywords_still_respect_word_boundaries():
+    assert 'Redes/Conectividad' not in classify_incident("el job de reduce falla")['hits']
@@ -0,0 +1,41 @@
+# test_dedup.py
+import pytest
+
+from dedup import NearDuplicateIndex, entity_key
+
+PARAMS = {'model_name': 'test'}
+STORM = ("Alerta: el servidor srv-app-01 con IP 10.0.0.5 no responde a los health checks desde las 10:30. "
+         "El balanceador lo retiró del pool y la latencia del checkout subió a 4 segundos. "
+         "Se reinició el servicio de pagos y se abrió el ticket INC-1234 para seguimiento.")
+
+
+@pytest.fixture
+def index():
+    """Índice con la tormenta original ya resumida para srv-app-01"""
+    index = NearDuplicateIndex()
+    index.add(STORM, "resumen anterior", PARAMS, entities_key=entity_key({'resources': ['srv-app-01']}))
+    return index
+
+
+def test_signature_is_deterministic_and_bounded():
+    index = NearDuplicateIndex()
+    assert index.signature(STORM) == NearDuplicateIndex().signature(STORM)
+    # Entradas enormes: muestreo de shingles, misma longitud de firma
+    huge = " ".join(f"palabra{chr(97 + i % 26)}x{chr(97 + i // 26 % 26)}" for i in range(50000))
+    assert len(index.signature(STORM)) == len(index.signature(huge)) == index.num_perm
+
+
+@pytest.mark.parametrize("resources, reusable", [(['srv-app-01'], True), (['srv-app-07'], False)])
+def test_masked_copy_is_reused_only_with_equal_entities(index, resources, reusable):
+    copy = STORM.replace("srv-app-01", "srv-app-07").replace("10.0.0.5", "10.0.0.9").replace("10:30", "11:45")
+    summary, similarity, _, same_entities = index.lookup(copy, PARAMS, entity_key({'resources': resources}))
+    assert summary == "resumen anterior" and similarity >= index.threshold
+    assert same_entities is reusable
+
+
+@pytest.mark.parametrize("text, params", [
+    ("Phishing dirigido al equipo de finanzas con enlaces a un dominio falso " * 3, PARAMS),
+    (STORM, {'model_name': 'otro'}),
+])
+def test_unrelated_text_or_other_params_do_not_match(index, text, params):
+    assert index.lookup(text, params)[0] is None
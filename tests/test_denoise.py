@@ -0,0 +1,38 @@
+# test_denoise.py
+import random
+
+from corpus import generate_noisy_incident
+from denoise import clean_line, denoise
+
+
+def test_timeline_with_bare_times_is_kept_verbatim():
+    timeline = ("10:30 El servidor srv-app-01 dejo de responder\n"
+                "10:35 El servidor srv-app-02 dejo de responder\n"
+                "10:40 El servidor srv-db-03 dejo de responder")
+    text, stats = denoise(timeline)
+    assert text == timeline
+    assert stats['templated_lines'] == 0
+    assert stats['repeated_lines'] == 0
+
+
+def test_machine_log_lines_are_templated():
+    text, stats = denoise("2024-05-01T10:00:01Z ERROR pool exhausted conn=12\n"
+                          "2024-05-01T10:00:02Z ERROR pool exhausted conn=13")
+    assert text == "ERROR pool exhausted <*> ×2"
+    assert stats['templated_lines'] == 1
+
+
+def test_chat_lines_are_only_deduplicated():
+    line = "[10:31] alice: ERROR 500 en checkout"
+    assert clean_line(line) == (line, False)
+    text, _ = denoise(f"{line}\n{line}")
+    assert text == f"{line} ×2"
+
+
+def test_noisy_dump_shrinks_and_keeps_every_narrative_sentence():
+    dump = generate_noisy_incident(random.Random(5), 150, 300)
+    narrative = [line for line in dump.splitlines() if line.endswith(".") and not line.startswith(("[", ">"))]
+    text, stats = denoise(dump)
+    assert stats['chars_out'] < stats['chars_in'] / 5
+    assert stats['lines_in'] == stats['lines_out'] + stats['repeated_lines'] + stats['templated_lines']
+    assert all(sentence in text for sentence in narrative)
@@ -0,0 +1,50 @@
+# test_entities.py
+import random
+
+from corpus import generate_dense_log
+from utils import ENTITY_PATTERNS, IPV4_FULL, extract_entities
+
+PIECES = ["srv-app-01", "router-main-a", "FW-EAST-01", "API-AUTH-CORE", "10.0.0.5", "192.168.1.0/24", "256.1.1.1",
+          "INC-1234", "TICKET-77", "#45", "Host: web-01", "IP: 10.1.2.3", "IP: 999.1.1.1", "ID: x9", "Ticket : T-1",
+          "srv", "app", "1", "a", "-", ":", ".", "#", "/", " ", " ", "\n", "El servidor", "falla",
+          "Host", "ID", " :", "[", "\t", "\u2028", "\u017f", "1.2.3"]
+
+
+def reference_entities(text):
+    """Referencia: un finditer por patrón sobre el texto completo, con la misma clasificación"""
+    resources, ips, incident_ids = set(), set(), set()
+    for name, pattern in ENTITY_PATTERNS.items():
+        for match in pattern.finditer(text):
+            if name == 'key_value':
+                key, value = match.group('kv_key').upper(), match.group('kv_value')
+                if key == 'IP':
+                    if IPV4_FULL.fullmatch(value):
+                        ips.add(value)
+                elif key in ['ID', 'TICKET']:
+                    incident_ids.add(value)
+                else:
+                    resources.add(value)
+            elif name == 'resource':
+                resources.add(match.group(0))
+            elif name == 'ips':
+                ips.add(match.group(0))
+            else:
+                incident_ids.add(match.group(0))
+    found = {'resources': resources, 'ips': ips, 'incident_id': incident_ids}
+    return {key: values for key, values in found.items() if values}
+
+
+def test_single_pass_matches_per_pattern_scan():
+    rng = random.Random(7)
+    for _ in range(2000):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(1, 30)))
+        entities, counts = extract_entities(text)
+        assert {key: set(values) for key, values in entities.items()} == reference_entities(text), text
+        assert counts == {key: len(values) for key, values in entities.items()}
+
+
+def test_dense_log_matches_per_pattern_scan():
+    text = generate_dense_log(random.Random(3), 400)
+    entities, _ = extract_entities(text)
+    assert {key: set(values) for key, values in entities.items()} == reference_entities(text)
+    assert "srv-app-03" in entities['resources'] and "INC-4821" in entities['incident_id']
@@ -0,0 +1,37 @@
+# test_executor.py
+import pytest
+
+from executor import InferenceExecutor, ExecutorBusy
+
+LANES = {"bulk": {"priority": 1, "max_queue": 4, "deadline_s": 60}}
+
+
+def test_cancelled_jobs_release_lane_capacity():
+    # Sin workers: los trabajos solo salen de la cola si se cancelan
+    executor = InferenceExecutor(workers=0, lanes=LANES)
+    jobs = [executor.submit(lambda job: None, lane="bulk") for _ in range(4)]
+    with pytest.raises(ExecutorBusy):
+        executor.submit(lambda job: None, lane="bulk")
+
+    # Rollback del lote entero (admit_all de la API): el carril queda vacío al instante
+    for job in jobs:
+        job.cancel()
+    assert executor.queue_depth("bulk") == 0
+    executor.submit(lambda job: None, lane="bulk")
+    assert executor.queue_depth("bulk") == 1
+
+
+def test_cancel_is_counted_once():
+    executor = InferenceExecutor(workers=0, lanes=LANES)
+    job = executor.submit(lambda job: None, lane="bulk")
+    job.cancel()
+    job.cancel()
+    assert executor.queue_depth("bulk") == 0
+
+
+def test_workers_skip_cancelled_jobs():
+    executor = InferenceExecutor(workers=1, lanes=LANES)
+    cancelled = executor.submit(lambda job: "cancelado", lane="bulk")
+    cancelled.cancel()
+    assert executor.run(lambda job: "ok", lane="bulk") == "ok"
+    assert executor.queue_depth("bulk") == 0
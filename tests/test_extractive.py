@@ -0,0 +1,55 @@
+# test_extractive.py
+import random
+import string
+
+import pytest
+
+from config import MAX_INPUT_LENGTH, CHUNK_WINDOW_TOKENS
+from extractive import extractive_budget, select_salient, split_sentences
+
+ROOT_CAUSE = "Causa raíz: el disco del servidor srv-db-02 se llenó y la base de datos entró en deadlock."
+
+
+def words(text):
+    """Medida de tokens de los tests: una palabra, un token"""
+    return len(text.split())
+
+
+def noise_sentences(count, seed=3):
+    """Frases sin relación entre sí ni con el incidente (palabras aleatorias)"""
+    rng = random.Random(seed)
+    return [" ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(7)) for _ in range(8)) + "."
+            for _ in range(count)]
+
+
+def test_selection_fits_budget_and_keeps_late_root_cause():
+    topic = ["La base de datos del servidor srv-db-02 responde lento.", "El servidor srv-db-02 no acepta conexiones."]
+    selected, metadata = select_salient("\n".join(topic + noise_sentences(200) + [ROOT_CAUSE]), 60, words)
+    assert words(selected) <= 60
+    assert ROOT_CAUSE in selected
+    assert metadata['last_position'] == 1.0
+
+
+def test_selection_preserves_original_order_and_skips_repeats():
+    filler = "El equipo revisó los paneles de monitorización sin novedades relevantes."
+    selected, metadata = select_salient(" ".join(["Primero falla el router principal.", filler, filler, ROOT_CAUSE]),
+                                        1000, words)
+    assert split_sentences(selected) == ["Primero falla el router principal.", filler, ROOT_CAUSE]
+    assert (metadata['sentences_in'], metadata['sentences_out']) == (4, 3)
+
+
+@pytest.mark.parametrize("long_document_mode, windows, expected", [
+    (True, 3, 3 * CHUNK_WINDOW_TOKENS),
+    (True, 1, MAX_INPUT_LENGTH),
+    (False, 3, MAX_INPUT_LENGTH),
+])
+def test_budget_follows_long_document_mode(long_document_mode, windows, expected):
+    assert extractive_budget(long_document_mode=long_document_mode, windows=windows) == expected
+
+
+def test_text_between_one_and_three_windows_is_selected_without_long_document_mode():
+    # Sin map-reduce, un texto de entre una y tres ventanas se selecciona en vez de truncarse por el principio
+    text = "\n".join(noise_sentences(2 * MAX_INPUT_LENGTH // 8) + [ROOT_CAUSE])
+    assert MAX_INPUT_LENGTH < words(text) <= 3 * CHUNK_WINDOW_TOKENS
+    selected, _ = select_salient(text, extractive_budget(long_document_mode=False), words)
+    assert words(selected) <= MAX_INPUT_LENGTH and ROOT_CAUSE in selected
@@ -0,0 +1,32 @@
+# test_generation.py
+import pytest
+
+from config import DRAFT_MODEL_NAME, MODEL_NAME
+from generation import generation_metadata, summary_model_name
+from utils import build_result
+
+KWARGS = {'num_beams': 1, 'min_length': 20, 'max_length': 80, 'decoding': 'assisted'}
+ASSISTED_STATS = {'mode': 'assisted', 'model': 'facebook/bart-large-cnn', 'output_tokens': 64,
+                  'tokens_per_second': 31.5, 'draft_tokens': 90, 'accepted_tokens': 58, 'verify_passes': 6,
+                  'acceptance_rate': 0.6444}
+
+
+@pytest.mark.parametrize("decoding, expected", [
+    ({'mode': 'draft', 'model': 'sshleifer/distilbart-cnn-12-6'}, 'sshleifer/distilbart-cnn-12-6'),
+    ({'mode': 'draft'}, DRAFT_MODEL_NAME),
+    ({'mode': 'assisted'}, MODEL_NAME),
+    ({'mode': 'target'}, MODEL_NAME),
+])
+def test_summary_model_follows_decoding_mode(decoding, expected):
+    assert summary_model_name(decoding) == expected
+
+
+def test_response_metadata_carries_decoding_stats():
+    generation = generation_metadata('balanced', KWARGS, dict(ASSISTED_STATS))
+    model_metadata = {'model_name': summary_model_name(generation['decoding']), **generation}
+    text = "El servidor srv-app-01 no responde desde las 10:30 y se abrió el ticket INC-1234."
+
+    metadata = build_result("Servidor caído.", text, model_metadata=model_metadata)['metadata']
+    assert metadata['decoding'] == ASSISTED_STATS
+    assert metadata['model'] == 'facebook/bart-large-cnn'
+    assert metadata['num_beams'] == 1 and metadata['generation_profile'] == 'balanced'
@@ -0,0 +1,53 @@
+# test_translation.py
+import pytest
+
+from translation import SentenceTranslator, split_summary
+
+
+class FakePipeline:
+    """Pipeline de traducción falso: marca cada frase y registra los lotes recibidos"""
+
+    model = object()
+    tokenizer = object()
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, sentences, batch_size=None, max_length=None):
+        self.calls.append(list(sentences))
+        return [{'translation_text': f"<{sentence}>"} for sentence in sentences]
+
+
+def test_repeated_sentences_are_translated_once_in_one_batch():
+    pipeline = FakePipeline()
+    translator = SentenceTranslator(pipeline)
+
+    results = translator(["The service was restored. Root cause identified.", "Root cause identified. Disk was full."])
+    assert [result['translation_text'] for result in results] == [
+        "<The service was restored.> <Root cause identified.>",
+        "<Root cause identified.> <Disk was full.>",
+    ]
+    assert pipeline.calls == [["The service was restored.", "Root cause identified.", "Disk was full."]]
+
+    # Un resumen ya visto se sirve entero de la caché, sin otra llamada al modelo
+    assert translator("Root cause identified. Disk was full.")[0]['translation_cache']['hits'] == 2
+    assert len(pipeline.calls) == 1
+
+
+def test_cache_is_bounded_lru():
+    pipeline = FakePipeline()
+    translator = SentenceTranslator(pipeline, max_entries=2)
+    translator("One. Two. Three.")
+    assert translator.stats()['entries'] == 2
+    # "One." fue la menos usada: salió de la caché y se vuelve a traducir
+    translator("One.")
+    assert pipeline.calls[-1] == ["One."]
+
+
+@pytest.mark.parametrize("summary, sentences", [
+    (" One.  Two! ", ["One.", "Two!"]),
+    ("No final punctuation", ["No final punctuation"]),
+    ("", []),
+])
+def test_split_summary(summary, sentences):
+    assert split_summary(summary) == sentences
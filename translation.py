@@ -0,0 +1,156 @@
+# translation.py
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import TRANSLATION_CACHE_MAX_ENTRIES, TRANSLATION_MAX_LENGTH, TRANSLATION_BATCH_SIZE
+from metrics import TRANSLATION_CACHE_LOOKUPS, TRANSLATION_SECONDS_SAVED
+
+# Traducción por frases: los resúmenes de incidentes relacionados repiten frases
+# ("The service was restored...", "Root cause identified..."), así que cada frase se
+# traduce una sola vez y las siguientes apariciones salen de una caché LRU.
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_summary(text):
+    """Frases del resumen, sin espacios sobrantes"""
+    return [sentence for sentence in SENTENCE_END.split(text.strip()) if sentence]
+
+
+class SentenceTranslator:
+    """
+    Traductor por frases con caché LRU acotada. Se llama igual que el pipeline de
+    traducción (`translator(textos, batch_size=..., max_length=...)` retorna
+    [{'translation_text': ...}]) y expone `model` y `tokenizer`, así que lo sustituye
+    en todo el código. Las frases que faltan en la caché se traducen juntas en un
+    único lote relleno; `max_length` se aplica por frase y ya no trunca resúmenes largos.
+    Cada resultado trae además 'translation_cache' con los aciertos y el tiempo ahorrado.
+    """
+
+    def __init__(self, pipeline, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+        self.pipeline = pipeline
+        self.model = pipeline.model
+        self.tokenizer = pipeline.tokenizer
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.ms_per_sentence = None   # Media móvil del coste de traducir una frase
+
+    def _lookup(self, sentences):
+        """Traducciones cacheadas (None si falta) y actualización de contadores y orden LRU"""
+        found = []
+        with self._lock:
+            for sentence in sentences:
+                translation = self._entries.get(sentence)
+                if translation is not None:
+                    self._entries.move_to_end(sentence)
+                found.append(translation)
+            hits = sum(1 for translation in found if translation is not None)
+            self.hits += hits
+            self.misses += len(found) - hits
+        TRANSLATION_CACHE_LOOKUPS.inc(hits, result='hit')
+        TRANSLATION_CACHE_LOOKUPS.inc(len(found) - hits, result='miss')
+        return found
+
+    def _store(self, translations, elapsed_ms):
+        with self._lock:
+            for sentence, translation in translations.items():
+                self._entries[sentence] = translation
+                self._entries.move_to_end(sentence)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            cost = elapsed_ms / len(translations)
+            self.ms_per_sentence = cost if self.ms_per_sentence is None else 0.9 * self.ms_per_sentence + 0.1 * cost
+
+    def translate_sentences(self, sentences, max_length=TRANSLATION_MAX_LENGTH, **kwargs):
+        """Traduce frases sin caché, en lotes de hasta TRANSLATION_BATCH_SIZE: {frase: traducción}"""
+        results = self.pipeline(sentences, batch_size=min(len(sentences), TRANSLATION_BATCH_SIZE),
+                                max_length=max_length, **kwargs)
+        return {sentence: result['translation_text'] for sentence, result in zip(sentences, results)}
+
+    def __call__(self, texts, batch_size=None, max_length=TRANSLATION_MAX_LENGTH, **kwargs):
+        # batch_size se acepta por compatibilidad: el lote real es el de las frases que faltan
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        split = [split_summary(text) for text in texts]
+        flat = [sentence for sentences in split for sentence in sentences]
+        found = self._lookup(flat)
+
+        # Frases que faltan, sin repetir, en un único lote para todo el grupo de resúmenes
+        missing = list(dict.fromkeys(sentence for sentence, translation in zip(flat, found) if translation is None))
+        translated, translate_ms = {}, 0.0
+        if missing:
+            start = time.perf_counter()
+            translated = self.translate_sentences(missing, max_length, **kwargs)
+            translate_ms = (time.perf_counter() - start) * 1000
+            self._store(translated, translate_ms)
+
+        hit_rate = self.stats()['hit_rate']
+        results, position = [], 0
+        for sentences in split:
+            own = found[position:position + len(sentences)]
+            position += len(sentences)
+            hits = sum(1 for translation in own if translation is not None)
+            saved_ms = hits * (self.ms_per_sentence or 0.0)
+            TRANSLATION_SECONDS_SAVED.inc(saved_ms / 1000)
+            results.append({
+                'translation_text': " ".join(translation if translation is not None else translated[sentence]
+                                             for sentence, translation in zip(sentences, own)),
+                'translation_cache': {
+                    'sentences': len(sentences),
+                    'hits': hits,
+                    'misses': len(sentences) - hits,
+                    'batch_sentences_translated': len(missing),
+                    'batch_translate_ms': round(translate_ms, 2),
+                    'saved_ms': round(saved_ms, 2),
+                    'cache_hit_rate': hit_rate,
+                },
+            })
+        return results
+
+    def stream(self, text, max_input_length, max_length=TRANSLATION_MAX_LENGTH):
+        """
+        Traducción en streaming frase a frase: las cacheadas aparecen al instante y
+        las demás se transmiten token a token. Produce el texto acumulado.
+        """
+        from streaming import stream_generate
+
+        sentences = split_summary(text)
+        done = []
+        for sentence, translation in zip(sentences, self._lookup(sentences)):
+            if translation is not None:
+                done.append(translation)
+                yield " ".join(done)
+                continue
+            start = time.perf_counter()
+            translation = ""
+            for partial in stream_generate(self.pipeline, sentence, max_input_length, max_length=max_length):
+                translation = partial
+                yield " ".join(done + [partial])
+            self._store({sentence: translation}, (time.perf_counter() - start) * 1000)
+            done.append(translation)
+
+    def stats(self):
+        """Contadores de la caché de frases expuestos en la metadata"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'ms_per_sentence': round(self.ms_per_sentence, 2) if self.ms_per_sentence is not None else None,
+            }
+
+
+def stream_translation(translator, text, max_input_length, max_length=TRANSLATION_MAX_LENGTH):
+    """Texto acumulado de la traducción en streaming, con o sin caché de frases"""
+    if isinstance(translator, SentenceTranslator):
+        yield from translator.stream(text, max_input_length, max_length)
+        return
+    from streaming import stream_generate
+
+    yield from stream_generate(translator, text, max_input_length, max_length=max_length)
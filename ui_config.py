@@ -4,8 +4,7 @@ from config import (
     MODEL_NAME, MIN_LENGTH, MAX_LENGTH, 
     INPUT_LINES, OUTPUT_LINES, TRANSLATION_MODEL_NAME
 )
-
-CUSTOM_COLOR = "#C9F70E"  # Verde Limón
+from templates import CUSTOM_COLOR  # Las tarjetas HTML se renderizan en templates.py
 
 # Tema simplificado y compatible
 CUSTOM_THEME = gr.themes.Default(
@@ -36,171 +35,6 @@ def create_animated_header():
     </div>
     """
 
-def create_cyber_card(content, title=None, icon=None, glow_color=CUSTOM_COLOR):
-    """Crea una tarjeta con estilo cyberpunk"""
-    icon_html = f"<span class='card-icon'>{icon}</span>" if icon else ""
-    title_html = f"<h3 class='card-title'>{title}</h3>" if title else ""
-    
-    return f"""
-    <div class="cyber-card" style='--glow-color: {glow_color}'>
-        <div class="card-header">
-            {icon_html}
-            {title_html}
-        </div>
-        <div class="card-content">
-            {content}
-        </div>
-        <div class="card-glow"></div>
-    </div>
-    """
-
-def generate_rich_summary_markdown(data):
-    """
-    Versión mejorada del resumen con elementos visuales futuristas
-    """
-    icon_map = {
-        "Software/Aplicación": "💻", "Redes/Conectividad": "🌐", 
-        "Infraestructura/Sistemas": "💾", "Base de datos": "🗄️", 
-        "Seguridad": "🔒", "General/Otros": "📜"
-    }
-    
-    summary = data.get('summary', 'Resumen no disponible.')
-    incident_type = data.get('incident_type', 'N/A')
-    entities = data.get('entities', {})
-    metrics = data.get('metadata', {})
-    
-    confidence = metrics.get('confidence_score', 'N/A')
-    original_words = metrics.get('original_words_count', 'N/A')
-    summary_words = metrics.get('summary_words_count', 'N/A')
-    reduction_percentage = metrics.get('reduction_percentage', 'N/A')
-    
-    # Header principal con animación
-    rich_md = create_cyber_card(
-        content=f"""
-        <div class="incident-header">
-            <div class="type-badge">
-                {icon_map.get(incident_type, '📜')} {incident_type}
-            </div>
-            <div class="confidence-meter">
-                <div class="meter-label">CONFIANZA DEL SISTEMA</div>
-                <div class="meter-bar">
-                    <div class="meter-fill" style="width: {confidence.replace('%', '') if '%' in str(confidence) else '90'}%"></div>
-                </div>
-                <div class="meter-value">{confidence}</div>
-            </div>
-        </div>
-        """,
-        title="ANÁLISIS EJECUTIVO",
-        icon="📊"
-    )
-    
-    # Resumen del incidente
-    rich_md += create_cyber_card(
-        content=f"""
-        <div class="summary-content">
-            <div class="summary-text">{summary}</div>
-        </div>
-        """,
-        title="RESUMEN DEL INCIDENTE",
-        icon="📝"
-    )
-    
-    # Entidades detectadas
-    entity_content = ""
-    resources = entities.get('resources', [])
-    ips = entities.get('ips', [])
-    ids = entities.get('incident_id', [])
-    
-    if resources or ips or ids:
-        if resources:
-            entity_content += f"""
-            <div class="entity-section">
-                <h4>💾 RECURSOS/HOSTNAMES</h4>
-                <div class="entity-tags">
-                    {''.join([f'<span class="entity-tag resource">{str(r)}</span>' for r in resources])}
-                </div>
-            </div>
-            """
-        
-        if ips:
-            entity_content += f"""
-            <div class="entity-section">
-                <h4>🌐 DIRECCIONES IP</h4>
-                <div class="entity-tags">
-                    {''.join([f'<span class="entity-tag ip">{str(ip)}</span>' for ip in ips])}
-                </div>
-            </div>
-            """
-        
-        if ids:
-            entity_content += f"""
-            <div class="entity-section">
-                <h4>🏷️ IDS DE INCIDENTE</h4>
-                <div class="entity-tags">
-                    {''.join([f'<span class="entity-tag id">{str(i)}</span>' for i in ids])}
-                </div>
-            </div>
-            """
-    else:
-        entity_content = "<div class='no-entities'>⚠️ No se detectaron entidades clave</div>"
-    
-    rich_md += create_cyber_card(
-        content=entity_content,
-        title="ENTIDADES DETECTADAS",
-        icon="🔗"
-    )
-    
-    # Métricas de procesamiento
-    metrics_content = f"""
-    <div class="metrics-grid">
-        <div class="metric-item">
-            <div class="metric-value">{original_words}</div>
-            <div class="metric-label">PALABRAS ORIGINALES</div>
-        </div>
-        <div class="metric-item">
-            <div class="metric-value">{summary_words}</div>
-            <div class="metric-label">PALABRAS RESUMEN</div>
-        </div>
-        <div class="metric-item highlight">
-            <div class="metric-value">{reduction_percentage}%</div>
-            <div class="metric-label">REDUCCIÓN</div>
-        </div>
-    </div>
-    """
-    
-    rich_md += create_cyber_card(
-        content=metrics_content,
-        title="MÉTRICAS DE PROCESAMIENTO",
-        icon="📈"
-    )
-    
-    return rich_md
-
-def create_system_info_card(device, model_name, translation_model_name):
-    """Crea la tarjeta de información del sistema"""
-    return create_cyber_card(
-        content=f"""
-        <div class="system-stats">
-            <div class="stat-item">
-                <strong>Modelo de Resumen:</strong><br>
-                <code>{model_name.split('/')[-1]}</code>
-            </div>
-            <div class="stat-item">
-                <strong>Modelo de Traducción:</strong><br>
-                <code>{translation_model_name.split('/')[-1]}</code>
-            </div>
-            <div class="stat-item">
-                <strong>Dispositivo:</strong><br>
-                <span class="{'gpu-active' if device != -1 else 'cpu-active'}">
-                    {'⚡ GPU (CUDA)' if device != -1 else '💻 CPU'}
-                </span>
-            </div>
-        </div>
-        """,
-        title="ESTADO DEL SISTEMA",
-        icon="🖥️"
-    )
-
 # CSS personalizado para efectos futuristas (se mantiene igual)
 CUSTOM_CSS = f"""
 <style>
@@ -540,6 +374,18 @@ CUSTOM_CSS = f"""
         font-style: italic;
     }}
     
+    .streaming-stage {{
+        font-family: 'Courier New', monospace;
+        font-size: 0.8em;
+        color: {CUSTOM_COLOR};
+        margin-bottom: 0.5rem;
+    }}
+    
+    .streaming-cursor {{
+        color: {CUSTOM_COLOR};
+        animation: pulse 1s infinite;
+    }}
+    
     .error-message {{
         text-align: center;
         padding: 2rem;
@@ -1,68 +1,122 @@
 # utils.py
 import json
 import re
-from config import REGEX_PATTERNS 
+from config import REGEX_PATTERNS, MIN_LENGTH
+
+def validate_incident_text(text):
+    """Retorna el mensaje de error si el texto no alcanza el mínimo de palabras, o None"""
+    if not text or len(text.split()) < MIN_LENGTH:
+        return f"El texto es demasiado corto. Mínimo {MIN_LENGTH} palabras requeridas."
+    return None
+
+# Patrones compilados una sola vez al importar el módulo
+ENTITY_PATTERNS = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in REGEX_PATTERNS.items()}
+IPV4_FULL = ENTITY_PATTERNS['ips']
+
+# Toda entidad contiene un ancla: letras seguidas de '-' (recursos, INC-/SW-/TICKET-),
+# '#' ante un dígito (tickets), ':' tras una letra o un espacio (clave-valor) o un punto
+# de cuatro octetos (IPs). Una sola alternancia compilada las localiza; cada rama empieza
+# por un literal para que el motor salte directamente de disparador en disparador
+# (con grupos de captura pierde ese atajo y la pasada es ~5 veces más lenta).
+ENTITY_ANCHOR = re.compile(
+    r'-(?<=[a-z]{2}-)|#(?=\d)|\.(?<=\d\.)(?=\d{1,3}\.\d{1,3}\.\d)|:(?<=[a-z\s]:)', re.IGNORECASE
+)
+# Patrones que necesitan las palabras de cada disparador
+ANCHOR_PATTERNS = {'-': ('resource', 'incident_id'), '#': ('resource', 'incident_id'),
+                   '.': ('ips',), ':': ('key_value',)}
+WORD_RUN = re.compile(r'\S*')
+SPACED_WORD_RUN = re.compile(r'\s*\S*')
+# Ningún patrón lo atraviesa y, como un espacio, mantiene los límites de palabra
+REGION_SEPARATOR = "\n|\n"
+
+def _candidate_text(text):
+    """
+    Texto reducido por patrón: las palabras completas (delimitadas por espacios) que
+    contienen un ancla; con ':' también la clave anterior y el valor siguiente.
+    Ninguna entidad contiene espacios salvo el clave-valor, así que cada coincidencia
+    sobre el texto original cae entera dentro de una región y viceversa.
+    El límite izquierdo se busca sobre el texto invertido para no retroceder carácter a carácter.
+    """
+    reversed_text = text[::-1]
+    size = len(text)
+    regions = {'-': [], '.': [], ':': []}
+    for anchor in ENTITY_ANCHOR.finditer(text):
+        position = anchor.start()
+        char = text[position]
+        spans = regions['-' if char == '#' else char]
+        if char != ':' and spans and position < spans[-1][1]:
+            continue  # misma palabra que la región anterior
+        
+        run = SPACED_WORD_RUN if char == ':' else WORD_RUN
+        reversed_start = size - position
+        start = position - (run.match(reversed_text, reversed_start).end() - reversed_start)
+        end = run.match(text, position + 1).end()
+        
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    
+    reduced = {}
+    for char, spans in regions.items():
+        joined = REGION_SEPARATOR.join([text[start:end] for start, end in spans])
+        for name in ANCHOR_PATTERNS[char]:
+            reduced[name] = joined
+    return reduced
 
 def extract_entities(text):
     """
     Extrae entidades clave: recursos, IPs e IDs, utilizando patrones flexibles.
+    Una sola pasada localiza las palabras candidatas; cada patrón precompilado
+    recorre solo las suyas, con la misma semántica que un findall sobre el texto completo.
     """
     entities = {}
     
-    # Conjuntos para acumular coincidencias únicas
-    resources = set()
-    ips_set = set()
-    incident_ids_set = set()
-
-    # 1. Extracción de Key-Value (Hostname, IP, OS, etc.) 
-    kv_matches = re.findall(r'(\b(?:Hostname|Host|Server|OS|IP|Usuario|APP|DB|ID|Ticket)\s*:\s*([a-zA-Z0-9.\-/]{2,}))', text, re.IGNORECASE)
+    # Diccionarios como conjuntos ordenados (orden de aparición, sin duplicados)
+    resources = {}
+    ips_set = {}
+    incident_ids_set = {}
     
-    # Procesa coincidencias Key-Value
-    for match in kv_matches:
-        key = match[0].split(':')[0].strip()
-        value = match[1].strip()
-        
-        if key.upper() == 'IP':
-            ips_set.add(value)
-        elif key.upper() in ['HOSTNAME', 'HOST', 'SERVER', 'OS', 'APP', 'DB']:
-            resources.add(value)
-        elif key.upper() in ['ID', 'TICKET']:
-             incident_ids_set.add(value)
-        else:
-             resources.add(value)
-
-    # 2. Extracción de RECURSOS GENERALES (¡CLAVE PARA EL TEXTO 2!)
-    # Captura nombres técnicos comunes como srv-app-03, router-main-a, FW-EAST-01, API-AUTH-CORE
-    # Este regex busca cadenas separadas por guiones o números con prefijos comunes.
-    general_resource_matches = re.findall(r'(\b[a-z]{2,5}-[a-z]{2,5}-\d{2,5}|\b[A-Z]{3,}-\b[A-Z0-9-]{2,})', text, re.IGNORECASE)
-    resources.update(general_resource_matches)
-
-    # 3. Extracción de IPs (usando patrón de config.py)
-    # Se asume que REGEX_PATTERNS['ips'] captura IPv4 válidas.
-    ip_matches = re.findall(REGEX_PATTERNS['ips'], text) 
-    ips_set.update(ip_matches)
-
-    # 4. Extracción de IDs de incidentes (usando patrón de config.py)
-    id_matches = re.findall(REGEX_PATTERNS['incident_id'], text, re.IGNORECASE)
-    incident_ids_set.update(id_matches)
+    candidates = _candidate_text(text)
+    for name, pattern in ENTITY_PATTERNS.items():
+        for match in pattern.finditer(candidates[name]):
+            if name == 'key_value':
+                # Key-Value (Hostname, IP, OS, etc.)
+                key = match.group('kv_key').upper()
+                value = match.group('kv_value')
+                if key == 'IP':
+                    if IPV4_FULL.fullmatch(value):
+                        ips_set[value] = None
+                elif key in ['ID', 'TICKET']:
+                    incident_ids_set[value] = None
+                else:
+                    resources[value] = None
+            elif name == 'resource':
+                resources[match.group(0)] = None
+            elif name == 'ips':
+                ips_set[match.group(0)] = None
+            else:
+                incident_ids_set[match.group(0)] = None
 
     # Llenar el diccionario de salida SOLO si el conjunto no está vacío.
     # El código de app.py debe usar .get(key, []) para evitar KeyErrors.
-    if resources: entities['resources'] = [str(r) for r in resources] # Fuerza a STR
-    if ips_set: entities['ips'] = [str(ip) for ip in ips_set]        # Fuerza a STR
-    if incident_ids_set: entities['incident_id'] = [str(i) for i in incident_ids_set] # Fuerza a STR
+    if resources: entities['resources'] = list(resources)
+    if ips_set: entities['ips'] = list(ips_set)
+    if incident_ids_set: entities['incident_id'] = list(incident_ids_set)
 
     # Conteo de entidades (mantenido)
     entity_counts = {k: len(v) for k, v in entities.items()}
     
     return entities, entity_counts
 
-def format_as_json(summary_text, original_text, incident_type="N/A", model_metadata={}, confidence=None):
+def build_result(summary_text, original_text, incident_type="N/A", model_metadata={}, confidence=None, extra_metadata=None, extraction=None):
     """
-    Formatea el resumen, el texto original y las entidades en una cadena JSON
-    y agrega métricas de conteo de palabras y confianza. (Mantenido)
+    Estructura del resultado (resumen, entidades y métricas de conteo de palabras
+    y confianza) como dict: el panel HTML se renderiza desde aquí sin pasar por JSON.
+    `extra_metadata` se fusiona en el bloque `metadata` (caché, tiempos, etc.).
+    `extraction` es el par (entidades, conteos) de extract_entities, si ya se calculó.
     """
-    extracted_entities, entity_counts = extract_entities(original_text)
+    extracted_entities, entity_counts = extraction if extraction is not None else extract_entities(original_text)
     
     # Métricas de conteo
     original_words_count = len(original_text.split())
@@ -76,12 +130,17 @@ def format_as_json(summary_text, original_text, incident_type="N/A", model_metad
         "model": model_metadata.get('model_name', 'N/A'),
         "min_words": model_metadata.get('min_length', 'N/A'),
         "max_words": model_metadata.get('max_length', 'N/A'),
+        "generation_profile": model_metadata.get('generation_profile', 'N/A'),
+        "num_beams": model_metadata.get('num_beams', 'N/A'),
+        "decoding": model_metadata.get('decoding', 'N/A'),
         "confidence_score": f"{confidence:.2f}%" if confidence is not None else "N/A",
         "original_words_count": original_words_count,
         "summary_words_count": summary_words_count,
         "reduction_percentage": reduction_percentage,
         "entity_counts": entity_counts
     }
+    if extra_metadata:
+        metadata.update(extra_metadata)
     
     output = {
         "status": "success",
@@ -91,4 +150,9 @@ def format_as_json(summary_text, original_text, incident_type="N/A", model_metad
         "metadata": metadata
     }
 
-    return json.dumps(output, indent=4, ensure_ascii=False)
\ No newline at end of file
+    return output
+
+def format_as_json(summary_text, original_text, incident_type="N/A", model_metadata={}, confidence=None, extra_metadata=None, extraction=None):
+    """Resultado de `build_result` serializado como cadena JSON. (Mantenido)"""
+    return json.dumps(build_result(summary_text, original_text, incident_type, model_metadata, confidence,
+                                   extra_metadata, extraction), indent=4, ensure_ascii=False)
\ No newline at end of file